@@ -0,0 +1,78 @@
+"""
+    Load test of the admission control: concurrent reads while bulk writes flood the server.
+
+    Usage: python -m benchmarks.bench_admission BASE_URL [readers] [writers] [seconds]
+
+    Start the server with the admission control enabled, then disabled, and compare the read latencies, e.g.:
+
+        FLASK_ENV=local SERVER_THREADS=16 ADMISSION_ENABLED=1 ADMISSION_API_KEYS=$(python -c \
+            "print(','.join('%s-%d' % (kind, index) for kind in ('reader', 'writer') for index in range(16)))") \
+            gunicorn --config python:my_app.gunicorn_config -w 1 my_app.app:application
+        FLASK_ENV=local SERVER_THREADS=16 gunicorn --config python:my_app.gunicorn_config -w 1 my_app.app:application
+
+        python -m benchmarks.bench_admission http://127.0.0.1:5000 16 16 20
+
+    Each client sends its own X-Api-Key, listed in ADMISSION_API_KEYS, so the rate limit of one client does not
+    throttle the others.
+"""
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+
+def _client(netloc, method, path, body, key, deadline, latencies, statuses):
+    headers = {'Content-Type': 'application/json', 'X-Api-Key': key}
+    connection = HTTPConnection(netloc, timeout=60)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            statuses[str(response.status)] += 1
+            if response.status == 200:
+                latencies.append(time.perf_counter() - start)
+            elif response.status in (429, 503):
+                time.sleep(float(response.getheader('Retry-After', 1)))
+        except Exception:
+            statuses['error'] += 1
+            time.sleep(0.1)
+            connection.close()
+            connection = HTTPConnection(netloc, timeout=60)
+    connection.close()
+
+
+def _summary(latencies, statuses):
+    latencies.sort()
+    if not latencies:
+        return dict(statuses)
+    return dict(statuses, p50_ms=round(latencies[len(latencies) // 2] * 1000, 1),
+                p99_ms=round(latencies[int(len(latencies) * 0.99)] * 1000, 1),
+                max_ms=round(latencies[-1] * 1000, 1))
+
+
+def run(base_url, readers=16, writers=16, seconds=20):
+    netloc = urlsplit(base_url).netloc
+    bulk = json.dumps([{'name': 'Load', 'age': 30, 'position': 'MF', 'team_id': 1}] * 500)
+    deadline = time.perf_counter() + seconds
+    results = {'read': ([], Counter()), 'bulk': ([], Counter())}
+    threads = [threading.Thread(target=_client, args=(netloc, 'GET', '/api/teams/1', None, 'reader-%d' % index,
+                                                      deadline) + results['read'])
+               for index in range(readers)]
+    threads += [threading.Thread(target=_client, args=(netloc, 'POST', '/api/players/bulk', bulk, 'writer-%d' % index,
+                                                       deadline) + results['bulk'])
+                for index in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return dict((kind, _summary(*result)) for kind, result in results.items())
+
+
+if __name__ == '__main__':
+    for kind, summary in run(sys.argv[1], *[int(arg) for arg in sys.argv[2:]]).items():
+        print('%-5s %s' % (kind, json.dumps(summary, sort_keys=True)))
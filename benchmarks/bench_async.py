@@ -0,0 +1,29 @@
+"""
+    Benchmark of the concurrency of one worker of the async stack against one worker of the sync stack.
+
+    Usage: python -m benchmarks.bench_async SYNC_URL ASYNC_URL [requests]
+
+    Start each stack with a single worker on the same database, e.g.:
+
+        FLASK_ENV=local gunicorn --config python:my_app.gunicorn_config --workers 1 --bind 127.0.0.1:5000 \
+            my_app.app:application
+        FLASK_ENV=local uvicorn --factory my_app.asgi:create_app --workers 1 --port 5001
+
+        python -m benchmarks.bench_async http://127.0.0.1:5000/api/teams/1 http://127.0.0.1:5001/api/teams/1
+"""
+import sys
+
+from benchmarks.bench_serving import run
+
+
+def main(sync_url, async_url, requests=2000):
+    print('%-12s %-6s %14s %10s %10s' % ('concurrency', 'stack', 'requests/sec', 'p50 ms', 'p99 ms'))
+    for concurrency in (1, 8, 32, 128):
+        for stack, url in (('sync', sync_url), ('async', async_url)):
+            result = run(url, concurrency, requests)
+            print('%-12d %-6s %14.1f %10.1f %10.1f' % (concurrency, stack, result['requests_per_sec'],
+                                                       result['p50_ms'], result['p99_ms']))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], sys.argv[2], *[int(arg) for arg in sys.argv[3:]])
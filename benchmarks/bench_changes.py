@@ -0,0 +1,93 @@
+"""
+    Benchmark of the database load of clients following the players' writes: polling the collection against following
+    the change feed, with the delta endpoint or the stream.
+
+    It runs in-process on a SQLite file with a thread per client, while a writer updates players, and counts the
+    statements each way of following sends to the database.
+
+    Usage: python -m benchmarks.bench_changes [--clients 50] [--seconds 5] [--writes-per-sec 20]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import event
+
+from benchmarks import data
+from my_app import create_app, db
+
+DATABASE = os.path.join(tempfile.mkdtemp(), 'changes.sqlite')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DATABASE
+
+application = create_app('local')
+
+
+def run(mode, clients, seconds, writes_per_sec):
+    """
+        Function to follow the writes with concurrent clients and count the statements sent to the database, apart
+        from the writer's.
+    """
+    statements = [0]
+    writer = threading.local()
+    stop = threading.Event()
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if not getattr(writer, 'active', False):
+            statements[0] += 1
+
+    def write():
+        writer.active = True
+        test_client = application.test_client()
+        player_id = 1
+        while not stop.is_set():
+            test_client.patch('/api/players/' + str(player_id), json={'age': 20 + player_id % 10})
+            player_id = player_id % 100 + 1
+            time.sleep(1 / writes_per_sec)
+
+    def client():
+        test_client = application.test_client()
+        since = test_client.get('/api/players/changes').get_json()['next']
+        while not stop.is_set():
+            if mode == 'poll':
+                test_client.get('/api/players?limit=100')
+                time.sleep(1)
+            elif mode == 'delta':
+                since = test_client.get('/api/players/changes?since=' + str(since)).get_json()['next']
+                time.sleep(1)
+            else:
+                test_client.get('/api/players/changes/stream', headers={'Last-Event-ID': str(since)},
+                                environ_overrides={'wsgi.multithread': True}).get_data()
+
+    engine = db.get_engine(application)
+    event.listen(engine, 'before_cursor_execute', count)
+    threads = [threading.Thread(target=write)] + [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    event.remove(engine, 'before_cursor_execute', count)
+    return statements[0] / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the database load of following the writes.')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--writes-per-sec', type=float, default=20)
+    args = parser.parse_args()
+
+    application.config.update(DEBUG=False, ADMISSION_ENABLED=False, CHANGE_FEED_STREAM_SECONDS=args.seconds)
+    with application.app_context():
+        data.load(db, 10, 100, 0)
+
+    print('%-8s %18s' % ('mode', 'statements/sec'))
+    for mode in ('poll', 'delta', 'stream'):
+        print('%-8s %18.1f' % (mode, run(mode, args.clients, args.seconds, args.writes_per_sec)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+    Benchmark of the concurrent POST requests of one process, each one committed on its own against group commit.
+
+    It runs in-process on a SQLite file, so every commit is synced to disk, with a thread per concurrent client.
+
+    Usage: python -m benchmarks.bench_group_commit [requests]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from my_app import create_app, db
+
+DATABASE = os.path.join(tempfile.mkdtemp(), 'group-commit.sqlite')
+os.environ['DATABASE_URL'] = 'sqlite:///' + DATABASE
+
+application = create_app('local')
+
+
+def run(concurrency, requests):
+    """
+        Function to send the requests from concurrent clients and measure the writes per second.
+    """
+    payload = {'name': 'Benchmark', 'age': '27', 'position': 'MF'}
+    errors = []
+
+    def client():
+        test_client = application.test_client()
+        for _ in range(requests // concurrency):
+            response = test_client.post('/api/players', json=payload)
+            if 'exception' in response.get_json():
+                errors.append(response.get_json()['exception'])
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'writes_per_sec': requests / (time.perf_counter() - start), 'errors': len(errors)}
+
+
+def main(requests=2000):
+    application.config.update(DEBUG=False, CACHE_BACKEND=None, ADMISSION_ENABLED=False)
+    with application.app_context():
+        db.create_all()
+
+    print('%-12s %-14s %14s %8s %10s' % ('concurrency', 'mode', 'writes/sec', 'errors', 'batch'))
+    for concurrency in (1, 8, 32, 64):
+        for mode in ('per-request', 'group-commit'):
+            application.config['GROUP_COMMIT_ENABLED'] = mode == 'group-commit'
+            result = run(concurrency, requests)
+            committer = application.extensions.pop('group_committer', None)
+            batch = 1.0
+            if committer is not None:
+                committer.stop()
+                batch = committer.jobs / max(committer.batches, 1)
+            print('%-12d %-14s %14.1f %8d %10.1f' % (concurrency, mode, result['writes_per_sec'], result['errors'],
+                                                     batch))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,129 @@
+"""
+    Benchmark of the in-process search index with generated players' names: the time and memory to build it, the
+    latency of each kind of search and of the writes that keep it current.
+
+    It doubles as the latency check of the search: the exit code is 1 when the p99 of a kind of search is over the
+    budget.
+
+    Usage: python -m benchmarks.bench_search [--players 1000000] [--queries 1000] [--budget-ms 5]
+"""
+import argparse
+import random
+import resource
+import string
+import sys
+import time
+
+from my_app.config import BaseConfig
+from my_app.search import SearchIndex
+
+FIRST_NAMES = [
+    'Adriano', 'Alex', 'Alexandre', 'Ana', 'André', 'Antônio', 'Arthur', 'Bernardo', 'Bruno', 'Caio', 'Carla',
+    'Carlos', 'Cláudio', 'Daniel', 'Davi', 'Diego', 'Eduardo', 'Fábio', 'Felipe', 'Fernanda', 'Fernando', 'Gabriel',
+    'Gustavo', 'Heitor', 'Hugo', 'Igor', 'Isabela', 'João', 'Jorge', 'José', 'Juliana', 'Júlio', 'Leonardo', 'Lucas',
+    'Luiz', 'Marcelo', 'Marcos', 'Maria', 'Mateus', 'Miguel', 'Nicolas', 'Otávio', 'Paulo', 'Pedro', 'Rafael',
+    'Renato', 'Ricardo', 'Roberto', 'Rodrigo', 'Samuel', 'Sérgio', 'Thiago', 'Vinícius', 'Vítor', 'Wagner', 'Yuri',
+]
+SURNAMES = [
+    'Almeida', 'Alves', 'Andrade', 'Araújo', 'Barbosa', 'Barros', 'Batista', 'Borges', 'Cardoso', 'Carvalho',
+    'Castro', 'Costa', 'Cunha', 'Dias', 'Duarte', 'Esteves', 'Farias', 'Fernandes', 'Ferreira', 'Freitas', 'Garcia',
+    'Gomes', 'Gonçalves', 'Lima', 'Lopes', 'Machado', 'Marques', 'Martins', 'Medeiros', 'Melo', 'Mendes', 'Miranda',
+    'Monteiro', 'Moraes', 'Moreira', 'Nascimento', 'Nogueira', 'Nunes', 'Oliveira', 'Pereira', 'Pinto', 'Ramos',
+    'Reis', 'Ribeiro', 'Rocha', 'Rodrigues', 'Santana', 'Santos', 'Silva', 'Silveira', 'Soares', 'Souza', 'Teixeira',
+    'Vieira',
+]
+
+
+def generate_names(players, seed):
+    """
+        Function to generate the players' names: a first name and one or two surnames, and a nickname of random letters
+        for one player in ten so the index has rare trigrams too.
+    """
+    generator = random.Random(seed)
+    names = []
+    for _ in range(players):
+        words = [generator.choice(FIRST_NAMES)] + generator.sample(SURNAMES, generator.randint(1, 2))
+        if generator.random() < 0.1:
+            words.append(''.join(generator.choice(string.ascii_lowercase) for _ in range(generator.randint(4, 8))))
+        names.append(' '.join(words))
+    return names
+
+
+def typo(word, generator):
+    index = generator.randrange(len(word))
+    return word[:index] + generator.choice(string.ascii_lowercase) + word[index + 1:]
+
+
+def queries(names, count, seed):
+    """
+        Function to create the searches of each kind from the names of the players.
+    """
+    generator = random.Random(seed)
+    sample = [generator.choice(names) for _ in range(count)]
+    return {
+        'exact': sample,
+        'prefix': [name[:generator.randint(2, 6)] for name in sample],
+        'word_prefix': [name.split()[-1][:generator.randint(3, 6)] for name in sample],
+        'typo': [typo(name.split()[-1], generator) for name in sample],
+        'typo_full_name': [typo(name, generator) for name in sample],
+        'no_match': [''.join(generator.choice(string.ascii_lowercase) for _ in range(8)) for _ in sample],
+    }
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(function, arguments):
+    """
+        Function to run the function with each argument and return the p50, p99 and maximum latency in milliseconds.
+    """
+    latencies = []
+    for argument in arguments:
+        start = time.perf_counter()
+        function(argument)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return percentile(latencies, 0.5), percentile(latencies, 0.99), max(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the in-process search index.')
+    parser.add_argument('--players', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=BaseConfig.SEARCH_DEFAULT_LIMIT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--budget-ms', type=float, default=5, help='maximum p99 latency of each kind of search')
+    args = parser.parse_args()
+
+    names = generate_names(args.players, args.seed)
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    index = SearchIndex(enumerate(names, 1))
+    print('build: %d players in %.1f s, %.0f MB' % (
+        len(index), time.perf_counter() - start, (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss) / 1024))
+
+    def search(query):
+        index.search(query, args.limit, BaseConfig.SEARCH_MIN_SIMILARITY, BaseConfig.SEARCH_MAX_CANDIDATES)
+
+    over_budget = []
+    print('%-16s %10s %10s %10s' % ('kind', 'p50 ms', 'p99 ms', 'max ms'))
+    for kind, arguments in queries(names, args.queries, args.seed).items():
+        p50, p99, maximum = measure(search, arguments)
+        print('%-16s %10.2f %10.2f %10.2f' % (kind, p50, p99, maximum))
+        if p99 > args.budget_ms:
+            over_budget.append(kind)
+
+    generator = random.Random(args.seed)
+    ids = [generator.randint(1, args.players) for _ in range(args.queries)]
+    for kind, function in (('add', lambda id_: index.add(id_, generator.choice(names))),
+                           ('remove', index.remove)):
+        p50, p99, maximum = measure(function, ids)
+        print('%-16s %10.2f %10.2f %10.2f' % (kind, p50, p99, maximum))
+
+    for kind in over_budget:
+        print('OVER BUDGET ' + kind)
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+    Benchmark of the rows serialization: the previous to_dict/json_serialize path against the compiled serializer.
+
+    Usage: python -m benchmarks.bench_serializer [rows]
+"""
+import sys
+import timeit
+from datetime import datetime
+
+from my_app.models import PlayersModel
+from my_app.serializer import ModelSerializer, Serializer
+
+
+def legacy_to_json(entity):
+    json = {}
+    for key in entity.to_dict():
+        json[key] = Serializer.json_serialize(getattr(entity, key))
+    return json
+
+
+def main(rows=10000, repeat=5):
+    now = datetime.utcnow()
+    entities = [PlayersModel(id=i, name='Player %d' % i, age=20 + i % 15, position='MF', team_id=i % 20,
+                             created_at=now, updated_at=now) for i in range(rows)]
+    tuples = [tuple(getattr(entity, column.key) for column in PlayersModel.__table__.columns) for entity in entities]
+    serializer = ModelSerializer.for_model(PlayersModel)
+
+    cases = [
+        ('legacy to_json', lambda: [legacy_to_json(entity) for entity in entities]),
+        ('compiled to_json', lambda: [serializer.to_json(entity) for entity in entities]),
+        ('compiled from_row', lambda: [serializer.from_row(row) for row in tuples]),
+        ('legacy list response', lambda: Serializer.dumps([legacy_to_json(entity) for entity in entities])),
+        ('compiled list response', lambda: Serializer.dumps([serializer.from_row(row) for row in tuples])),
+    ]
+    for name, case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print('%-24s %12.0f rows/sec' % (name, rows / best))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,66 @@
+"""
+    Load generator to compare the throughput of the servers serving the application.
+
+    Usage: python -m benchmarks.bench_serving URL [concurrency] [requests]
+
+    Start the server to be measured, then run the benchmark against the same URL with the same concurrency, e.g.:
+
+        FLASK_ENV=local python -m my_app.app
+        FLASK_ENV=local gunicorn --config python:my_app.gunicorn_config my_app.app:application
+
+        python -m benchmarks.bench_serving http://127.0.0.1:5000/api/teams 32 5000
+"""
+import sys
+import threading
+import time
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+
+def _worker(url, count, latencies, errors):
+    parts = urlsplit(url)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    connection = HTTPConnection(parts.netloc, timeout=30)
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+        except Exception as exp:
+            errors.append(exp)
+            connection.close()
+            connection = HTTPConnection(parts.netloc, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run(url, concurrency=32, requests=5000):
+    latencies = []
+    errors = []
+    threads = [threading.Thread(target=_worker, args=(url, requests // concurrency, latencies, errors))
+               for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'requests_per_sec': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else None,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000 if latencies else None,
+    }
+
+
+if __name__ == '__main__':
+    result = run(sys.argv[1], *[int(arg) for arg in sys.argv[2:]])
+    for key, value in result.items():
+        print('%-18s %s' % (key, round(value, 2) if isinstance(value, float) else value))
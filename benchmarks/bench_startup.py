@@ -0,0 +1,89 @@
+"""
+    Benchmark of the cold start of a process: importing the package, creating the application and serving its first
+    request, each run in a fresh interpreter, with the resident memory of the process at the end.
+
+    It doubles as the startup check of the build: the exit code is 1 when the median total time or the median resident
+    memory is over its budget.
+
+    Usage: python -m benchmarks.bench_startup [--runs 5] [--budget-ms 1000] [--budget-mb 80]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+BUDGET_MS = 1000
+BUDGET_MB = 80
+
+CHILD = '''
+import json, resource, sys, time
+
+def peak_rss_kb():
+    # ru_maxrss survives fork and exec, so it would report a larger parent, such as the test runner.
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+start = time.perf_counter()
+import my_app
+imported = time.perf_counter()
+application = my_app.create_app(sys.argv[1])
+created = time.perf_counter()
+with application.app_context():
+    my_app.db.create_all()
+ready = time.perf_counter()
+application.test_client().get('/api/teams')
+served = time.perf_counter()
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_request_ms': (served - ready) * 1000,
+    'total_ms': (served - ready + created - start) * 1000,
+    'rss_mb': peak_rss_kb() / 1024,
+}))
+'''
+
+
+def measure(config, runs):
+    """
+        Function to start the runs one after the other, each in a new interpreter, and return the median of every
+        measure.
+    """
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', CHILD, config], check=True, stdout=subprocess.PIPE).stdout
+        results.append(json.loads(output.decode('utf-8').splitlines()[-1]))
+    return dict((key, statistics.median(result[key] for result in results)) for key in results[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark of the cold start of the application.')
+    parser.add_argument('--config', default='benchmark', help='environment of the application')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS, help='maximum median total time')
+    parser.add_argument('--budget-mb', type=float, default=BUDGET_MB, help='maximum median resident memory')
+    args = parser.parse_args()
+
+    result = measure(args.config, args.runs)
+    for key, value in result.items():
+        print('%-18s %10.1f' % (key, value))
+
+    over = []
+    if result['total_ms'] > args.budget_ms:
+        over.append('total %.1f ms > %.1f ms' % (result['total_ms'], args.budget_ms))
+    if result['rss_mb'] > args.budget_mb:
+        over.append('resident memory %.1f MB > %.1f MB' % (result['rss_mb'], args.budget_mb))
+    if over:
+        print('Over budget: ' + ', '.join(over) + '.')
+        sys.exit(1)
+    print('Within budget.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+    Deterministic data generator of the benchmarks: N teams with M players each.
+"""
+from datetime import datetime, timedelta
+from random import Random
+
+POSITIONS = ['GK', 'DF', 'MF', 'FW']
+CITIES = ['Lisboa', 'Porto', 'Braga', 'Coimbra', 'Faro', 'Aveiro', 'Madeira', 'Guimaraes']
+
+
+def generate_teams(teams, seed=0):
+    random = Random(seed)
+    start = datetime(2018, 1, 1)
+    for index in range(teams):
+        moment = start + timedelta(minutes=index)
+        yield {'id': index + 1, 'name': 'Team %d' % (index + 1), 'city': random.choice(CITIES),
+               'created_at': moment, 'updated_at': moment}
+
+
+def generate_players(teams, players_per_team, seed=0):
+    random = Random(seed + 1)
+    start = datetime(2018, 1, 1)
+    for index in range(teams * players_per_team):
+        moment = start + timedelta(seconds=index)
+        yield {'id': index + 1, 'name': 'Player %d' % (index + 1), 'age': random.randint(16, 40),
+               'position': random.choice(POSITIONS), 'team_id': index // players_per_team + 1,
+               'created_at': moment, 'updated_at': moment}
+
+
+def load(db, teams, players_per_team, seed=0, batch_size=5000):
+    """
+        Function to recreate the tables and insert the generated rows.
+
+        Parameters
+        ----------
+        db: SQLAlchemy
+            Database of the application, used inside an application context.
+
+        teams: int
+            Number of teams.
+
+        players_per_team: int
+            Number of players of each team.
+
+        seed: int
+            Seed of the generator, the same seed always generates the same rows.
+    """
+    from my_app.models import TeamsModel, PlayersModel
+    from my_app.repositories import TeamStatsRepository
+
+    db.drop_all()
+    db.create_all()
+    for table, rows in ((TeamsModel.__table__, generate_teams(teams, seed)),
+                        (PlayersModel.__table__, generate_players(teams, players_per_team, seed))):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == batch_size:
+                db.session.execute(table.insert(), batch)
+                batch = []
+        if batch:
+            db.session.execute(table.insert(), batch)
+    db.session.commit()
+    TeamStatsRepository().rebuild()
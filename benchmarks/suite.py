@@ -0,0 +1,171 @@
+"""
+    Benchmark suite of every layer of the application: serializer, model, service, repository and resources.
+
+    It runs on an in-memory SQLite database loaded by benchmarks.data, reports the operations per second and the
+    peak memory allocated by one operation of each case, and compares them with a stored baseline.
+
+    Usage:
+        python -m benchmarks.suite --save                 # store the baseline
+        python -m benchmarks.suite                        # compare with it, exit code 1 on regression
+        python -m benchmarks.suite --filter repository    # run only the cases whose name contains the text
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from datetime import datetime
+
+from benchmarks import data
+from my_app import create_app, db
+from my_app.models import PlayersModel
+from my_app.repositories import PlayersRepository, TeamsRepository
+from my_app.serializer import Serializer
+from my_app.services import PlayersService
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+application = create_app('benchmark')
+
+
+def cases(teams, players_per_team, repeat):
+    """
+        Function to create the benchmark cases, each one a name, a function running one operation and the number of
+        operations of each repetition.
+
+        Each delete case runs its operations once to warm up, repeat times and once more to measure the memory, so
+        its number of operations is bounded for the players loaded to be enough for both delete cases.
+    """
+    players = teams * players_per_team
+    deletes = max(1, min(200, players // (2 * (repeat + 2))))
+    teams_repository = TeamsRepository()
+    players_repository = PlayersRepository()
+    players_service = PlayersService()
+    client = application.test_client()
+    entity = PlayersModel.query.get(1)
+    etag = client.get('/api/teams/1').headers['ETag']
+    since = client.get('/api/players/changes').get_json()['next']
+    payload = {'name': 'Benchmark', 'age': '27', 'position': 'MF', 'team_id': '1'}
+    bulk_rows = [{'name': 'Bulk %d' % index, 'age': 20, 'position': 'DF', 'team_id': 1} for index in range(100)]
+    bulk_updates = [{'id': index + 1, 'age': 30} for index in range(100)]
+    deleted_ids = iter(range(players, 0, -1))
+    values = ['text', 10, True, None, datetime(2018, 1, 1), {'key': 'value'}]
+    many_ids = list(range(1, players + 1, max(1, players // 50)))[:50]
+    page = players_repository.page(100)
+
+    def validate():
+        with application.test_request_context('/api/players', method='POST', json=payload):
+            players_service._validate_by_parse('create')
+
+    return [
+        ('serializer.json_serialize', lambda: [Serializer.json_serialize(value) for value in values], 10000),
+        ('serializer.dumps', lambda: Serializer.dumps(page), 1000),
+        ('model.to_json', entity.to_json, 10000),
+        ('service._validate_by_parse', validate, 1000),
+        ('repository.teams.find', lambda: teams_repository.find(1), 1000),
+        ('repository.teams.find_version', lambda: teams_repository.find_version(1), 1000),
+        ('repository.players.find_many', lambda: players_repository.find_many(many_ids), 500),
+        ('repository.teams.collection_version', teams_repository.collection_version, 200),
+        ('repository.teams.all', teams_repository.all, 20),
+        ('repository.players.page', lambda: players_repository.page(100), 100),
+        ('repository.players.page_embed', lambda: players_repository.page(100, embed=['team']), 100),
+        ('repository.players.page_sorted', lambda: players_repository.page(100, sort=[('age', True)]), 20),
+        ('repository.players.stream', lambda: sum(1 for _ in players_repository.stream(500)), 2),
+        ('repository.players.create', lambda: players_repository.create(dict(payload, age=27, team_id=1)), 200),
+        ('repository.players.update', lambda: players_repository.update(1, {'age': 28}), 200),
+        ('repository.players.patch', lambda: players_repository.patch(1, {'age': 29}), 200),
+        ('repository.players.patch_untracked', lambda: players_repository.patch(1, {'name': 'Patched'}), 200),
+        ('repository.players.bulk_create', lambda: players_repository.bulk_create(bulk_rows, 500), 10),
+        ('repository.players.bulk_update', lambda: players_repository.bulk_update(bulk_updates, 500), 10),
+        ('repository.players.delete', lambda: players_repository.delete(next(deleted_ids)), deletes),
+        ('repository.players.search', lambda: players_repository.search('Player 12', 10), 500),
+        ('resource.teams.get_list', lambda: client.get('/api/teams'), 20),
+        ('resource.teams.get_one', lambda: client.get('/api/teams/1'), 500),
+        ('resource.teams.get_not_modified', lambda: client.get('/api/teams/1', headers={'If-None-Match': etag}), 500),
+        ('resource.teams.get_stats', lambda: client.get('/api/teams/1/stats'), 500),
+        ('resource.teams.get_all_stats', lambda: client.get('/api/teams/stats'), 50),
+        ('resource.players.get_page', lambda: client.get('/api/players?limit=100'), 100),
+        ('resource.players.get_many', lambda: client.get('/api/players?ids=' + ','.join(map(str, many_ids))), 200),
+        ('resource.players.get_page_gzip',
+         lambda: client.get('/api/players?limit=100', headers={'Accept-Encoding': 'gzip'}), 100),
+        ('resource.players.get_filtered', lambda: client.get('/api/players?team_id=3&sort=-age'), 100),
+        ('resource.players.post', lambda: client.post('/api/players', json=payload), 200),
+        ('resource.players.put', lambda: client.put('/api/players/2', json=payload), 200),
+        ('resource.players.patch', lambda: client.patch('/api/players/2', json={'name': 'Patched'}), 200),
+        ('resource.players.bulk_post', lambda: client.post('/api/players/bulk', json=bulk_rows), 10),
+        ('resource.players.delete', lambda: client.delete('/api/players/' + str(next(deleted_ids))), deletes),
+        ('resource.players.search', lambda: client.get('/api/players/search?q=Playr'), 500),
+        ('resource.players.get_changes', lambda: client.get('/api/players/changes?since=' + str(since)), 500),
+    ]
+
+
+def measure(function, number, repeat):
+    """
+        Function to measure the best operations per second of the repetitions and the peak memory of one operation.
+    """
+    function()
+    best = min(timeit.repeat(function, number=number, repeat=repeat)) / number
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'ops_per_sec': 1 / best, 'peak_bytes': peak}
+
+
+def compare(results, baseline, threshold):
+    """
+        Function to list the cases slower, or allocating more memory, than the baseline by more than the threshold.
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        if result['ops_per_sec'] < baseline[name]['ops_per_sec'] * (1 - threshold):
+            regressions.append(name + ': ops/sec')
+        if result['peak_bytes'] > baseline[name]['peak_bytes'] * (1 + threshold):
+            regressions.append(name + ': peak memory')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark suite of the application.')
+    parser.add_argument('--teams', type=int, default=100)
+    parser.add_argument('--players-per-team', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--filter', default='')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--save', action='store_true')
+    args = parser.parse_args()
+
+    with application.app_context():
+        data.load(db, args.teams, args.players_per_team, args.seed)
+        results = {}
+        print('%-42s %14s %14s' % ('case', 'ops/sec', 'peak KiB'))
+        for name, function, number in cases(args.teams, args.players_per_team, args.repeat):
+            if args.filter in name:
+                results[name] = measure(function, number, args.repeat)
+                print('%-42s %14.1f %14.1f' % (name, results[name]['ops_per_sec'],
+                                               results[name]['peak_bytes'] / 1024))
+
+    if args.save:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(results, baseline_file, indent=4, sort_keys=True)
+        print('Baseline saved to ' + args.baseline)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print('No baseline found at ' + args.baseline + ', run with --save to store one.')
+        return 0
+
+    with open(args.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file), args.threshold)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,83 @@
+import sys
+
 from flask_migrate import Migrate, MigrateCommand
-from flask_script import Manager
+from flask_script import Command, Manager
 
-from my_app import application, db
+from my_app import create_app, db
+from my_app import transfer
+from my_app.repositories import TeamsRepository, PlayersRepository, TeamStatsRepository, ChangesRepository
 
+application = create_app()
 migrate = Migrate(application, db)
 manager = Manager(application)
 manager.add_command('db', MigrateCommand)
 
+repositories = {
+    'teams': TeamsRepository(),
+    'players': PlayersRepository(),
+}
+
+
+def get_repository(table):
+    if table not in repositories:
+        raise Exception('Table must be one of: ' + ', '.join(repositories) + '.')
+    return repositories[table]
+
+
+@manager.option('-u', '--upsert', dest='upsert', action='store_true', help='update the existing rows')
+@manager.option('-c', '--chunk-size', dest='chunk_size', type=int, help='rows written on each transaction')
+@manager.option('-f', '--format', dest='format_', choices=transfer.FORMATS, help='inferred from the extension')
+@manager.option('path', help='CSV or NDJSON file, optionally gzipped (.gz)')
+@manager.option('table', help='teams or players')
+def import_data(table, path, format_=None, chunk_size=None, upsert=False):
+    """Import the rows of a CSV or NDJSON file into a table."""
+    transfer.import_file(get_repository(table), path, format_,
+                         chunk_size or application.config['TRANSFER_CHUNK_SIZE'], upsert)
+
+
+@manager.option('-c', '--chunk-size', dest='chunk_size', type=int, help='rows fetched from the cursor at a time')
+@manager.option('-f', '--format', dest='format_', choices=transfer.FORMATS, help='inferred from the extension')
+@manager.option('path', help='CSV or NDJSON file, gzipped when it ends with .gz')
+@manager.option('table', help='teams or players')
+def export_data(table, path, format_=None, chunk_size=None):
+    """Export the rows of a table to a CSV or NDJSON file."""
+    transfer.export_file(get_repository(table), path, format_, chunk_size or application.config['TRANSFER_CHUNK_SIZE'])
+
+
+class RebuildStats(Command):
+    """Recompute the teams' statistics from the players."""
+
+    def run(self):
+        TeamStatsRepository().rebuild()
+        print('Teams statistics rebuilt.')
+
+
+class VerifyStats(Command):
+    """Compare the teams' statistics with a fresh aggregate of the players."""
+
+    def run(self):
+        differences = TeamStatsRepository().verify()
+        for difference in differences:
+            print(difference)
+        if differences:
+            sys.exit(1)
+        print('Teams statistics are consistent.')
+
+
+class PruneChanges(Command):
+    """Delete the changes older than the retention, or beyond the maximum number of rows, of the change feed."""
+
+    def run(self):
+        deleted = ChangesRepository().prune(application.config['CHANGE_FEED_RETENTION'],
+                                            application.config['CHANGE_FEED_MAX_ROWS'],
+                                            application.config['CHANGE_FEED_BATCH_SIZE'])
+        print(str(deleted) + ' changes pruned.')
+
+
+manager.add_command('rebuild_stats', RebuildStats())
+manager.add_command('verify_stats', VerifyStats())
+manager.add_command('prune_changes', PruneChanges())
+
+
 if __name__ == "__main__":
     manager.run()
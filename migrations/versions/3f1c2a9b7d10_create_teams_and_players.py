@@ -0,0 +1,55 @@
+"""create teams and players
+
+Revision ID: 3f1c2a9b7d10
+Revises: 
+Create Date: 2026-10-17 21:09:18.604127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9b7d10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The deployments created before the migrations already have the tables, which are kept as they are.
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    if 'teams' not in existing:
+        create_teams()
+    if 'players' not in existing:
+        create_players()
+
+
+def create_teams():
+    op.create_table('teams',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('city', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def create_players():
+    op.create_table('players',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('age', sa.Integer(), nullable=True),
+    sa.Column('position', sa.String(length=50), nullable=True),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('players')
+    op.drop_table('teams')
@@ -0,0 +1,30 @@
+"""add filter and sort indexes
+
+Revision ID: 8e4d51c0a6f2
+Revises: 3f1c2a9b7d10
+Create Date: 2026-10-17 21:10:42.118340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4d51c0a6f2'
+down_revision = '3f1c2a9b7d10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_teams_name'), 'teams', ['name'], unique=False)
+    op.create_index(op.f('ix_players_name'), 'players', ['name'], unique=False)
+    op.create_index(op.f('ix_players_position'), 'players', ['position'], unique=False)
+    op.create_index(op.f('ix_players_team_id'), 'players', ['team_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_players_team_id'), table_name='players')
+    op.drop_index(op.f('ix_players_position'), table_name='players')
+    op.drop_index(op.f('ix_players_name'), table_name='players')
+    op.drop_index(op.f('ix_teams_name'), table_name='teams')
@@ -0,0 +1,28 @@
+"""add table versions
+
+Revision ID: a5c9e1d7b263
+Revises: f2c6d8b4a715
+Create Date: 2026-10-18 10:04:27.361845
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5c9e1d7b263'
+down_revision = 'f2c6d8b4a715'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('table_versions')
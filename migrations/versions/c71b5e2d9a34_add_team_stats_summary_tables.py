@@ -0,0 +1,43 @@
+"""add team stats summary tables
+
+Revision ID: c71b5e2d9a34
+Revises: 8e4d51c0a6f2
+Create Date: 2026-10-17 21:25:03.482911
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71b5e2d9a34'
+down_revision = '8e4d51c0a6f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('team_stats',
+    sa.Column('team_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('players', sa.Integer(), nullable=False),
+    sa.Column('age_sum', sa.Integer(), nullable=False),
+    sa.Column('age_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('team_id')
+    )
+    op.create_table('team_position_stats',
+    sa.Column('team_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('position', sa.String(length=50), nullable=False),
+    sa.Column('players', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('team_id', 'position')
+    )
+    op.execute('INSERT INTO team_stats (team_id, players, age_sum, age_count) '
+               'SELECT team_id, COUNT(*), COALESCE(SUM(age), 0), COUNT(age) FROM players '
+               'WHERE team_id IS NOT NULL GROUP BY team_id')
+    op.execute('INSERT INTO team_position_stats (team_id, position, players) '
+               'SELECT team_id, position, COUNT(*) FROM players '
+               'WHERE team_id IS NOT NULL AND position IS NOT NULL GROUP BY team_id, position')
+
+
+def downgrade():
+    op.drop_table('team_position_stats')
+    op.drop_table('team_stats')
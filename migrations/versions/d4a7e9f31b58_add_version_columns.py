@@ -0,0 +1,26 @@
+"""add version columns
+
+Revision ID: d4a7e9f31b58
+Revises: c71b5e2d9a34
+Create Date: 2026-10-17 21:52:16.204781
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7e9f31b58'
+down_revision = 'c71b5e2d9a34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('teams', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('players', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    op.drop_column('players', 'version')
+    op.drop_column('teams', 'version')
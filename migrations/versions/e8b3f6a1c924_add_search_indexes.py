@@ -0,0 +1,33 @@
+"""add search indexes
+
+Revision ID: e8b3f6a1c924
+Revises: d4a7e9f31b58
+Create Date: 2026-10-17 22:31:05.473912
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b3f6a1c924'
+down_revision = 'd4a7e9f31b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_teams_updated_at'), 'teams', ['updated_at'], unique=False)
+    op.create_index(op.f('ix_players_updated_at'), 'players', ['updated_at'], unique=False)
+    # The FULLTEXT indexes exist only on MySQL, the other databases are searched through the in-process index.
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ft_teams_name', 'teams', ['name'], mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+        op.create_index('ft_players_name', 'players', ['name'], mysql_prefix='FULLTEXT', mysql_with_parser='ngram')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ft_players_name', table_name='players')
+        op.drop_index('ft_teams_name', table_name='teams')
+    op.drop_index(op.f('ix_players_updated_at'), table_name='players')
+    op.drop_index(op.f('ix_teams_updated_at'), table_name='teams')
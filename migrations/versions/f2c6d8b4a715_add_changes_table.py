@@ -0,0 +1,35 @@
+"""add changes table
+
+Revision ID: f2c6d8b4a715
+Revises: e8b3f6a1c924
+Create Date: 2026-10-17 23:12:44.918306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c6d8b4a715'
+down_revision = 'e8b3f6a1c924'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('changes',
+    sa.Column('seq', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(length=50), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('operation', sa.String(length=10), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('seq')
+    )
+    op.create_index(op.f('ix_changes_created_at'), 'changes', ['created_at'], unique=False)
+    op.create_index('ix_changes_table_name_seq', 'changes', ['table_name', 'seq'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_changes_table_name_seq', table_name='changes')
+    op.drop_index(op.f('ix_changes_created_at'), table_name='changes')
+    op.drop_table('changes')
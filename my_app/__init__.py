@@ -1,54 +1,42 @@
-from flask import Flask, Blueprint, jsonify
-from flask_sqlalchemy import SQLAlchemy
-from flask_restful import Api
+from flask import Flask
 
-from my_app.config import get_config
+from my_app.routing import RoutingSQLAlchemy
 
 
-application = Flask(__name__)
-application.config.from_object(get_config())
+db = RoutingSQLAlchemy()
 
-db = SQLAlchemy(application)
-db.init_app(application)
 
-api_bp = Blueprint('api', __name__)
-api = Api(api_bp)
-
-application.register_blueprint(api_bp, url_prefix='/api')
-
-
-@application.route('/')
-def hello_world():
-    return 'Hello World!'
-
-
-@application.after_request
-def after_request(response):
-    response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE')
-    return response
-
-
-@application.errorhandler(Exception)
-def handle_exception(error):
+def create_app(config=None):
     """
-        Function to handle exceptions when it is raised in the app.
+        Function to create an application with its own configuration.
+
+        Importing the package only creates the unbound database extension: the settings are read, the extensions are
+        set up and the resources, services and repositories are imported when an application is created, so each
+        process pays for them once and only if it serves requests.
 
         Parameters
         ----------
-        error: AbstractException
-            Exception to be handle.
-    """
-    return jsonify({'exception': str(error)})
-
-
-application.register_error_handler(Exception, handle_exception)
-
-from my_app.resources import TeamsResource, PlayersResource
+        config: str or object, optional
+            Environment's name, e.g. local, or object whose upper-case attributes are the settings. The FLASK_ENV
+            environment variable chooses the environment when not informed.
 
-# Resources
-api.add_resource(TeamsResource, '/teams', '/teams/<int:id_>', strict_slashes=False)
-api.add_resource(PlayersResource, '/players', '/teams/<int:id_>', strict_slashes=False)
-
-from my_app.models import TeamsModel, PlayersModel
+        Returns
+        ----------
+        Flask
+    """
+    from my_app import admission, changes, profiler, routing, views
+    from my_app.config import get_config
+    from my_app.serializer import JSONEncoder
+
+    application = Flask(__name__)
+    application.config.from_object(config if config is not None and not isinstance(config, str) else get_config(config))
+    application.json_encoder = JSONEncoder
+    admission_control = admission.AdmissionControl(application, application.wsgi_app)
+    application.wsgi_app = application.extensions['admission'] = admission_control
+
+    db.init_app(application)
+    routing.init_app(application, db)
+    profiler.init_app(application, db)
+    changes.init_app(application)
+    views.init_app(application)
+    return application
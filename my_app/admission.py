@@ -0,0 +1,263 @@
+"""
+    Admission control of the requests, applied before they reach the application so excess work is rejected early.
+
+    Every request is classified as a read, a stream of changes, a write or a bulk write. It is rejected with 429 when
+    its client has no tokens left in its bucket, and with 503 when its class has no free slot in the process or when it
+    has waited in the server's queue longer than its class allows. Reads get every slot and the longest queue time, so
+    they keep being served while bulk writes are shed first, and streams, which hold their slot for a long time, get
+    only part of the slots.
+
+    The clients are identified by their address, the one added to X-Forwarded-For by the outermost of the
+    ADMISSION_TRUSTED_PROXIES in front of the server, or by their X-Api-Key when it is one of the ADMISSION_API_KEYS.
+    Nothing else informed by the client is trusted, so it cannot pick its own bucket.
+"""
+import json
+import math
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from werkzeug.wsgi import ClosingIterator
+
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+MAX_ROUTES = 1000
+
+_ids = re.compile(r'/\d+(?=/|$)')
+
+
+class TokenBucket:
+    """
+        Class of the rate limit of a client: the bucket is refilled with rate tokens per second up to burst tokens.
+    """
+
+    __slots__ = ('tokens', 'updated_at')
+
+    def __init__(self, burst, now):
+        self.tokens = burst
+        self.updated_at = now
+
+    def take(self, cost, rate, burst, now):
+        """
+            Method to take the tokens of a request from the bucket.
+
+            Parameters
+            ----------
+            cost: float
+                Tokens of the request.
+
+            rate: float
+                Tokens added per second.
+
+            burst: float
+                Maximum number of tokens.
+
+            now: float
+                Current monotonic time.
+
+            Returns
+            ----------
+            float
+                Zero when the tokens were taken, otherwise the seconds until the bucket has enough of them.
+        """
+        self.tokens = min(burst, self.tokens + (now - self.updated_at) * rate)
+        self.updated_at = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0
+        return (cost - self.tokens) / rate
+
+    def refund(self, cost, burst):
+        """
+            Method to give back the tokens of a request that was not served.
+
+            Parameters
+            ----------
+            cost: float
+                Tokens of the request.
+
+            burst: float
+                Maximum number of tokens.
+        """
+        self.tokens = min(burst, self.tokens + cost)
+
+
+class AdmissionControl:
+    """
+        Class of the WSGI middleware that admits or rejects each request according to the ADMISSION_* settings of the
+        application, keeping counters per route.
+
+        The slots of the process are the ADMISSION_MAX_IN_FLIGHT setting or, when it is not informed, its threads.
+        With one thread per worker only the queue time sheds the requests, since there is never more than one in flight.
+    """
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self.in_flight = defaultdict(int)
+        self.routes = defaultdict(lambda: {'admitted': 0, 'rate_limited': 0, 'shed': 0, 'in_flight': 0,
+                                           'queue_time_sum': 0.0, 'queue_time_max': 0.0})
+        self.buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        config = self.app.config
+        path = environ.get('PATH_INFO', '')
+        if not config['ADMISSION_ENABLED'] or path in config['ADMISSION_EXEMPT_PATHS']:
+            return self.wsgi_app(environ, start_response)
+
+        now = time.monotonic()
+        kind = self.classify(environ)
+        route = environ.get('REQUEST_METHOD', 'GET') + ' ' + _ids.sub('/<id>', path)
+        queue_time = self.queue_time(environ)
+
+        with self._lock:
+            if route not in self.routes and len(self.routes) >= MAX_ROUTES:
+                route = 'other'
+            stats = self.routes[route]
+            stats['queue_time_sum'] += queue_time
+            stats['queue_time_max'] = max(stats['queue_time_max'], queue_time)
+
+            bucket = self._bucket(self.client_key(environ), now)
+            cost = config['ADMISSION_COSTS'][kind]
+            wait = bucket.take(cost, config['ADMISSION_RATE'], config['ADMISSION_BURST'], now)
+            if wait:
+                stats['rate_limited'] += 1
+                return self._reject(start_response, 429, 'Too many requests.', wait)
+
+            max_in_flight = config['ADMISSION_MAX_IN_FLIGHT'] or config['SERVER_THREADS']
+            limit = max(1, int(max_in_flight * config['ADMISSION_SHARES'][kind]))
+            if queue_time > config['ADMISSION_MAX_QUEUE_TIME'][kind] or self.in_flight[kind] >= limit:
+                stats['shed'] += 1
+                bucket.refund(cost, config['ADMISSION_BURST'])
+                return self._reject(start_response, 503, 'Server is overloaded.', config['ADMISSION_RETRY_AFTER'])
+
+            stats['admitted'] += 1
+            stats['in_flight'] += 1
+            self.in_flight[kind] += 1
+
+        try:
+            response = self.wsgi_app(environ, start_response)
+        except Exception:
+            self._release(stats, kind)
+            raise
+        return ClosingIterator(response, lambda: self._release(stats, kind))
+
+    @staticmethod
+    def classify(environ):
+        """
+            Method to classify a request as a read, a stream of changes, a write or a bulk write.
+
+            Parameters
+            ----------
+            environ: dict
+                WSGI environment of the request.
+
+            Returns
+            ----------
+            str
+                read, stream, write or bulk.
+        """
+        if environ.get('REQUEST_METHOD', 'GET') in READ_METHODS:
+            if environ.get('PATH_INFO', '').rstrip('/').endswith('/changes/stream'):
+                return 'stream'
+            return 'read'
+        if environ.get('PATH_INFO', '').rstrip('/').endswith('/bulk'):
+            return 'bulk'
+        return 'write'
+
+    def client_key(self, environ):
+        """
+            Method to identify the client of a request by its API key, when it is one of the ADMISSION_API_KEYS, or
+            otherwise by its address.
+
+            Each of the ADMISSION_TRUSTED_PROXIES appends the address it received the request from to X-Forwarded-For,
+            so the client's address is the one appended by the outermost of them, counting from the right, as
+            werkzeug's ProxyFix does. The hops on its left were informed by the client and are ignored.
+
+            Parameters
+            ----------
+            environ: dict
+                WSGI environment of the request.
+
+            Returns
+            ----------
+            str
+        """
+        config = self.app.config
+        key = environ.get('HTTP_X_API_KEY')
+        if key and key in config['ADMISSION_API_KEYS']:
+            return 'key:' + key
+        proxies = config['ADMISSION_TRUSTED_PROXIES']
+        if proxies:
+            forwarded = [hop.strip() for hop in environ.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+            if len(forwarded) >= proxies and forwarded[-proxies]:
+                return 'addr:' + forwarded[-proxies]
+        return 'addr:' + environ.get('REMOTE_ADDR', '')
+
+    @staticmethod
+    def queue_time(environ):
+        """
+            Method to measure the seconds a request waited before reaching the application, from the X-Request-Start
+            header set by the proxy in seconds, milliseconds or microseconds since the epoch, optionally prefixed by t=.
+
+            Parameters
+            ----------
+            environ: dict
+                WSGI environment of the request.
+
+            Returns
+            ----------
+            float
+                Seconds in the queue, zero when the header is not informed.
+        """
+        header = environ.get('HTTP_X_REQUEST_START', '')
+        try:
+            start = float(header[2:] if header.startswith('t=') else header)
+        except ValueError:
+            return 0.0
+        while start > 1e11:
+            start /= 1000
+        return max(0.0, time.time() - start)
+
+    def state(self):
+        """
+            Method to describe the requests in flight of each class, the counters of each route and the number of
+            client buckets.
+
+            Returns
+            ----------
+            dict
+        """
+        with self._lock:
+            return {
+                'in_flight': dict(self.in_flight),
+                'clients': len(self.buckets),
+                'routes': dict((route, dict(stats)) for route, stats in self.routes.items()),
+            }
+
+    def _release(self, stats, kind):
+        with self._lock:
+            stats['in_flight'] -= 1
+            self.in_flight[kind] -= 1
+
+    def _bucket(self, key, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.app.config['ADMISSION_BURST'], now)
+            if len(self.buckets) > self.app.config['ADMISSION_MAX_CLIENTS']:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+        return bucket
+
+    @staticmethod
+    def _reject(start_response, status, message, retry_after):
+        body = json.dumps({'message': message}).encode('utf-8')
+        start_response(str(status) + (' Too Many Requests' if status == 429 else ' Service Unavailable'), [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(body))),
+            ('Retry-After', str(int(math.ceil(retry_after)))),
+        ])
+        return [body]
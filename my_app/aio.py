@@ -0,0 +1,275 @@
+"""
+    Async variant of the read path: repositories, services and resources running on an async SQLAlchemy engine.
+
+    They share the models and the compiled serializers with the sync stack and are served by the ASGI application
+    of my_app.asgi.
+"""
+from abc import ABC, abstractmethod
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.inspection import inspect
+
+from my_app.models import TeamsModel, PlayersModel
+from my_app.serializer import ModelSerializer
+
+
+class AsyncDatabase:
+    """
+        Class to hold the async engine of an ASGI application, created from its configuration.
+    """
+
+    def __init__(self):
+        self.engine = None
+
+    def init_app(self, config):
+        """
+            Method to create the async engine.
+
+            Parameters
+            ----------
+            config: BaseConfig
+                Application's configuration with ASYNC_SQLALCHEMY_DATABASE_URI and ASYNC_SQLALCHEMY_ENGINE_OPTIONS.
+        """
+        self.engine = create_async_engine(config.ASYNC_SQLALCHEMY_DATABASE_URI,
+                                          **config.ASYNC_SQLALCHEMY_ENGINE_OPTIONS)
+
+    async def dispose(self):
+        """
+            Method to close the connections of the async engine.
+        """
+        if self.engine is not None:
+            await self.engine.dispose()
+
+
+class AsyncAbstractRepository(ABC):
+    """
+        Abstract class to create async repositories for the read operations.
+    """
+
+    @property
+    @abstractmethod
+    def model_class(self):
+        """
+            String for the model's class name.
+        """
+        raise NotImplementedError
+
+    async def find(self, engine, id_):
+        """
+            Generic method to find the first entity of the repository's model according to the id.
+
+            Parameters
+            ----------
+            engine: AsyncEngine
+                Engine of the application.
+
+            id_: int
+                Entity id for its primary key.
+
+            Returns
+            ----------
+            Object
+                First entity of the repository's model found with the id.
+
+            Raises
+            ----------
+            EntityNotFound
+                If cannot be find an entity with the informed id.
+        """
+        table = self.model_class.__table__
+        async with engine.connect() as connection:
+            result = await connection.execute(select(table).where(self._primary_key() == id_))
+            row = result.first()
+
+        if row is None:
+            raise Exception('Entity not found!', 404)
+
+        return self._serializer().from_row(row)
+
+    async def all(self, engine):
+        """
+            Generic method to retrieve all entities of the repository's model.
+
+            Parameters
+            ----------
+            engine: AsyncEngine
+                Engine of the application.
+
+            Returns
+            ----------
+            list
+                All entities of the repository's model.
+        """
+        serializer = self._serializer()
+        async with engine.connect() as connection:
+            result = await connection.execute(select(self.model_class.__table__))
+            return [serializer.from_row(row) for row in result]
+
+    async def page(self, engine, limit, after=None):
+        """
+            Generic method to retrieve one page of entities using keyset pagination on the primary key.
+
+            Parameters
+            ----------
+            engine: AsyncEngine
+                Engine of the application.
+
+            limit: int
+                Maximum number of entities in the page.
+
+            after: int, optional
+                Primary key of the last entity of the previous page.
+
+            Returns
+            ----------
+            Object
+                Entities of the page and the cursor to request the next one, None if it is the last page.
+        """
+        primary_key = self._primary_key()
+        query = select(self.model_class.__table__)
+        if after is not None:
+            query = query.where(primary_key > after)
+        async with engine.connect() as connection:
+            result = await connection.execute(query.order_by(primary_key).limit(limit + 1))
+            rows = result.all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = getattr(rows[-1], primary_key.key)
+
+        serializer = self._serializer()
+        return {'data': [serializer.from_row(row) for row in rows], 'next': next_cursor}
+
+    def _serializer(self):
+        return ModelSerializer.for_model(self.model_class)
+
+    def _primary_key(self):
+        return inspect(self.model_class).primary_key[0]
+
+
+class AsyncTeamsRepository(AsyncAbstractRepository):
+
+    model_class = TeamsModel
+
+
+class AsyncPlayersRepository(AsyncAbstractRepository):
+
+    model_class = PlayersModel
+
+
+class AsyncAbstractService(ABC):
+    """
+        Abstract class to create async services for the read operations.
+    """
+
+    @property
+    @abstractmethod
+    def repository_class(self):
+        """
+            String for the repository's class name.
+        """
+        raise NotImplementedError
+
+    async def retrieve(self, id_, args, app):
+        """
+            Generic method to retrieve a entity using the repository's model.
+
+            Without an identifier, the entities are retrieved by page when 'limit' or 'after' are informed in the
+            query string.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier to be retrieved.
+
+            args: dict
+                Arguments informed in the query string.
+
+            app: AsgiApplication
+                Application with the configuration and the async engine.
+
+            Returns
+            ----------
+            Object
+                An entity found by the repository's model using the identifier.
+
+            Raises
+            ----------
+            InvalidData
+                If 'limit' or 'after' is not informed as a positive integer.
+        """
+        engine = app.extensions['async_db'].engine
+        if id_ is not None:
+            return await self.repository_class.find(engine, id_)
+
+        try:
+            limit = int(args['limit']) if 'limit' in args else None
+            after = int(args['after']) if 'after' in args else None
+            if limit is not None and limit < 1:
+                raise ValueError(limit)
+        except ValueError:
+            raise Exception('Dados não foram informados corretamente.', 400,
+                            {'message': {'limit': 'Arguments limit and after must be positive integers.'}})
+
+        if limit is None and after is None:
+            return await self.repository_class.all(engine)
+        limit = min(limit or app.config.PAGINATION_DEFAULT_LIMIT, app.config.PAGINATION_MAX_LIMIT)
+        return await self.repository_class.page(engine, limit, after)
+
+
+class AsyncTeamsService(AsyncAbstractService):
+
+    repository_class = AsyncTeamsRepository()
+
+
+class AsyncPlayersService(AsyncAbstractService):
+
+    repository_class = AsyncPlayersRepository()
+
+
+class AsyncAbstractResource(ABC):
+    """
+        Abstract class to create async resources for the read operations.
+    """
+
+    @property
+    @abstractmethod
+    def service_class(self):
+        """
+            String for the service's class name.
+        """
+        raise NotImplementedError
+
+    async def get(self, id_, args, app):
+        """
+            Generic method to handle a HTTP GET request.
+
+            Parameters
+            ----------
+            id_: int, optional
+                Entity identifier to be found.
+
+            args: dict
+                Arguments informed in the query string.
+
+            app: AsgiApplication
+                Application with the configuration and the async engine.
+
+            Returns
+            ----------
+            Object
+                First entity found by the service.
+        """
+        return await self.service_class.retrieve(id_, args, app)
+
+
+class AsyncTeamsResource(AsyncAbstractResource):
+
+    service_class = AsyncTeamsService()
+
+
+class AsyncPlayersResource(AsyncAbstractResource):
+
+    service_class = AsyncPlayersService()
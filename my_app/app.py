@@ -1,4 +1,6 @@
-from my_app import application
+from my_app import create_app
+
+application = create_app()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+"""
+    ASGI application serving the async read path.
+
+    Usage: uvicorn --factory my_app.asgi:create_app --workers 4
+
+    Each worker calls the factory, so each one creates its application and the async engine of its connections.
+"""
+import re
+from urllib.parse import parse_qsl
+
+from my_app.aio import AsyncDatabase, AsyncTeamsResource, AsyncPlayersResource
+from my_app.config import get_config
+from my_app.serializer import Serializer
+
+
+class AsgiApplication:
+    """
+        Class of a minimal ASGI application that routes GET requests to the async resources.
+
+        Like a Flask application, it keeps the objects bound to it, such as its async database, in extensions.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self.routes = []
+        self.extensions = {}
+
+    def add_resource(self, resource, path):
+        """
+            Method to route a path, with or without an entity identifier, to a resource.
+
+            Parameters
+            ----------
+            resource: AsyncAbstractResource
+                Resource to handle the requests.
+
+            path: str
+                Path of the collection.
+        """
+        self.routes.append((re.compile('^' + re.escape(path) + '(?:/(?P<id_>\\d+))?/?$'), resource))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        elif scope['type'] == 'http':
+            status, body = await self._dispatch(scope)
+            await send({'type': 'http.response.start', 'status': status,
+                        'headers': [(b'content-type', b'application/json'),
+                                    (b'access-control-allow-origin', b'*')]})
+            await send({'type': 'http.response.body', 'body': body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.extensions['async_db'].dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _dispatch(self, scope):
+        for pattern, resource in self.routes:
+            match = pattern.match(scope['path'])
+            if match:
+                break
+        else:
+            return 404, Serializer.dumps({'message': 'The requested URL was not found on the server.'})
+
+        if scope['method'] not in ('GET', 'HEAD'):
+            return 405, Serializer.dumps({'message': 'The method is not allowed for the requested URL.'})
+
+        id_ = match.group('id_')
+        args = dict(parse_qsl(scope['query_string'].decode('latin-1')))
+        try:
+            result = await resource.get(int(id_) if id_ else None, args, self)
+        except Exception as error:
+            if error.args[1:2] == (400,):
+                errors = error.args[2] if len(error.args) > 2 else {}
+                if isinstance(errors, dict) and isinstance(errors.get('message'), dict):
+                    errors = errors['message']
+                return 400, Serializer.dumps({'exception': error.args[0], 'errors': errors})
+            status = error.args[1] if len(error.args) > 1 and isinstance(error.args[1], int) else 500
+            return status, Serializer.dumps({'exception': error.args[0] if error.args else str(error)})
+        return 200, Serializer.dumps(result)
+
+
+def create_app(config=None):
+    """
+        Function to create an ASGI application with its own configuration and async engine.
+
+        Parameters
+        ----------
+        config: str or object, optional
+            Environment's name, e.g. local, or configuration object. The FLASK_ENV environment variable chooses the
+            environment when not informed.
+
+        Returns
+        ----------
+        AsgiApplication
+    """
+    application = AsgiApplication(config if config is not None and not isinstance(config, str) else get_config(config))
+    async_db = AsyncDatabase()
+    async_db.init_app(application.config)
+    application.extensions['async_db'] = async_db
+    application.add_resource(AsyncTeamsResource(), '/api/teams')
+    application.add_resource(AsyncPlayersResource(), '/api/players')
+    return application
@@ -0,0 +1,255 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from flask import current_app
+
+
+MISSING = object()
+
+_lock = threading.Lock()
+
+
+class AbstractCache(ABC):
+    """
+        Abstract class to create the cache backends of the entities read by the repositories.
+
+        A cached value of None means the entity does not exist (negative caching), while a key that is not cached
+        returns MISSING.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @abstractmethod
+    def get(self, key):
+        """
+            Method to read a value from the cache.
+
+            Parameters
+            ----------
+            key: str
+                Key of the value.
+
+            Returns
+            ----------
+            Object
+                Value cached with the key, or MISSING if the key is not cached or has expired.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        """
+            Method to write a value in the cache.
+
+            Parameters
+            ----------
+            key: str
+                Key of the value.
+
+            value: Object
+                JSON-ready value to be cached.
+
+            ttl: int
+                Seconds until the value expires.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, *keys):
+        """
+            Method to remove values from the cache.
+
+            Parameters
+            ----------
+            keys: str
+                Keys of the values.
+        """
+        raise NotImplementedError
+
+    def get_many(self, keys):
+        """
+            Method to read many values from the cache, one by one unless the backend reads them together.
+
+            Parameters
+            ----------
+            keys: list
+                Keys of the values.
+
+            Returns
+            ----------
+            list
+                Value cached with each key, or MISSING, in the order of the keys.
+        """
+        return [self.get(key) for key in keys]
+
+    def set_many(self, values, ttl):
+        """
+            Method to write many values in the cache, one by one unless the backend writes them together.
+
+            Parameters
+            ----------
+            values: dict
+                JSON-ready values to be cached, by key.
+
+            ttl: int
+                Seconds until the values expire.
+        """
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    def stats(self):
+        """
+            Method to return the counters of the cache.
+
+            Returns
+            ----------
+            dict
+        """
+        return {'backend': self.__class__.__name__, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions}
+
+
+class NullCache(AbstractCache):
+    """
+        Cache backend that never keeps a value, used when the cache is disabled.
+    """
+
+    def get(self, key):
+        self.misses += 1
+        return MISSING
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+
+class LRUCache(AbstractCache):
+    """
+        In-process cache backend bounded by size, evicting the least recently used values, and by time to live.
+
+        Each worker process has its own values, so a write in another process is only seen after the ttl expires.
+    """
+
+    def __init__(self, max_size):
+        super().__init__()
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        stats = super().stats()
+        stats.update({'size': len(self._entries), 'max_size': self.max_size})
+        return stats
+
+
+class SharedCache(AbstractCache):
+    """
+        Cache backend shared by every worker process, stored in a key-value server.
+
+        The client must provide get(key), mget(keys), set(key, value, ex=ttl) and delete(*keys) like a Redis client,
+        so any object with these methods, such as a local fake, can be used.
+    """
+
+    def __init__(self, client, prefix='my_app:'):
+        super().__init__()
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        return json.loads(value)
+
+    def get_many(self, keys):
+        values = []
+        for value in self.client.mget([self.prefix + key for key in keys]) if keys else []:
+            if value is None:
+                self.misses += 1
+                values.append(MISSING)
+            else:
+                self.hits += 1
+                values.append(json.loads(value))
+        return values
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+
+def create_cache(config):
+    """
+        Function to create the cache backend chosen by the CACHE_BACKEND setting: memory, shared or None.
+
+        Parameters
+        ----------
+        config: dict
+            Application's configuration.
+
+        Returns
+        ----------
+        AbstractCache
+    """
+    backend = config.get('CACHE_BACKEND')
+    if backend == 'memory':
+        return LRUCache(config['CACHE_MAX_SIZE'])
+    if backend == 'shared':
+        import redis
+        return SharedCache(redis.StrictRedis.from_url(config['CACHE_REDIS_URL']))
+    return NullCache()
+
+
+def get_cache():
+    """
+        Function to return the cache backend of the current application, creating it on the first call.
+
+        Returns
+        ----------
+        AbstractCache
+    """
+    cache = current_app.extensions.get('entity_cache')
+    if cache is None:
+        with _lock:
+            cache = current_app.extensions.get('entity_cache')
+            if cache is None:
+                cache = current_app.extensions['entity_cache'] = create_cache(current_app.config)
+    return cache
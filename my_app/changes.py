@@ -0,0 +1,384 @@
+"""
+    Change feed of the entities written by the repositories, so clients follow the writes instead of polling the
+    collections.
+
+    Every write logs the entities written in the changes table, in its own transaction, and the sequence number of each
+    change is the resume token of the clients. Each process keeps the latest changes in a buffer, with the entities
+    written, and reads the new ones from the database with a single query at most once every CHANGE_FEED_POLL_INTERVAL
+    seconds, or right after a write of its own is committed, on behalf of all of its clients: the load on the database
+    grows neither with the number of clients nor with how often they ask.
+
+    A sequence number missing from the log belongs to a transaction not committed yet, or rolled back, so the changes
+    after it are delivered only once they are CHANGE_FEED_SETTLE seconds old and a late commit is not skipped. The
+    changes older than CHANGE_FEED_RETENTION seconds, or beyond the latest CHANGE_FEED_MAX_ROWS, are pruned every
+    CHANGE_FEED_PRUNE_INTERVAL seconds by a background thread of each process, never by a request, or only by the
+    prune_changes command when the interval is not informed: a client resuming before them gets 410 and must read the
+    collection again.
+
+    A stream holds its thread for CHANGE_FEED_STREAM_SECONDS, so it is refused with 501 by a server that is neither
+    threaded nor asynchronous, such as gunicorn's sync workers, where each client would take a whole worker.
+"""
+import datetime
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from flask import current_app
+
+from my_app import db
+from my_app.serializer import Serializer
+
+
+logger = logging.getLogger('my_app.changes')
+
+CHANGES_GONE = 'Changes were pruned, the collection must be read again.'
+STREAMS_UNAVAILABLE = 'Streams need a threaded or asynchronous server, the changes must be polled.'
+
+
+class ChangeFeed:
+    """
+        Class of the change feed of an application, shared by the threads of its process.
+    """
+
+    def __init__(self, app, changes_repository, repositories):
+        self.app = app
+        self.changes_repository = changes_repository
+        self.repositories = dict((repository.model_class.__tablename__, repository) for repository in repositories)
+        self.buffer = deque(maxlen=app.config['CHANGE_FEED_BUFFER_SIZE'])
+        self.seq = None
+        self.pending = False
+        self.polled_at = 0.0
+        self.condition = threading.Condition()
+        self._poll_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._pruner = None
+        self._lock = threading.Lock()
+
+    def notify(self):
+        """
+            Method called after each write committed by the process, so the next read polls the log right away and
+            the waiting streams wake up.
+        """
+        self._start()
+        with self.condition:
+            self.pending = True
+            self.condition.notify_all()
+
+    def poll(self):
+        """
+            Method to read the changes logged since the last poll, with the entities written, when the poll interval
+            is over or a write of the process was committed since. One thread polls at a time, the others go on
+            reading the buffer.
+        """
+        self._start()
+        if not self._due() or not self._poll_lock.acquire(blocking=self.seq is None):
+            return
+        try:
+            if not self._due():
+                return
+            config = self.app.config
+            self.pending = False
+            self.polled_at = time.monotonic()
+            with db.get_engine(self.app).connect() as connection:
+                if self.seq is None:
+                    changes, seq = [], self.changes_repository.bounds(connection)[1] or 0
+                else:
+                    rows = self.changes_repository.after(self.seq, config['CHANGE_FEED_BATCH_SIZE'],
+                                                         connection=connection)
+                    changes = self._settled(rows)
+                    self._load(changes, connection)
+                    seq = changes[-1]['seq'] if changes else self.seq
+                    if len(changes) == config['CHANGE_FEED_BATCH_SIZE']:
+                        self.pending = True
+            with self.condition:
+                self.buffer.extend(changes)
+                self.seq = seq
+                self.condition.notify_all()
+        finally:
+            self._poll_lock.release()
+
+    def current(self):
+        """
+            Method to return the sequence number of the latest change read, where a client starts following the feed.
+
+            Returns
+            ----------
+            int
+        """
+        self.poll()
+        return self.seq
+
+    def read(self, table_name, since, limit):
+        """
+            Method to read the changes of a table after a sequence number, from the buffer when it still holds them
+            and otherwise from the log.
+
+            Parameters
+            ----------
+            table_name: str
+                Table of the changes.
+
+            since: int
+                Sequence number of the last change already read.
+
+            limit: int
+                Maximum number of changes read.
+
+            Returns
+            ----------
+            tuple
+                Changes read, each entity once with its latest change; sequence number to resume from; and whether
+                there are more changes to read.
+
+            Raises
+            ----------
+            Gone
+                If the changes after the sequence number were pruned.
+        """
+        self.poll()
+        with self.condition:
+            seq = self.seq
+            buffered = list(self.buffer) if self.buffer and since >= self.buffer[0]['seq'] - 1 else None
+        if since >= seq:
+            return [], since, False
+
+        if buffered is not None:
+            changes = [change for change in buffered if change['seq'] > since and change['table'] == table_name]
+        else:
+            changes = self._read_log(table_name, since, limit, seq)
+        more = len(changes) > limit
+        changes = changes[:limit]
+        return self._latest(changes), changes[-1]['seq'] if more else seq, more
+
+    def wait(self, since, timeout):
+        """
+            Method to wait until a change after a sequence number is read or the timeout is over.
+
+            Parameters
+            ----------
+            since: int
+                Sequence number of the last change already read.
+
+            timeout: float
+                Maximum seconds to wait.
+
+            Returns
+            ----------
+            bool
+                Whether there are changes after the sequence number.
+        """
+        deadline = time.monotonic() + timeout
+        interval = self.app.config['CHANGE_FEED_POLL_INTERVAL']
+        while True:
+            self.poll()
+            with self.condition:
+                if self.seq > since:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self.condition.wait(min(remaining, 0.01 if self.pending else interval))
+
+    def prune(self):
+        """
+            Method to prune the log. A failure is logged and retried on the next interval.
+        """
+        config = self.app.config
+        try:
+            with self.app.app_context():
+                self.changes_repository.prune(config['CHANGE_FEED_RETENTION'], config['CHANGE_FEED_MAX_ROWS'],
+                                              config['CHANGE_FEED_BATCH_SIZE'])
+        except Exception:
+            logger.exception('Change feed could not be pruned.')
+
+    def stop(self):
+        """
+            Method to stop the background thread pruning the log.
+        """
+        with self._lock:
+            if self._pruner is not None:
+                self._stopping.set()
+                self._pruner.join()
+                self._pruner = None
+                self._stopping.clear()
+
+    def _start(self):
+        """
+            Method to start the background thread pruning the log on the first use of the feed, so it is started in
+            each forked worker, unless CHANGE_FEED_PRUNE_INTERVAL is not informed.
+        """
+        if self._pruner is None and self.app.config['CHANGE_FEED_PRUNE_INTERVAL']:
+            with self._lock:
+                if self._pruner is None:
+                    self._pruner = threading.Thread(target=self._run, name='change-feed-prune', daemon=True)
+                    self._pruner.start()
+
+    def _run(self):
+        """
+            Method of the background thread, pruning the log every CHANGE_FEED_PRUNE_INTERVAL seconds until stopped.
+        """
+        while not self._stopping.wait(self.app.config['CHANGE_FEED_PRUNE_INTERVAL']):
+            self.prune()
+
+    def _due(self):
+        return self.seq is None or self.pending or \
+            time.monotonic() - self.polled_at >= self.app.config['CHANGE_FEED_POLL_INTERVAL']
+
+    def _settled(self, rows):
+        """
+            Method to keep the changes read up to the first missing sequence number whose next change is not settled.
+
+            Parameters
+            ----------
+            rows: list
+                Changes read from the log, from the oldest.
+
+            Returns
+            ----------
+            list
+                Changes that can be delivered.
+        """
+        settled_at = datetime.datetime.utcnow() - datetime.timedelta(seconds=self.app.config['CHANGE_FEED_SETTLE'])
+        changes = []
+        seq = self.seq
+        for row in rows:
+            if row.seq != seq + 1 and row.created_at > settled_at:
+                break
+            changes.append({'seq': row.seq, 'table': row.table_name, 'id': row.entity_id, 'operation': row.operation})
+            seq = row.seq
+        return changes
+
+    def _load(self, changes, connection):
+        """
+            Method to add the current values of the entities created or updated to the changes, with a single query
+            per table. The entities deleted since have None, as the deleted ones.
+
+            Parameters
+            ----------
+            changes: list
+                Changes read from the log.
+
+            connection: Connection
+                Connection to read from.
+        """
+        ids = defaultdict(set)
+        for change in changes:
+            if change['operation'] != 'delete':
+                ids[change['table']].add(change['id'])
+        entities = {}
+        for table_name, table_ids in ids.items():
+            if table_name in self.repositories:
+                entities[table_name] = self.repositories[table_name]._by_ids(sorted(table_ids), connection)
+        for change in changes:
+            change['entity'] = entities.get(change['table'], {}).get(change['id'])
+
+    def _read_log(self, table_name, since, limit, seq):
+        """
+            Method to read the changes of a table, up to a sequence number, from the log.
+
+            Returns
+            ----------
+            list
+                Up to limit plus one changes, the last one only telling that there are more.
+        """
+        with db.get_engine(self.app).connect() as connection:
+            oldest, _ = self.changes_repository.bounds(connection)
+            if oldest is None or since < oldest - 1:
+                raise Exception(CHANGES_GONE, 410)
+            rows = self.changes_repository.after(since, limit + 1, table_name, connection)
+            changes = [{'seq': row.seq, 'table': row.table_name, 'id': row.entity_id, 'operation': row.operation}
+                       for row in rows if row.seq <= seq]
+            self._load(changes, connection)
+        return changes
+
+    @staticmethod
+    def _latest(changes):
+        """
+            Method to keep only the latest change of each entity, in the order of the sequence numbers.
+        """
+        latest = OrderedDict()
+        for change in changes:
+            latest.pop(change['id'], None)
+            latest[change['id']] = change
+        return [{'seq': change['seq'], 'operation': change['operation'], 'id': change['id'],
+                 'entity': change['entity']} for change in latest.values()]
+
+
+def stream(feed, table_name, since, config):
+    """
+        Function to generate the server-sent events of the changes of a table for CHANGE_FEED_STREAM_SECONDS, after
+        which the client reconnects and resumes from the id of the last event, sent in the Last-Event-ID header. The
+        comments sent while there are no changes keep the connection open and move the id forward.
+
+        Parameters
+        ----------
+        feed: ChangeFeed
+            Change feed of the application.
+
+        table_name: str
+            Table of the changes.
+
+        since: int
+            Sequence number of the last change already read.
+
+        config: dict
+            Settings of the application.
+
+        Returns
+        ----------
+        generator
+            Text of each event. A reset event ends the stream when the changes after since were pruned.
+    """
+    yield 'retry: %d\n\n' % (config['CHANGE_FEED_RETRY'] * 1000)
+    deadline = time.monotonic() + config['CHANGE_FEED_STREAM_SECONDS']
+    while True:
+        try:
+            changes, since, more = feed.read(table_name, since, config['CHANGE_FEED_MAX_LIMIT'])
+        except Exception as exp:
+            if exp.args[1:2] != (410,):
+                raise exp
+            yield 'event: reset\ndata: %s\n\n' % Serializer.dumps({'exception': CHANGES_GONE}).decode('utf-8')
+            return
+        for change in changes:
+            yield 'id: %d\ndata: %s\n\n' % (change['seq'], Serializer.dumps(change).decode('utf-8'))
+        if more:
+            continue
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        if not feed.wait(since, min(remaining, config['CHANGE_FEED_HEARTBEAT'])):
+            yield ': keep-alive\nid: %d\n\n' % since
+
+
+def init_app(app):
+    """
+        Function to create the change feed of the application.
+
+        Parameters
+        ----------
+        app: Flask
+            Application.
+
+        Returns
+        ----------
+        ChangeFeed
+    """
+    from my_app.repositories import ChangesRepository, PlayersRepository, TeamsRepository
+
+    feed = app.extensions['change_feed'] = ChangeFeed(app, ChangesRepository(),
+                                                      [TeamsRepository(), PlayersRepository()])
+    return feed
+
+
+def get_change_feed():
+    """
+        Function to return the change feed of the current application.
+
+        Returns
+        ----------
+        ChangeFeed
+            None when the application has none.
+    """
+    return current_app.extensions.get('change_feed')
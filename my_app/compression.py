@@ -0,0 +1,144 @@
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class GzipCompressor:
+    """
+        Class to compress a response body, whole or chunk by chunk, with gzip.
+    """
+
+    encoding = 'gzip'
+
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush()
+
+
+class BrotliCompressor:
+    """
+        Class to compress a response body, whole or chunk by chunk, with brotli.
+    """
+
+    encoding = 'br'
+
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def encoded_etags(etag):
+    """
+        Function to return the strong ETags of the compressed representations of a response.
+
+        Parameters
+        ----------
+        etag: str
+            ETag of the response without compression.
+
+        Returns
+        ----------
+        list
+            ETag of each encoding.
+    """
+    return [etag + '-' + compressor_class.encoding for compressor_class in (GzipCompressor, BrotliCompressor)]
+
+
+def negotiate():
+    """
+        Function to choose the compressor from the request's Accept-Encoding, preferring brotli when it is installed.
+
+        Returns
+        ----------
+        class
+            Compressor's class, None if the client does not accept any supported encoding.
+    """
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return BrotliCompressor
+    if accepted['gzip']:
+        return GzipCompressor
+    return None
+
+
+def compress_response(response):
+    """
+        Function to compress a response body according to the request's Accept-Encoding.
+
+        Streamed responses are compressed chunk by chunk, flushing after each one so the client keeps receiving the
+        entities as they are produced. Other responses are only compressed when they have at least the number of bytes
+        of the COMPRESSION_MIN_SIZE setting. The compressed bytes are another representation, so a strong ETag gets the
+        encoding as a suffix.
+
+        Parameters
+        ----------
+        response: Response
+            Response of the current request.
+
+        Returns
+        ----------
+        Response
+    """
+    config = current_app.config
+    if not config['COMPRESSION_ENABLED'] or response.status_code < 200 or response.status_code in (204, 304) \
+            or response.mimetype not in config['COMPRESSION_MIMETYPES'] \
+            or 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    compressor_class = negotiate()
+    if compressor_class is None:
+        return response
+
+    if response.is_streamed:
+        chunks = response.response
+
+        def generate():
+            compressor = compressor_class(config['COMPRESSION_LEVEL'])
+            try:
+                for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode(response.charset)
+                    data = compressor.compress(chunk) + compressor.flush()
+                    if data:
+                        yield data
+                yield compressor.finish()
+            finally:
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+
+        response.response = generate()
+        response.headers.pop('Content-Length', None)
+    else:
+        data = response.get_data()
+        if len(data) < config['COMPRESSION_MIN_SIZE']:
+            return response
+        compressor = compressor_class(config['COMPRESSION_LEVEL'])
+        response.set_data(compressor.compress(data) + compressor.finish())
+
+    response.headers['Content-Encoding'] = compressor_class.encoding
+    etag, weak = response.get_etag()
+    if etag is not None and not weak:
+        response.set_etag(etag + '-' + compressor_class.encoding)
+    return response
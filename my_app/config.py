@@ -1,8 +1,14 @@
+import multiprocessing
 import os
 import importlib
 
-USER = os.environ['DB_USER']
-PASSWORD = os.environ['DB_PASSWORD']
+
+def _env_list(name):
+    return [value for value in os.environ.get(name, '').split(',') if value]
+
+
+def _mysql_uri(host, driver='mysql'):
+    return driver + '://' + os.environ['DB_USER'] + ':' + os.environ['DB_PASSWORD'] + '@' + host + '/flask-db'
 
 
 class BaseConfig:
@@ -11,21 +17,203 @@ class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = True
     SQLALCHEMY_DATABASE_URI = None
     HASH_SECRET_KEY = '^F3g-h2%voJlXvl2OxE78b&jL@pdkzIWVSb#^_B-FNZQsQle0MY!v0Ljy5bnhoEc'
+    PAGINATION_DEFAULT_LIMIT = 100
+    PAGINATION_MAX_LIMIT = 1000
+    STREAM_CHUNK_SIZE = 500
+    EMBED_BATCH_SIZE = 1000
+    BULK_BATCH_SIZE = 500
+    BULK_MAX_ROWS = 10000
+    TRANSFER_CHUNK_SIZE = 5000
+    CACHE_BACKEND = 'memory'
+    CACHE_MAX_SIZE = 10000
+    CACHE_TTL = 300
+    CACHE_NEGATIVE_TTL = 30
+    CACHE_REDIS_URL = None
+    JSONIFY_PRETTYPRINT_REGULAR = False
+    COMPRESSION_ENABLED = True
+    COMPRESSION_MIN_SIZE = 500
+    COMPRESSION_LEVEL = 6
+    COMPRESSION_MIMETYPES = ['application/json', 'application/x-ndjson', 'text/plain']
+    ADMISSION_ENABLED = False
+    ADMISSION_TRUSTED_PROXIES = 0
+    ADMISSION_API_KEYS = []
+    ADMISSION_EXEMPT_PATHS = ['/admission', '/metrics']
+    ADMISSION_RATE = 100
+    ADMISSION_BURST = 200
+    ADMISSION_COSTS = {'read': 1, 'write': 2, 'bulk': 20, 'stream': 1}
+    ADMISSION_MAX_IN_FLIGHT = None
+    ADMISSION_SHARES = {'read': 1.0, 'write': 0.5, 'bulk': 0.25, 'stream': 0.5}
+    ADMISSION_MAX_QUEUE_TIME = {'read': 10, 'write': 5, 'bulk': 1, 'stream': 5}
+    ADMISSION_RETRY_AFTER = 1
+    ADMISSION_MAX_CLIENTS = 100000
+    GROUP_COMMIT_ENABLED = False
+    GROUP_COMMIT_WINDOW = 0.005
+    GROUP_COMMIT_MAX_BATCH = 100
+    GROUP_COMMIT_TIMEOUT = 30
+    SLOW_QUERY_ENABLED = False
+    SLOW_QUERY_THRESHOLD = 0.1
+    SLOW_QUERY_EXPLAIN = True
+    SLOW_QUERY_TOP = 20
+    SEARCH_BACKEND = None
+    SEARCH_PRELOAD = True
+    SEARCH_DEFAULT_LIMIT = 10
+    SEARCH_MAX_LIMIT = 100
+    SEARCH_MIN_SIMILARITY = 0.5
+    SEARCH_MAX_CANDIDATES = 20000
+    SEARCH_REFRESH_INTERVAL = 1
+    SEARCH_REFRESH_OVERLAP = 5
+    CHANGE_FEED_DEFAULT_LIMIT = 100
+    CHANGE_FEED_MAX_LIMIT = 1000
+    CHANGE_FEED_BUFFER_SIZE = 10000
+    CHANGE_FEED_BATCH_SIZE = 1000
+    CHANGE_FEED_POLL_INTERVAL = 1
+    CHANGE_FEED_SETTLE = 5
+    CHANGE_FEED_RETENTION = 86400
+    CHANGE_FEED_MAX_ROWS = 1000000
+    CHANGE_FEED_PRUNE_INTERVAL = 60
+    CHANGE_FEED_STREAM_SECONDS = 25
+    CHANGE_FEED_HEARTBEAT = 10
+    CHANGE_FEED_RETRY = 1
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 280,
+        'pool_pre_ping': True,
+    }
+    SQLALCHEMY_REPLICA_URIS = []
+    REPLICA_STICKY_SECONDS = 5
+    REPLICA_RETRY_AFTER = 30
+    ASYNC_SQLALCHEMY_DATABASE_URI = None
+    ASYNC_SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_recycle': 280,
+        'pool_pre_ping': True,
+    }
+    SERVER_BIND = '0.0.0.0:5000'
+    SERVER_WORKERS = multiprocessing.cpu_count() * 2 + 1
+    SERVER_THREADS = 1
+    SERVER_TIMEOUT = 30
+    SERVER_GRACEFUL_TIMEOUT = 30
+    SERVER_KEEPALIVE = 5
+    SERVER_MAX_REQUESTS = 10000
+    SERVER_MAX_REQUESTS_JITTER = 1000
 
 
 class TestConfig(BaseConfig):
     TESTING = True
+    ADMISSION_ENABLED = False
     WTF_CSRF_ENABLED = False
     PRESERVE_CONTEXT_ON_EXCEPTION = False
-    SQLALCHEMY_DATABASE_URI = 'mysql://' + USER + ':' + PASSWORD + '@db-test/flask-db'
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return _mysql_uri('db-test')
+
+    @property
+    def ASYNC_SQLALCHEMY_DATABASE_URI(self):
+        return _mysql_uri('db-test', 'mysql+aiomysql')
 
 
 class DevelopmentConfig(BaseConfig):
     DEBUG = True
-    SQLALCHEMY_DATABASE_URI = 'mysql://' + USER + ':' + PASSWORD + '@db-dev/flask-db'
-    SQLALCHEMY_DATABASE_URI = 'mysql://' + USER + ':' + PASSWORD + '@127.0.0.1:3307/flask-db'
+    SLOW_QUERY_ENABLED = True
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return _mysql_uri('127.0.0.1:3307')
+
+    @property
+    def ASYNC_SQLALCHEMY_DATABASE_URI(self):
+        return _mysql_uri('127.0.0.1:3307', 'mysql+aiomysql')
+
+
+class ProductionConfig(BaseConfig):
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    CACHE_BACKEND = 'shared'
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return _mysql_uri(os.environ.get('DB_HOST', 'db-dev'))
+
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self):
+        return [_mysql_uri(host) for host in _env_list('DB_REPLICA_HOSTS')]
+
+    @property
+    def ASYNC_SQLALCHEMY_DATABASE_URI(self):
+        return _mysql_uri(os.environ.get('DB_HOST', 'db-dev'), 'mysql+aiomysql')
+
+    @property
+    def CACHE_REDIS_URL(self):
+        return os.environ.get('REDIS_URL', 'redis://redis:6379/0')
+
+
+class LocalConfig(BaseConfig):
+    DEBUG = True
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    ASYNC_SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return os.environ.get('DATABASE_URL', 'sqlite:////tmp/flask-db.sqlite')
+
+    @property
+    def SQLALCHEMY_REPLICA_URIS(self):
+        return _env_list('DATABASE_REPLICA_URLS')
+
+    @property
+    def ASYNC_SQLALCHEMY_DATABASE_URI(self):
+        return self.SQLALCHEMY_DATABASE_URI.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+
+    @property
+    def ADMISSION_ENABLED(self):
+        return os.environ.get('ADMISSION_ENABLED', '0') == '1'
+
+    @property
+    def ADMISSION_TRUSTED_PROXIES(self):
+        return int(os.environ.get('ADMISSION_TRUSTED_PROXIES', 0))
+
+    @property
+    def ADMISSION_API_KEYS(self):
+        return _env_list('ADMISSION_API_KEYS')
+
+    @property
+    def CACHE_BACKEND(self):
+        return 'shared' if os.environ.get('REDIS_URL') else 'memory'
+
+    @property
+    def CACHE_REDIS_URL(self):
+        return os.environ.get('REDIS_URL')
+
+    @property
+    def SERVER_THREADS(self):
+        return int(os.environ.get('SERVER_THREADS', 1))
+
+
+class BenchmarkConfig(LocalConfig):
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    ASYNC_SQLALCHEMY_DATABASE_URI = 'sqlite+aiosqlite://'
+    CACHE_BACKEND = None
+    ADMISSION_ENABLED = False
+
+
+def get_config(name=None):
+    """
+        Function to create the configuration of an environment. The environment variables it depends on are read only
+        when its settings are, so importing this module requires none of them.
 
+        Parameters
+        ----------
+        name: str, optional
+            Environment's name, e.g. local or production, the FLASK_ENV environment variable when not informed.
 
-def get_config():
+        Returns
+        ----------
+        BaseConfig
+    """
     return getattr(importlib.import_module('my_app.config'),
-                   os.environ['FLASK_ENV'].capitalize() + 'Config')
+                   (name or os.environ['FLASK_ENV']).capitalize() + 'Config')()
@@ -0,0 +1,232 @@
+import queue
+import threading
+import time
+
+from flask import current_app
+from flask_sqlalchemy import get_state
+
+
+_lock = threading.Lock()
+
+
+class Job:
+    """
+        Class of a write submitted to the group committer, with the result or the error of its execution.
+
+        A job is either started by the background thread or cancelled by the request waiting for it, never both, so a
+        request that gives up waiting never has its write committed afterwards.
+    """
+
+    def __init__(self, function, args, kwargs, after_commit):
+        self.function = function
+        self.args = args
+        self.kwargs = kwargs
+        self.after_commit = after_commit
+        self.result = None
+        self.error = None
+        self.started = False
+        self.cancelled = False
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+            Method to start the execution of the job, unless it was cancelled.
+
+            Returns
+            ----------
+            boolean
+                Whether the job must be executed.
+        """
+        with self._lock:
+            if not self.cancelled:
+                self.started = True
+            return self.started
+
+    def cancel(self):
+        """
+            Method to cancel the job, unless its execution was started.
+
+            Returns
+            ----------
+            boolean
+                Whether the job was cancelled.
+        """
+        with self._lock:
+            if not self.started:
+                self.cancelled = True
+            return self.cancelled
+
+
+class GroupCommitter:
+    """
+        Class to commit the writes of concurrent requests of the process together.
+
+        The writes are queued and executed by a background thread, each one in its own SAVEPOINT, so an error rolls back
+        only the write that raised it. The thread commits the transaction when the window has passed since the first
+        write of the batch, or when the batch is full, and then wakes up every request with its own result or error.
+
+        A write still queued when its request stops waiting, after the timeout, is cancelled and skipped by the thread.
+        A write already started is waited for until its batch is committed, so the request gets its actual outcome.
+    """
+
+    def __init__(self, app, window, max_batch, timeout):
+        self.app = app
+        self.window = window
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.batches = 0
+        self.jobs = 0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, function, *args, after_commit=None, **kwargs):
+        """
+            Method to execute a write in the next group commit and wait for its result.
+
+            Parameters
+            ----------
+            function: function
+                Write to be executed, without committing the session.
+
+            after_commit: function, optional
+                Function called with the result of the write after the transaction is committed.
+
+            Returns
+            ----------
+            Object
+                Result of the write.
+
+            Raises
+            ----------
+            Exception
+                The error raised by the write or by the commit, or the timeout when the write was cancelled before
+                being started.
+        """
+        self._start()
+        job = Job(function, args, kwargs, after_commit)
+        self._queue.put(job)
+        if not job.done.wait(self.timeout):
+            if job.cancel():
+                raise Exception('Write was not committed in ' + str(self.timeout) + ' seconds.', 503)
+            job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def stop(self):
+        """
+            Method to commit the writes already queued and stop the background thread.
+        """
+        with self._lock:
+            if self._thread is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._thread = None
+
+    def _start(self):
+        """
+            Method to start the background thread on the first write, so it is started in each forked worker.
+        """
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='group-commit', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        """
+            Method of the background thread, collecting and committing one batch of writes at a time.
+        """
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            batch = [job]
+            deadline = time.monotonic() + self.window
+            stopping = False
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+
+            self._commit(batch)
+            if stopping:
+                return
+
+    def _commit(self, batch):
+        """
+            Method to execute the writes of a batch, each one in a SAVEPOINT, and commit them in one transaction. Each
+            job is started right before its write, so the ones cancelled meanwhile, even behind a slow write of the
+            same batch, are skipped.
+
+            Parameters
+            ----------
+            batch: list
+                Jobs of the batch.
+        """
+        started = []
+        with self.app.app_context():
+            session = get_state(self.app).db.session
+            try:
+                for job in batch:
+                    if not job.start():
+                        continue
+                    started.append(job)
+                    try:
+                        with session.begin_nested():
+                            job.result = job.function(*job.args, **job.kwargs)
+                    except Exception as exp:
+                        job.error = exp
+
+                try:
+                    session.commit()
+                except Exception as exp:
+                    session.rollback()
+                    for job in started:
+                        if job.error is None:
+                            job.error = exp
+                            job.result = None
+
+                for job in started:
+                    if job.error is None and job.after_commit is not None:
+                        job.after_commit(job.result)
+            finally:
+                session.remove()
+                self.batches += 1
+                self.jobs += len(started)
+                for job in started:
+                    job.done.set()
+
+
+def get_group_committer():
+    """
+        Function to return the group committer of the current application when the GROUP_COMMIT_ENABLED setting is on,
+        creating it on the first call.
+
+        Returns
+        ----------
+        GroupCommitter
+            Group committer, None if it is disabled.
+    """
+    if not current_app.config['GROUP_COMMIT_ENABLED']:
+        return None
+    committer = current_app.extensions.get('group_committer')
+    if committer is None:
+        with _lock:
+            committer = current_app.extensions.get('group_committer')
+            if committer is None:
+                config = current_app.config
+                committer = current_app.extensions['group_committer'] = GroupCommitter(
+                    current_app._get_current_object(), config['GROUP_COMMIT_WINDOW'], config['GROUP_COMMIT_MAX_BATCH'],
+                    config['GROUP_COMMIT_TIMEOUT'])
+    return committer
@@ -0,0 +1,65 @@
+"""
+    Gunicorn settings of the production server, read from the application's configuration.
+
+    Usage: gunicorn --config python:my_app.gunicorn_config my_app.app:application
+
+    The workers are forked from a master that preloads the application and builds its in-process search indexes. The
+    engine is disposed in the master before forking and again in each worker, so no worker shares a database
+    connection. With one thread per worker the workers are sync and refuse the streams of changes, which would take a
+    whole worker each: set SERVER_THREADS above one to serve them. Sending HUP to the master reloads the workers
+    gracefully and TERM shuts them down after finishing the requests in progress.
+"""
+from my_app.config import get_config
+
+app_config = get_config()
+
+bind = app_config.SERVER_BIND
+workers = app_config.SERVER_WORKERS
+threads = app_config.SERVER_THREADS
+worker_class = 'gthread' if app_config.SERVER_THREADS > 1 else 'sync'
+timeout = app_config.SERVER_TIMEOUT
+graceful_timeout = app_config.SERVER_GRACEFUL_TIMEOUT
+keepalive = app_config.SERVER_KEEPALIVE
+max_requests = app_config.SERVER_MAX_REQUESTS
+max_requests_jitter = app_config.SERVER_MAX_REQUESTS_JITTER
+preload_app = True
+accesslog = '-'
+
+
+def _dispose_engine():
+    from my_app import db
+    from my_app.app import application
+
+    with application.app_context():
+        for bind in [None] + list(application.config.get('SQLALCHEMY_BINDS') or ()):
+            db.get_engine(application, bind=bind).dispose()
+
+
+def when_ready(server):
+    if workers > 1 and app_config.CACHE_BACKEND == 'memory':
+        server.log.warning('The memory cache is held by each of the %d workers: a write only clears the cache of its '
+                           'worker, the others serve the old entities until CACHE_TTL. Set REDIS_URL to share the '
+                           'cache.', workers)
+    from my_app import search
+    from my_app.app import application
+
+    search.preload(application)
+    _dispose_engine()
+
+
+def post_fork(server, worker):
+    _dispose_engine()
+
+
+def worker_exit(server, worker):
+    from my_app.app import application
+
+    committer = application.extensions.get('group_committer')
+    if committer is not None:
+        committer.stop()
+    application.extensions['change_feed'].stop()
+    _dispose_engine()
+
+
+def on_reload(server):
+    server.log.info('Reloading workers gracefully.')
@@ -0,0 +1,105 @@
+"""
+    Batch loaders of the entities of each table, scoped to the current request.
+
+    The lookups of entities by identifier made while serving a request, by the repositories, the services or the
+    serializers embedding related entities, go through the loader of their table and load function: the identifiers
+    not loaded yet are read together with a single call of the load function, and every entity read, or known not to
+    exist, is kept until the end of the request. So the same entity is never read twice in a request by the same load
+    function, however many entities refer to it.
+"""
+from collections import OrderedDict
+
+from flask import g, has_request_context
+
+
+class BatchLoader:
+    """
+        Class to load the entities of a table by identifier, merging the lookups.
+    """
+
+    def __init__(self, load):
+        self.load = load
+        self.entities = {}
+
+    def load_many(self, ids):
+        """
+            Method to return the entities with the identifiers, reading the ones not loaded yet with a single call of
+            the load function.
+
+            Parameters
+            ----------
+            ids: iterable
+                Identifiers of the entities.
+
+            Returns
+            ----------
+            dict
+                Entities found, by identifier.
+        """
+        ids = list(ids)
+        missing = list(OrderedDict.fromkeys(id_ for id_ in ids if id_ not in self.entities))
+        if missing:
+            found = self.load(missing)
+            for id_ in missing:
+                self.entities[id_] = found.get(id_)
+        return dict((id_, self.entities[id_]) for id_ in ids if self.entities[id_] is not None)
+
+    def forget(self, ids):
+        """
+            Method to drop the entities written, so they are read again by the next lookup.
+
+            Parameters
+            ----------
+            ids: iterable
+                Identifiers of the entities.
+        """
+        for id_ in ids:
+            self.entities.pop(id_, None)
+
+
+def get_loader(name, load):
+    """
+        Function to return the loader of a table and load function in the current request, creating it on the first
+        call. Outside a request every call returns a new loader.
+
+        Parameters
+        ----------
+        name: str
+            Table of the entities.
+
+        load: function
+            Function reading the entities with a list of identifiers and returning the ones found, by identifier. The
+            lookups share a loader only when they pass equal functions, such as the same bound method, so each one
+            reads with its own function whatever the order of the lookups.
+
+        Returns
+        ----------
+        BatchLoader
+    """
+    if not has_request_context():
+        return BatchLoader(load)
+    loaders = g.setdefault('loaders', {})
+    loader = loaders.get((name, load))
+    if loader is None:
+        loader = loaders[(name, load)] = BatchLoader(load)
+    return loader
+
+
+def forget(name, ids):
+    """
+        Function to drop the entities written from the loaders of a table in the current request.
+
+        Parameters
+        ----------
+        name: str
+            Table of the entities.
+
+        ids: iterable
+            Identifiers of the entities.
+    """
+    if not has_request_context():
+        return
+    ids = list(ids)
+    for (loader_name, _), loader in g.get('loaders', {}).items():
+        if loader_name == name:
+            loader.forget(ids)
@@ -0,0 +1,199 @@
+"""
+    Per-request performance instrumentation: wall time per phase, SQL statements and rows, reported in the
+    Server-Timing header and aggregated in latency histograms exposed in the Prometheus text format.
+
+    The histograms are kept by each worker process.
+"""
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PHASES = ('validate', 'db', 'serialize', 'search')
+
+_lock = threading.Lock()
+_durations = {}
+_phases = defaultdict(float)
+_statements = defaultdict(int)
+_rows = defaultdict(int)
+_responses = defaultdict(int)
+
+
+@contextmanager
+def phase(name):
+    """
+        Function to measure the wall time of a phase of the current request.
+
+        Parameters
+        ----------
+        name: str
+            Phase's name: validate, db, serialize or search.
+    """
+    if not has_request_context() or 'timings' not in g:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.timings[name] += time.perf_counter() - start
+
+
+def timed(name):
+    """
+        Decorator to measure the wall time of a method as a phase of the current request.
+
+        Parameters
+        ----------
+        name: str
+            Phase's name: validate, db, serialize or search.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_rows(count):
+    """
+        Function to count the rows read by the current request.
+
+        Parameters
+        ----------
+        count: int
+            Number of rows.
+    """
+    if has_request_context() and 'timings' in g:
+        g.rows += count
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'timings' in g:
+        g.statement_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+    if has_request_context() and 'statement_start' in g:
+        g.timings['db'] += time.perf_counter() - g.pop('statement_start')
+        g.statements += 1
+
+
+def start_request():
+    """
+        Function to start the instrumentation of the current request.
+    """
+    g.request_start = time.perf_counter()
+    g.timings = defaultdict(float)
+    g.statements = 0
+    g.rows = 0
+
+
+def finish_request(response):
+    """
+        Function to add the Server-Timing header to the response and record the request in the histograms.
+
+        Parameters
+        ----------
+        response: Response
+            Response of the current request.
+
+        Returns
+        ----------
+        Response
+    """
+    if 'request_start' not in g:
+        return response
+
+    total = time.perf_counter() - g.request_start
+    timing = ['total;dur=%.2f' % (total * 1000)]
+    for name in PHASES:
+        timing.append('%s;dur=%.2f' % (name, g.timings[name] * 1000))
+    timing.append('sql;desc="%d statements"' % g.statements)
+    timing.append('rows;desc="%d rows"' % g.rows)
+    response.headers['Server-Timing'] = ', '.join(timing)
+
+    key = (request.url_rule.rule if request.url_rule else 'unmatched', request.method)
+    with _lock:
+        histogram = _durations.get(key)
+        if histogram is None:
+            histogram = _durations[key] = [[0] * len(BUCKETS), 0, 0.0]
+        for index, bound in enumerate(BUCKETS):
+            if total <= bound:
+                histogram[0][index] += 1
+        histogram[1] += 1
+        histogram[2] += total
+        for name in PHASES:
+            _phases[key + (name,)] += g.timings[name]
+        _statements[key] += g.statements
+        _rows[key] += g.rows
+        _responses[key + (str(response.status_code),)] += 1
+    return response
+
+
+def _labels(**labels):
+    return '{' + ','.join('%s="%s"' % (name, str(value).replace('"', '\\"')) for name, value in labels.items()) + '}'
+
+
+def render(cache_stats=None):
+    """
+        Function to render the aggregated metrics in the Prometheus text format.
+
+        Parameters
+        ----------
+        cache_stats: dict, optional
+            Counters of the entities cache.
+
+        Returns
+        ----------
+        str
+    """
+    lines = ['# HELP http_request_duration_seconds Wall time of the requests.',
+             '# TYPE http_request_duration_seconds histogram']
+    with _lock:
+        for (route, method), (buckets, count, total) in sorted(_durations.items()):
+            for bound, value in zip(BUCKETS, buckets):
+                lines.append('http_request_duration_seconds_bucket%s %d'
+                             % (_labels(route=route, method=method, le=bound), value))
+            lines.append('http_request_duration_seconds_bucket%s %d'
+                         % (_labels(route=route, method=method, le='+Inf'), count))
+            lines.append('http_request_duration_seconds_sum%s %f' % (_labels(route=route, method=method), total))
+            lines.append('http_request_duration_seconds_count%s %d' % (_labels(route=route, method=method), count))
+
+        lines += ['# HELP http_request_phase_seconds_total Wall time of the requests by phase.',
+                  '# TYPE http_request_phase_seconds_total counter']
+        for (route, method, name), value in sorted(_phases.items()):
+            lines.append('http_request_phase_seconds_total%s %f'
+                         % (_labels(route=route, method=method, phase=name), value))
+
+        lines += ['# HELP http_request_sql_statements_total SQL statements executed by the requests.',
+                  '# TYPE http_request_sql_statements_total counter']
+        for (route, method), value in sorted(_statements.items()):
+            lines.append('http_request_sql_statements_total%s %d' % (_labels(route=route, method=method), value))
+
+        lines += ['# HELP http_request_rows_total Rows read by the requests.',
+                  '# TYPE http_request_rows_total counter']
+        for (route, method), value in sorted(_rows.items()):
+            lines.append('http_request_rows_total%s %d' % (_labels(route=route, method=method), value))
+
+        lines += ['# HELP http_responses_total Responses by status code.',
+                  '# TYPE http_responses_total counter']
+        for (route, method, status), value in sorted(_responses.items()):
+            lines.append('http_responses_total%s %d' % (_labels(route=route, method=method, status=status), value))
+
+    if cache_stats:
+        for name in ('hits', 'misses', 'evictions'):
+            lines += ['# TYPE entity_cache_%s_total counter' % name,
+                      'entity_cache_%s_total%s %d' % (name, _labels(backend=cache_stats['backend']),
+                                                      cache_stats[name])]
+    return '\n'.join(lines) + '\n'
@@ -1,9 +1,39 @@
 from datetime import datetime
 
-from sqlalchemy.orm.state import InstanceState
+from sqlalchemy import event
+from sqlalchemy.schema import DropIndex
 
 from my_app import db
-from my_app.serializer import Serializer
+from my_app.serializer import ModelSerializer
+
+
+def fulltext_index(name, *columns):
+    """
+        Function to declare a FULLTEXT index with the ngram parser, so autogenerate keeps the one created by the
+        migrations on MySQL. The other databases have no such index and create_all drops it right after creating it.
+
+        Parameters
+        ----------
+        name: str
+            Index's name.
+
+        columns: str
+            Indexed columns.
+
+        Returns
+        ----------
+        Index
+    """
+    return db.Index(name, *columns, mysql_prefix='FULLTEXT', mysql_with_parser='ngram', info={'fulltext': True})
+
+
+@event.listens_for(db.Model.metadata, 'after_create')
+def _drop_fulltext_indexes(metadata, connection, tables=(), **kwargs):
+    if connection.dialect.name != 'mysql':
+        for table in tables:
+            for index in table.indexes:
+                if index.info.get('fulltext'):
+                    connection.execute(DropIndex(index))
 
 
 class AbstractModel:
@@ -19,11 +49,7 @@ class AbstractModel:
             ----------
             {}
         """
-        json = {}
-        for key in self.to_dict():
-            if type(getattr(self, key)) is not InstanceState:
-                json[key] = Serializer.json_serialize(getattr(self, key))
-        return json
+        return ModelSerializer.for_model(self.__class__).to_json(self)
 
     def to_dict(self):
         """
@@ -50,23 +76,70 @@ class TeamsModel(db.Model, AbstractModel):
     __tablename__ = 'teams'
 
     id                = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    name              = db.Column(db.String(255), nullable=False)
+    name              = db.Column(db.String(255), nullable=False, index=True)
     city              = db.Column(db.String(255), nullable=False)
-    created_at        = db.Column(db.DateTime, default=datetime.utcnow(), nullable=False)
-    updated_at        = db.Column(db.DateTime, default=datetime.utcnow(), nullable=False)
+    created_at        = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at        = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False,
+                                  index=True)
+    version           = db.Column(db.Integer, default=1, server_default='1', nullable=False)
 
-    players = db.relationship('PlayersModel')
+    players = db.relationship('PlayersModel', back_populates='team')
+
+    __table_args__ = (fulltext_index('ft_teams_name', 'name'),)
+    __mapper_args__ = {'version_id_col': version}
 
 
 class PlayersModel(db.Model, AbstractModel):
     __tablename__ = 'players'
 
     id                = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    name              = db.Column(db.String(255))
+    name              = db.Column(db.String(255), index=True)
     age               = db.Column(db.Integer)
-    position          = db.Column(db.String(50))
-    team_id           = db.Column(db.Integer, db.ForeignKey(TeamsModel.id))
-    created_at        = db.Column(db.DateTime, default=datetime.utcnow(), nullable=False)
-    updated_at        = db.Column(db.DateTime, default=datetime.utcnow(), nullable=False)
+    position          = db.Column(db.String(50), index=True)
+    team_id           = db.Column(db.Integer, db.ForeignKey(TeamsModel.id), index=True)
+    created_at        = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at        = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False,
+                                  index=True)
+    version           = db.Column(db.Integer, default=1, server_default='1', nullable=False)
+
+    team = db.relationship(TeamsModel, back_populates='players')
+
+    __table_args__ = (fulltext_index('ft_players_name', 'name'),)
+    __mapper_args__ = {'version_id_col': version}
+
+
+class TeamStatsModel(db.Model, AbstractModel):
+    __tablename__ = 'team_stats'
+
+    team_id           = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    players           = db.Column(db.Integer, default=0, nullable=False)
+    age_sum           = db.Column(db.Integer, default=0, nullable=False)
+    age_count         = db.Column(db.Integer, default=0, nullable=False)
+
+
+class TeamPositionStatsModel(db.Model, AbstractModel):
+    __tablename__ = 'team_position_stats'
+
+    team_id           = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    position          = db.Column(db.String(50), primary_key=True)
+    players           = db.Column(db.Integer, default=0, nullable=False)
+
+
+class ChangesModel(db.Model, AbstractModel):
+    __tablename__ = 'changes'
+
+    seq               = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True,
+                                  autoincrement=True)
+    table_name        = db.Column(db.String(50), nullable=False)
+    entity_id         = db.Column(db.Integer, nullable=False)
+    operation         = db.Column(db.String(10), nullable=False)
+    created_at        = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    __table_args__ = (db.Index('ix_changes_table_name_seq', 'table_name', 'seq'),)
+
+
+class TableVersionsModel(db.Model, AbstractModel):
+    __tablename__ = 'table_versions'
 
-    team = db.relationship(TeamsModel)
+    table_name        = db.Column(db.String(50), primary_key=True)
+    version           = db.Column(db.BigInteger, default=0, nullable=False)
@@ -0,0 +1,184 @@
+import logging
+import re
+import threading
+import time
+
+from flask import has_request_context, request
+from sqlalchemy import event
+
+
+logger = logging.getLogger('my_app.profiler')
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_placeholders = re.compile(r'(?:\?|%s|:\w+)(?:\s*,\s*(?:\?|%s|:\w+))+')
+_spaces = re.compile(r'\s+')
+
+
+class QueryProfiler:
+    """
+        Class to profile the statements executed by an engine.
+
+        Every statement is aggregated by its fingerprint, the statement with literals and lists of parameters
+        replaced by placeholders. Statements slower than the threshold are logged with their parameters, calling
+        route and duration, and the first slow statement of each fingerprint is explained.
+    """
+
+    def __init__(self, threshold, explain=True, top=20, max_fingerprints=1000):
+        self.threshold = threshold
+        self.explain = explain
+        self.top = top
+        self.max_fingerprints = max_fingerprints
+        self.statements = {}
+        self._lock = threading.Lock()
+
+    def init_engine(self, engine):
+        """
+            Method to attach the profiler to the cursor execute and error events of an engine.
+
+            Parameters
+            ----------
+            engine: Engine
+                Engine to be profiled.
+        """
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    @staticmethod
+    def fingerprint(statement):
+        """
+            Method to normalize a statement, so statements with the same shape have the same fingerprint.
+
+            Parameters
+            ----------
+            statement: str
+                SQL statement.
+
+            Returns
+            ----------
+            str
+        """
+        statement = _literals.sub('?', statement)
+        statement = _placeholders.sub('?...', statement)
+        return _spaces.sub(' ', statement).strip()
+
+    def _before_cursor_execute(self, connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault('query_start', []).append(time.perf_counter())
+
+    @staticmethod
+    def _handle_error(context):
+        # A failed statement never reaches after_cursor_execute, so its start is dropped here.
+        if context.connection is not None and context.connection.info.get('query_start'):
+            context.connection.info['query_start'].pop()
+
+    def _after_cursor_execute(self, connection, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - connection.info['query_start'].pop()
+        fingerprint = self.fingerprint(statement)
+        slow = duration >= self.threshold
+
+        with self._lock:
+            stats = self.statements.get(fingerprint)
+            if stats is None:
+                if len(self.statements) >= self.max_fingerprints:
+                    return
+                stats = self.statements[fingerprint] = {'fingerprint': fingerprint, 'count': 0, 'slow': 0,
+                                                        'total': 0.0, 'max': 0.0, 'explain': None}
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['max'] = max(stats['max'], duration)
+            if slow:
+                stats['slow'] += 1
+            explain = slow and self.explain and not executemany and stats['explain'] is None
+
+        if not slow:
+            return
+
+        route = request.method + ' ' + request.path if has_request_context() else None
+        logger.warning('Slow query (%.2f ms) on %s: %s; parameters: %.1000r',
+                       duration * 1000, route, statement, parameters)
+        if explain:
+            plan = self._explain(connection, statement, parameters)
+            with self._lock:
+                stats['explain'] = plan
+
+    @staticmethod
+    def _explain(connection, statement, parameters):
+        """
+            Method to run EXPLAIN on a statement with the DBAPI cursor of the connection, so it is not profiled.
+
+            Parameters
+            ----------
+            connection: Connection
+                Connection which executed the statement.
+
+            statement: str
+                SQL statement.
+
+            parameters: tuple or dict
+                Parameters of the statement.
+
+            Returns
+            ----------
+            list
+                Rows of the execution plan, or the error message if the statement cannot be explained.
+        """
+        if not statement.lstrip().upper().startswith('SELECT'):
+            return None
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.dialect.name == 'sqlite' else 'EXPLAIN '
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [[str(value) for value in row] for row in cursor.fetchall()]
+        except Exception as exp:
+            return [str(exp)]
+        finally:
+            cursor.close()
+
+    def report(self):
+        """
+            Method to return the fingerprints with the largest total time.
+
+            Returns
+            ----------
+            list
+        """
+        with self._lock:
+            statements = sorted(self.statements.values(), key=lambda stats: stats['total'], reverse=True)
+            return [dict(stats, mean=stats['total'] / stats['count']) for stats in statements[:self.top]]
+
+    def reset(self):
+        """
+            Method to clear the aggregated statements.
+        """
+        with self._lock:
+            self.statements.clear()
+
+
+def init_app(app, db):
+    """
+        Function to attach a query profiler to the application's engines, the primary and every bind such as the
+        replicas, when the SLOW_QUERY_ENABLED setting is on.
+
+        Parameters
+        ----------
+        app: Flask
+            Application.
+
+        db: SQLAlchemy
+            Database of the application.
+
+        Returns
+        ----------
+        QueryProfiler
+            Profiler attached to the engine, None if it is disabled.
+    """
+    if not app.config.get('SLOW_QUERY_ENABLED'):
+        return None
+
+    profiler = QueryProfiler(app.config['SLOW_QUERY_THRESHOLD'], app.config['SLOW_QUERY_EXPLAIN'],
+                             app.config['SLOW_QUERY_TOP'])
+    with app.app_context():
+        for bind in [None] + list(app.config.get('SQLALCHEMY_BINDS') or ()):
+            profiler.init_engine(db.get_engine(app, bind=bind))
+    app.extensions['query_profiler'] = profiler
+    return profiler
@@ -1,13 +1,209 @@
+import base64
 import datetime
 import json
 import re
 from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, defaultdict
+from functools import lru_cache
 
+from flask import current_app
+from sqlalchemy import DateTime, and_, bindparam, event, func, null, or_, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm.exc import StaleDataError
 
+from my_app.cache import MISSING, get_cache
+from my_app.changes import get_change_feed
+from my_app.loaders import forget, get_loader
+from my_app.metrics import add_rows, phase
 from my_app.models import db
-from my_app.models import TeamsModel, PlayersModel
+from my_app.models import TeamsModel, PlayersModel, TeamStatsModel, TeamPositionStatsModel, ChangesModel
+from my_app.models import TableVersionsModel
+from my_app.routing import is_sticky, reads_from_replica
+from my_app.search import get_search
+from my_app.serializer import ModelSerializer, Serializer
+
+
+PRECONDITION_FAILED = 'Entity was modified by another request.'
+WRITE_ATTEMPTS = 3
+
+
+def increment_statement(table):
+    """
+        Function to create the INSERT statement that adds the values of each row to the existing ones, creating the
+        row when it does not exist.
+
+        Parameters
+        ----------
+        table: Table
+            Table of counters.
+
+        Returns
+        ----------
+        Insert
+
+        Raises
+        ----------
+        Exception
+            If the upsert is not supported by the database's dialect.
+    """
+    keys = [column.key for column in table.columns if not column.primary_key]
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update(
+            dict((key, table.columns[key] + statement.inserted[key]) for key in keys))
+    if dialect in ('sqlite', 'postgresql'):
+        statement = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+        return statement.on_conflict_do_update(
+            index_elements=list(table.primary_key),
+            set_=dict((key, table.columns[key] + statement.excluded[key]) for key in keys))
+    raise Exception('Upsert is not supported by the ' + dialect + ' database.')
+
+
+class ChangesRepository:
+    """
+        Class to log the entities written by the repositories, in the transaction of each write, with an increasing
+        sequence number per change.
+
+        The change is inserted before the commit rather than by an after-commit hook, so it is committed if and only if
+        the write is: a change logged after the commit would be lost by a crash between both, and a client following
+        the log would never see that write.
+
+        Each write also increments the version of its table, the collection's ETag. Unlike the sequence numbers, which
+        are taken before the commit and may become visible out of order, the versions of a table are incremented one
+        commit at a time, by the lock on its row, so a version read always identifies the writes committed.
+    """
+
+    table = ChangesModel.__table__
+    versions_table = TableVersionsModel.__table__
+
+    def record(self, table_name, operation, ids):
+        """
+            Method to log the entities written, with a single executemany INSERT statement in the current transaction,
+            and to increment the version of their table.
+
+            Parameters
+            ----------
+            table_name: str
+                Table of the entities.
+
+            operation: str
+                create, update, upsert or delete.
+
+            ids: iterable
+                Identifiers of the entities written.
+        """
+        now = datetime.datetime.utcnow()
+        rows = [{'table_name': table_name, 'entity_id': id_, 'operation': operation, 'created_at': now}
+                for id_ in ids]
+        if rows:
+            db.session.execute(self.table.insert(), rows)
+            db.session.execute(increment_statement(self.versions_table), {'table_name': table_name, 'version': 1})
+
+    def version(self, table_name):
+        """
+            Method to read the version of a table, by its primary key.
+
+            Parameters
+            ----------
+            table_name: str
+                Table of the entities.
+
+            Returns
+            ----------
+            int
+                Number of writes committed on the table, zero before the first one.
+        """
+        query = select(self.versions_table.c.version).where(self.versions_table.c.table_name == table_name)
+        return db.session.execute(query).scalar() or 0
+
+    def after(self, seq, limit, table_name=None, connection=None):
+        """
+            Method to read the changes logged after a sequence number, from the oldest.
+
+            Parameters
+            ----------
+            seq: int
+                Sequence number of the last change already read.
+
+            limit: int
+                Maximum number of changes read.
+
+            table_name: str, optional
+                Table of the changes, every table when not informed.
+
+            connection: Connection, optional
+                Connection to read from, the session when not informed.
+
+            Returns
+            ----------
+            list
+                Rows with the seq, table_name, entity_id, operation and created_at of each change.
+        """
+        query = select(self.table.c.seq, self.table.c.table_name, self.table.c.entity_id, self.table.c.operation,
+                       self.table.c.created_at) \
+            .where(self.table.c.seq > seq) \
+            .order_by(self.table.c.seq) \
+            .limit(limit)
+        if table_name is not None:
+            query = query.where(self.table.c.table_name == table_name)
+        return (connection or db.session).execute(query).fetchall()
+
+    def bounds(self, connection=None):
+        """
+            Method to read the sequence numbers of the oldest and of the newest change logged.
+
+            Parameters
+            ----------
+            connection: Connection, optional
+                Connection to read from, the session when not informed.
+
+            Returns
+            ----------
+            tuple
+                Oldest and newest sequence numbers, both None when the log is empty.
+        """
+        query = select(func.min(self.table.c.seq), func.max(self.table.c.seq))
+        return tuple((connection or db.session).execute(query).one())
+
+    def prune(self, retention, max_rows, batch_size):
+        """
+            Method to delete the changes older than the retention or beyond the newest max_rows, in batches, each one
+            in its own transaction so the log is never locked for long.
+
+            Parameters
+            ----------
+            retention: int
+                Seconds a change is kept.
+
+            max_rows: int
+                Maximum number of changes kept.
+
+            batch_size: int
+                Number of changes deleted on each statement.
+
+            Returns
+            ----------
+            int
+                Number of changes deleted.
+        """
+        expired = datetime.datetime.utcnow() - datetime.timedelta(seconds=retention)
+        with db.engine.connect() as connection:
+            oldest, newest = self.bounds(connection)
+            if newest is None:
+                return 0
+            cutoff = connection.execute(select(func.max(self.table.c.seq))
+                                        .where(self.table.c.created_at < expired)).scalar() or 0
+            cutoff = max(cutoff, newest - max_rows)
+
+        deleted = 0
+        for start in range(oldest, cutoff + 1, batch_size):
+            with db.engine.begin() as connection:
+                deleted += connection.execute(self.table.delete().where(
+                    self.table.c.seq <= min(cutoff, start + batch_size - 1))).rowcount
+        return deleted
 
 
 class AbstractRepository(ABC):
@@ -15,69 +211,1264 @@ class AbstractRepository(ABC):
         Abstract class to create repositories.
     """
 
-    @property
-    @abstractmethod
-    def model_class(self):
+    @property
+    @abstractmethod
+    def model_class(self):
+        """
+            String for the model's class name.
+        """
+        raise NotImplementedError
+
+    changes_repository = ChangesRepository()
+
+    def get_model_columns(self):
+        """
+            Method to return a list with the columns of the repository's model.
+
+            Returns
+            ----------
+            list
+                String list with the repository's model columns.
+        """
+        return [m.key for m in self.model_class.__table__.columns]
+
+    def commit(self):
+        return db.session.commit()
+
+    def rollback(self):
+        return db.session.rollback()
+
+    @property
+    def filterable_columns(self):
+        """
+            String list of the columns that can be used to filter the entities.
+        """
+        return []
+
+    @property
+    def sortable_columns(self):
+        """
+            String list of the columns that can be used to sort the entities.
+        """
+        return [self._primary_key().key]
+
+    @property
+    def tracked_columns(self):
+        """
+            List of the columns whose values before and after each write are passed to _on_write.
+        """
+        return []
+
+    @property
+    def search_columns(self):
+        """
+            String list of the columns whose text is matched by the search.
+        """
+        return []
+
+    def get_relationships(self):
+        """
+            Method to return a list with the relationships of the repository's model that can be embedded.
+
+            Returns
+            ----------
+            list
+                String list with the repository's model relationships.
+        """
+        return inspect(self.model_class.__class__).relationships.keys()
+
+    def find(self, id_, embed=(), fields=None):
+        """
+            Generic method to find the first entity of the repository's model according to the id.
+
+            The serialized entity is read through the loader of the request, as by find_version, and the cache, which
+            also keeps the identifiers that cannot be found. The cache is skipped while the request is sticky and only
+            filled with the rows read from the primary, so a client always reads its own writes.
+
+            Parameters
+            ----------
+            id_: int
+                Entity id for its primary key.
+
+            embed: list, optional
+                Relationships to be embedded in the entity.
+
+            fields: list, optional
+                Columns to be serialized, besides the primary key and the keys of the embedded relationships.
+
+            Returns
+            ----------
+            Object
+                First entity of the repository's model found with the id.
+
+            Raises
+            ----------
+            EntityNotFound
+                If cannot be find an entity with the informed id.
+        """
+        entity = self.loader().load_many([id_]).get(id_)
+        if entity is None:
+            raise Exception('Entity not found!', 404)
+
+        if fields:
+            entity = dict((column.key, entity[column.key]) for column in self._columns(fields, embed))
+        else:
+            entity = dict(entity)
+        self._embed([entity], embed)
+        return entity
+
+    def find_many(self, ids, embed=(), fields=None):
+        """
+            Generic method to find the entities of the repository's model with the identifiers.
+
+            The entities are read through the cache and the loader of the request, so the ones not cached are read
+            with a single IN query and none of them is read twice in the same request.
+
+            Parameters
+            ----------
+            ids: list
+                Entities' ids for their primary key. Repeated ids are found once.
+
+            embed: list, optional
+                Relationships to be embedded in the entities.
+
+            fields: list, optional
+                Columns to be serialized, besides the primary key and the keys of the embedded relationships.
+
+            Returns
+            ----------
+            tuple
+                Entities found, in the order of the ids, and the ids that cannot be found.
+        """
+        ids = list(OrderedDict.fromkeys(ids))
+        found = self.loader().load_many(ids)
+        keys = [column.key for column in self._columns(fields, embed) or self.model_class.__table__.columns]
+        entities = [dict((key, found[id_][key]) for key in keys) for id_ in ids if id_ in found]
+        self._embed(entities, embed)
+        return entities, [id_ for id_ in ids if id_ not in found]
+
+    def find_version(self, id_):
+        """
+            Generic method to find the version of an entity of the repository's model and when it was last updated.
+
+            The entity is read through the loader of the request, so the find of the same request reads it no more.
+
+            Parameters
+            ----------
+            id_: int
+                Entity id for its primary key.
+
+            Returns
+            ----------
+            tuple
+                Entity's version and updated_at.
+
+            Raises
+            ----------
+            EntityNotFound
+                If cannot be find an entity with the informed id.
+        """
+        entity = self.loader().load_many([id_]).get(id_)
+        if entity is None:
+            raise Exception('Entity not found!', 404)
+        return entity['version'], Serializer.parse_datetime(entity['updated_at'])
+
+    def loader(self):
+        """
+            Generic method to return the loader of the request reading the entities of the repository's model through
+            the cache, shared by the lookups of the repositories, the services and the serializers.
+
+            Returns
+            ----------
+            BatchLoader
+        """
+        return get_loader(self.model_class.__tablename__, self._load_by_ids)
+
+    def collection_version(self):
+        """
+            Generic method to read the version of all entities of the repository's model, incremented by each write,
+            with a single primary key lookup.
+
+            Returns
+            ----------
+            int
+        """
+        return self.changes_repository.version(self.model_class.__tablename__)
+
+    def related_version(self, relationship):
+        """
+            Generic method to read the version of all entities of a relationship's model, incremented by each write,
+            with a single primary key lookup.
+
+            Parameters
+            ----------
+            relationship: str
+                Relationship of the repository's model.
+
+            Returns
+            ----------
+            int
+        """
+        table = inspect(self.model_class.__class__).relationships[relationship].mapper.local_table
+        return self.changes_repository.version(table.name)
+
+    def search(self, query, limit):
+        """
+            Generic method to find the entities of the repository's model whose search columns match a text: first
+            the ones starting with it, then the ones with a word starting with it and last the approximate matches.
+
+            Parameters
+            ----------
+            query: str
+                Text searched.
+
+            limit: int
+                Maximum number of entities found.
+
+            Returns
+            ----------
+            list
+                Entities found, from the best match.
+        """
+        search = get_search(self)
+        with phase('search'):
+            ids = search.search(query, limit)
+        if not ids:
+            return []
+
+        entities = self._by_ids(ids)
+        search.discard([id_ for id_ in ids if id_ not in entities])
+        return [entities[id_] for id_ in ids if id_ in entities]
+
+    def all(self, embed=(), fields=None, filters=None, sort=None):
+        """
+            Generic method to retrieve all entities of the repository's model.
+
+            Parameters
+            ----------
+            embed: list, optional
+                Relationships to be embedded in each entity.
+
+            fields: list, optional
+                Columns to be selected and serialized, besides the primary key and the keys of the embedded
+                relationships.
+
+            filters: dict, optional
+                Values accepted for each filterable column.
+
+            sort: list, optional
+                Sortable columns and whether each one is sorted in descending order.
+
+            Returns
+            ----------
+            list
+                All entities of the repository's model.
+        """
+        columns = self._columns(fields, embed, sort)
+        query = self._filter(self._rows_query(columns), filters)
+        if sort:
+            order = self._order(sort)
+            query = query.order_by(*[column.desc() if descending else column for column, descending in order])
+
+        rows = query.all()
+        add_rows(len(rows))
+        serializer = self._serializer(columns)
+        with phase('serialize'):
+            array = [serializer.from_row(row) for row in rows]
+        self._embed(array, embed)
+        return array
+
+    def page(self, limit, after=None, embed=(), fields=None, filters=None, sort=None):
+        """
+            Generic method to retrieve one page of entities using keyset pagination.
+
+            The keyset is the primary key, or the sorted columns followed by the primary key when sort is informed,
+            in which case the cursor is an opaque token.
+
+            Parameters
+            ----------
+            limit: int
+                Maximum number of entities in the page.
+
+            after: int or str, optional
+                Cursor of the last entity of the previous page.
+
+            embed: list, optional
+                Relationships to be embedded in each entity.
+
+            fields: list, optional
+                Columns to be selected and serialized, besides the primary key and the keys of the embedded
+                relationships.
+
+            filters: dict, optional
+                Values accepted for each filterable column.
+
+            sort: list, optional
+                Sortable columns and whether each one is sorted in descending order.
+
+            Returns
+            ----------
+            Object
+                Entities of the page and the cursor to request the next one, None if it is the last page.
+        """
+        order = self._order(sort)
+        columns = self._columns(fields, embed, sort)
+        rows = self._keyset_query(columns, order, filters, after).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._cursor(order, rows[-1])
+
+        add_rows(len(rows))
+        serializer = self._serializer(columns)
+        with phase('serialize'):
+            entities = [serializer.from_row(row) for row in rows]
+        self._embed(entities, embed)
+        return {'data': entities, 'next': next_cursor}
+
+    def stream(self, chunk_size, after=None, embed=(), fields=None, filters=None, sort=None):
+        """
+            Generic method to iterate over all entities of the repository's model reading them in chunks.
+
+            Each chunk is a keyset query, so only one chunk is held in memory at a time whatever the size of the
+            table.
+
+            Parameters
+            ----------
+            chunk_size: int
+                Number of rows fetched from the database on each query.
+
+            after: int or str, optional
+                Cursor to start the iteration after.
+
+            embed: list, optional
+                Relationships to be embedded in each entity, loaded once per chunk.
+
+            fields: list, optional
+                Columns to be selected and serialized, besides the primary key and the keys of the embedded
+                relationships.
+
+            filters: dict, optional
+                Values accepted for each filterable column.
+
+            sort: list, optional
+                Sortable columns and whether each one is sorted in descending order.
+
+            Returns
+            ----------
+            generator
+                Entities serialized one by one.
+        """
+        order = self._order(sort)
+        columns = self._columns(fields, embed, sort)
+        serializer = self._serializer(columns)
+        while True:
+            rows = self._keyset_query(columns, order, filters, after).limit(chunk_size).all()
+            if not rows:
+                return
+
+            after = self._cursor(order, rows[-1])
+            add_rows(len(rows))
+            with phase('serialize'):
+                entities = [serializer.from_row(row) for row in rows]
+            self._embed(entities, embed)
+            for entity in entities:
+                yield entity
+
+            if len(rows) < chunk_size:
+                return
+
+    def bulk_create(self, rows, batch_size):
+        """
+            Generic method to persist many entities of the repository's model in a single transaction.
+
+            The rows are written with batched executemany INSERT statements, each one in a SAVEPOINT, and committed at
+            the end. When a batch raises an integrity error, its SAVEPOINT is rolled back and its rows are written
+            again one by one, each one in its own SAVEPOINT, so only the rows that raise it are not persisted.
+
+            Parameters
+            ----------
+            rows: list
+                Entities' values to be persisted, all of them with the same columns.
+
+            batch_size: int
+                Number of rows sent on each INSERT statement.
+
+            Returns
+            ----------
+            list
+                Integrity error of each row, None for the ones persisted.
+        """
+        table = self.model_class.__table__
+        primary_key = self._primary_key()
+        timestamps = self._timestamps(('created_at', 'updated_at'))
+        errors = [None] * len(rows)
+        try:
+            last_id = db.session.query(func.max(primary_key)).scalar() or 0
+            for start in range(0, len(rows), batch_size):
+                batch = [dict(row, **timestamps) for row in rows[start:start + batch_size]]
+                try:
+                    with db.session.begin_nested():
+                        db.session.execute(table.insert(), batch)
+                except IntegrityError:
+                    for index, values in enumerate(batch, start):
+                        try:
+                            with db.session.begin_nested():
+                                db.session.execute(table.insert(), values)
+                        except IntegrityError as exp1:
+                            errors[index] = 'Entity cannot be created. Integrity_error' + json.dumps(exp1.orig.args)
+            new_ids = [id_ for id_, in db.session.query(primary_key).filter(primary_key > last_id)]
+            if self.tracked_columns:
+                self._on_write([], [row for row, error in zip(rows, errors) if error is None])
+            self._record('create', new_ids)
+        except Exception as exp2:
+            db.session.rollback()
+            raise exp2
+        else:
+            db.session.commit()
+            self._invalidate(new_ids)
+            return errors
+
+    def bulk_update(self, rows, batch_size):
+        """
+            Generic method to update many entities of the repository's model in a single transaction.
+
+            The existing identifiers are read with a single query, then the rows are written with batched executemany
+            UPDATE statements, one per group of rows informing the same columns, and committed at the end. The rows
+            of the same entity are merged into one.
+
+            When the repository has tracked_columns, they are read with the versions and each UPDATE is keyed on the
+            version read too, so the values read are the ones replaced. If a concurrent write changes a version in
+            between, the transaction is rolled back and the entities are read and written again, up to WRITE_ATTEMPTS
+            times.
+
+            Parameters
+            ----------
+            rows: list
+                Entities' values to be updated, each one with its primary key.
+
+            batch_size: int
+                Number of rows sent on each UPDATE statement.
+
+            Returns
+            ----------
+            set
+                Identifiers of the entities updated, the others cannot be found.
+
+            Raises
+            ----------
+            EntityAlreadyExists
+                If an integrity error is identified during the update process.
+
+            PreconditionFailed
+                If concurrent writes changed the versions read on every attempt.
+        """
+        primary_key = self._primary_key()
+        merged = OrderedDict()
+        for row in rows:
+            merged[row[primary_key.key]] = dict(merged.get(row[primary_key.key], {}), **row)
+        rows = list(merged.values())
+
+        table = self.model_class.__table__
+        tracked = bool(self.tracked_columns)
+        # Without a sane rowcount for executemany, the guarded rows are written one at a time to count the misses.
+        step = batch_size if not tracked or db.session.get_bind().dialect.supports_sane_multi_rowcount else 1
+        for _ in range(WRITE_ATTEMPTS if tracked else 1):
+            before, versions = self._tracked_values(list(merged), batch_size)
+            found = set(before)
+
+            groups = defaultdict(list)
+            timestamps = self._timestamps(('updated_at',))
+            for row in rows:
+                if row[primary_key.key] in found:
+                    values = dict(row, **timestamps)
+                    params = dict(('_' + key, value) for key, value in values.items())
+                    if tracked:
+                        params['_read_version'] = versions[row[primary_key.key]]
+                    groups[tuple(sorted(values))].append(params)
+
+            try:
+                written = 0
+                for keys, params in groups.items():
+                    statement = table.update() \
+                        .where(primary_key == bindparam('_' + primary_key.key)) \
+                        .values(dict(((key, bindparam('_' + key)) for key in keys if key != primary_key.key),
+                                     **self._next_version()))
+                    if tracked:
+                        statement = statement.where(table.c.version == bindparam('_read_version'))
+                    for start in range(0, len(params), step):
+                        written += db.session.execute(statement, params[start:start + step]).rowcount
+                if tracked and written < len(found):
+                    db.session.rollback()
+                    continue
+                if tracked:
+                    self._on_write(list(before.values()), self._merge_written(before, rows))
+                self._record('update', sorted(found))
+            except IntegrityError as exp1:
+                db.session.rollback()
+                raise Exception('Entities cannot be updated. Integrity_error' + json.dumps(exp1.orig.args), 409)
+            except Exception as exp2:
+                db.session.rollback()
+                raise exp2
+            else:
+                db.session.commit()
+                self._invalidate(found)
+                return found
+
+        raise Exception(PRECONDITION_FAILED, 412)
+
+    def bulk_import(self, rows, upsert=False):
+        """
+            Generic method to persist a chunk of imported entities of the repository's model in a single transaction.
+
+            Unlike bulk_create, the primary keys and creation datetimes informed in the rows are kept. The updated_at
+            of every row is the datetime of the import, whatever the file informs, so the entities written are seen as
+            modified by the conditional GETs and indexed again by the search. The rows are written with one executemany
+            INSERT statement per group of rows informing the same columns and committed at the end. With upsert, the
+            rows whose primary key already exists are updated instead, using the dialect's INSERT ... ON DUPLICATE KEY
+            UPDATE or INSERT ... ON CONFLICT DO UPDATE, which set their updated_at too.
+
+            When the repository has tracked_columns, an upsert reads them with the versions of the existing entities
+            and, after the write, verifies that each version was only incremented by its own rows. If a concurrent
+            write changed one in between, the transaction is rolled back and the chunk is read and written again, up
+            to WRITE_ATTEMPTS times.
+
+            Parameters
+            ----------
+            rows: list
+                Entities' values to be persisted.
+
+            upsert: boolean, optional
+                Flag to update the existing entities instead of failing on their primary keys.
+
+            Returns
+            ----------
+            int
+                Number of entities persisted.
+
+            Raises
+            ----------
+            EntityAlreadyExists
+                If an integrity error is identified during the import process.
+
+            PreconditionFailed
+                If concurrent writes changed the versions read on every attempt.
+        """
+        primary_key = self._primary_key()
+        timestamps = self._timestamps(('created_at', 'updated_at'))
+        groups = defaultdict(list)
+        ids = []
+        for row in rows:
+            values = dict(row)
+            if values.get('created_at') is None and 'created_at' in timestamps:
+                values['created_at'] = timestamps['created_at']
+            if 'updated_at' in timestamps:
+                values['updated_at'] = timestamps['updated_at']
+            groups[tuple(sorted(values))].append(values)
+            if values.get(primary_key.key) is not None:
+                ids.append(values[primary_key.key])
+
+        guarded = upsert and bool(self.tracked_columns)
+        counts = Counter(ids)
+        batch_size = current_app.config['BULK_BATCH_SIZE']
+        for _ in range(WRITE_ATTEMPTS if guarded else 1):
+            try:
+                before, versions = {}, {}
+                if guarded:
+                    before, versions = self._tracked_values(ids, batch_size)
+                last_id = None
+                if len(ids) < len(rows):
+                    last_id = db.session.query(func.max(primary_key)).scalar() or 0
+                for keys, params in groups.items():
+                    db.session.execute(self._insert_statement(keys, upsert), params)
+                if guarded and self._tracked_values(list(before), batch_size)[1] != \
+                        dict((id_, version + counts[id_]) for id_, version in versions.items()):
+                    db.session.rollback()
+                    continue
+                written = list(ids)
+                if last_id is not None:
+                    written.extend(id_ for id_, in db.session.query(primary_key).filter(primary_key > last_id))
+                if self.tracked_columns:
+                    new_rows = [row for row in rows if row.get(primary_key.key) not in before]
+                    self._on_write(list(before.values()), self._merge_written(before, rows) + new_rows)
+                self._record('upsert' if upsert else 'create', written)
+            except IntegrityError as exp1:
+                db.session.rollback()
+                raise Exception('Entities cannot be imported. Integrity_error' + json.dumps(exp1.orig.args), 409)
+            except Exception as exp2:
+                db.session.rollback()
+                raise exp2
+            else:
+                db.session.commit()
+                self._invalidate(written)
+                return len(rows)
+
+        raise Exception(PRECONDITION_FAILED, 412)
+
+    def export(self, chunk_size):
+        """
+            Generic method to read every entity of the repository's model with a server-side cursor.
+
+            The rows are fetched from the cursor one chunk at a time, so the table is never loaded into memory.
+
+            Parameters
+            ----------
+            chunk_size: int
+                Number of rows fetched from the cursor at a time.
+
+            Returns
+            ----------
+            generator
+                Lists of entities serialized, one per chunk.
+        """
+        table = self.model_class.__table__
+        serializer = self._serializer()
+        statement = select(*table.columns).order_by(self._primary_key())
+        result = db.session.execute(statement, execution_options={'stream_results': True})
+        try:
+            for rows in result.partitions(chunk_size):
+                yield [serializer.from_row(row) for row in rows]
+        finally:
+            result.close()
+
+    def _insert_statement(self, keys, upsert):
+        """
+            Method to create the INSERT statement of rows informing the same columns.
+
+            Parameters
+            ----------
+            keys: tuple
+                Columns informed in the rows.
+
+            upsert: boolean
+                Flag to update the columns of the existing entities instead of failing on their primary keys.
+
+            Returns
+            ----------
+            Insert
+
+            Raises
+            ----------
+            Exception
+                If the upsert is not supported by the database's dialect.
+        """
+        table = self.model_class.__table__
+        if not upsert:
+            return table.insert()
+
+        primary_key = self._primary_key()
+        keys = [key for key in keys if key not in (primary_key.key, 'created_at', 'version')]
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'mysql':
+            statement = mysql.insert(table)
+            keys = keys or [primary_key.key]
+            return statement.on_duplicate_key_update(dict(((key, statement.inserted[key]) for key in keys),
+                                                          **self._next_version()))
+        if dialect in ('sqlite', 'postgresql'):
+            statement = (sqlite if dialect == 'sqlite' else postgresql).insert(table)
+            if not keys:
+                return statement.on_conflict_do_nothing(index_elements=[primary_key])
+            return statement.on_conflict_do_update(index_elements=[primary_key],
+                                                   set_=dict(((key, statement.excluded[key]) for key in keys),
+                                                             **self._next_version()))
+        raise Exception('Upsert is not supported by the ' + dialect + ' database.')
+
+    def _on_write(self, before, after):
+        """
+            Method called in the transaction of each write, before the commit, with the values of the entities before
+            and after it. It does nothing unless overridden by a repository with tracked_columns.
+
+            Parameters
+            ----------
+            before: list
+                Values of the entities updated or deleted, before the write.
+
+            after: list
+                Values of the entities created or updated, after the write.
+        """
+
+    def _record(self, operation, ids):
+        """
+            Method called in the transaction of each write, last before the commit, to log the entities written in the
+            change feed. The short time between the sequence number being taken and the commit keeps the gaps seen by
+            the feed short.
+
+            Parameters
+            ----------
+            operation: str
+                create, update, upsert or delete.
+
+            ids: iterable
+                Identifiers of the entities written.
+        """
+        self.changes_repository.record(self.model_class.__tablename__, operation, ids)
+
+    def _tracked_values(self, ids, batch_size):
+        """
+            Method to read the current values of the tracked columns and the versions of the entities.
+
+            Parameters
+            ----------
+            ids: list
+                Identifiers of the entities.
+
+            batch_size: int
+                Number of identifiers on each query.
+
+            Returns
+            ----------
+            tuple
+                Values of each entity found and its version, None when the model has no version column, both by
+                identifier.
+        """
+        primary_key = self._primary_key()
+        table = self.model_class.__table__
+        version = table.c.version if 'version' in table.columns else null().label('version')
+        columns = [table.columns[key] for key in self.tracked_columns]
+        values = {}
+        versions = {}
+        for start in range(0, len(ids), batch_size):
+            query = db.session.query(primary_key, version, *columns) \
+                .filter(primary_key.in_(ids[start:start + batch_size]))
+            for row in query:
+                values[row[0]] = dict(zip(self.tracked_columns, row[2:]), **{primary_key.key: row[0]})
+                versions[row[0]] = row[1]
+        return values, versions
+
+    def _merge_written(self, before, rows):
+        """
+            Method to merge the values written on existing entities with their values before the write.
+
+            Parameters
+            ----------
+            before: dict
+                Values of the entities before the write, by identifier.
+
+            rows: list
+                Values written, each one with its primary key.
+
+            Returns
+            ----------
+            list
+                Values of the existing entities after the write, one per entity.
+        """
+        key = self._primary_key().key
+        after = {}
+        for row in rows:
+            id_ = row.get(key)
+            if id_ in before:
+                after[id_] = dict(after.get(id_, before[id_]), **row)
+        return list(after.values())
+
+    def _timestamps(self, columns):
+        """
+            Method to create the values of the timestamp columns that exist in the repository's model.
+
+            Parameters
+            ----------
+            columns: tuple
+                Names of the timestamp columns.
+
+            Returns
+            ----------
+            dict
+                Current UTC datetime for each timestamp column of the model.
+        """
+        now = datetime.datetime.utcnow()
+        return dict((column, now) for column in columns if column in self.model_class.__table__.columns)
+
+    def _next_version(self):
+        """
+            Method to create the value that increments the version column, when it exists in the repository's model.
+
+            Returns
+            ----------
+            dict
+                Expression of the incremented version, empty when the model has no version column.
+        """
+        table = self.model_class.__table__
+        if 'version' not in table.columns:
+            return {}
+        return {'version': table.c.version + 1}
+
+    def _write_by_id(self, id_, statement, versions=None, tracked=False):
+        """
+            Method to execute an UPDATE or DELETE statement on a single entity, keyed on its id and, when versions are
+            informed, on its version, without loading the entity first.
+
+            When tracked, the tracked columns and the version are read first and the statement is keyed on that
+            version too, so the values read are the ones replaced. If a concurrent write changes the version in
+            between, the entity is read and written again, up to WRITE_ATTEMPTS times.
+
+            Parameters
+            ----------
+            id_: int
+                Entity id for its primary key.
+
+            statement: UpdateBase
+                UPDATE or DELETE statement of the repository's table, without a WHERE clause.
+
+            versions: list, optional
+                Versions the entity must have to be written, any version when not informed.
+
+            tracked: boolean, optional
+                Flag to read the tracked columns before the write.
+
+            Returns
+            ----------
+            tuple
+                Tracked values before the write, None when not tracked, and the version replaced, None when unknown.
+
+            Raises
+            ----------
+            EntityNotFound
+                If cannot be find an entity with the informed id.
+
+            PreconditionFailed
+                If the entity's version is not one of the informed versions.
+        """
+        table = self.model_class.__table__
+        primary_key = self._primary_key()
+        statement = statement.where(primary_key == id_)
+        for _ in range(WRITE_ATTEMPTS if tracked else 1):
+            before = None
+            expected = versions
+            if tracked:
+                columns = [table.columns[key] for key in self.tracked_columns]
+                row = db.session.query(table.c.version, *columns).filter(primary_key == id_).first()
+                if row is None:
+                    raise Exception('Cannot find entity', 404)
+                if versions is not None and row[0] not in versions:
+                    raise Exception(PRECONDITION_FAILED, 412)
+                before = dict(zip(self.tracked_columns, row[1:]), **{primary_key.key: id_})
+                expected = [row[0]]
+
+            if expected is not None:
+                result = db.session.execute(statement.where(table.c.version.in_(expected)))
+            else:
+                result = db.session.execute(statement)
+            if result.rowcount:
+                return before, expected[0] if expected is not None and len(expected) == 1 else None
+
+        if db.session.query(primary_key).filter(primary_key == id_).scalar() is None:
+            raise Exception('Cannot find entity', 404)
+        raise Exception(PRECONDITION_FAILED, 412)
+
+    def _embed(self, entities, embed):
+        """
+            Method to embed the related entities of each relationship in the serialized entities.
+
+            The related entities of all serialized entities are loaded together with one IN query per relationship
+            (batched by EMBED_BATCH_SIZE), so the number of queries does not grow with the number of entities. The
+            single related entities are embedded by the serializer through a loader of the request, so each one is read
+            once per request even when embedded by several calls, such as the chunks of a stream.
+
+            Parameters
+            ----------
+            entities: list
+                Serialized entities of the repository's model, changed in place.
+
+            embed: list
+                Relationships to be embedded.
+        """
+        relationships = inspect(self.model_class.__class__).relationships
+        for name in embed:
+            relationship = relationships[name]
+            local, remote = relationship.local_remote_pairs[0]
+            if not relationship.uselist and remote.primary_key:
+                loader = get_loader(relationship.mapper.local_table.name, self._load_related(relationship))
+                ModelSerializer.embed(entities, name, local.key, loader)
+                continue
+
+            keys = list(set(entity[local.key] for entity in entities if entity[local.key] is not None))
+            related = self._related(relationship, keys)
+            for entity in entities:
+                values = related.get(entity[local.key], [])
+                if relationship.uselist:
+                    entity[name] = values
+                else:
+                    entity[name] = values[0] if values else None
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _load_related(relationship):
+        """
+            Method to return the load function of the single related entities of a relationship, by their primary key.
+            It is the same function on every call, so the embeds of a request share their loader.
+
+            Parameters
+            ----------
+            relationship: RelationshipProperty
+                Relationship of the repository's model, whose remote column is the related model's primary key.
+
+            Returns
+            ----------
+            function
         """
-            String for the model's class name.
+        def load(ids):
+            return dict((key, values[0]) for key, values in AbstractRepository._related(relationship, ids).items())
+        return load
+
+    @staticmethod
+    def _related(relationship, keys):
         """
-        raise NotImplementedError
+            Method to read the related entities of a relationship with one IN query per EMBED_BATCH_SIZE keys.
 
-    def get_model_columns(self):
+            Parameters
+            ----------
+            relationship: RelationshipProperty
+                Relationship of the repository's model.
+
+            keys: list
+                Values of the relationship's remote column.
+
+            Returns
+            ----------
+            dict
+                List of the related entities of each key, ordered by their primary key.
         """
-            Method to return a list with the columns of the repository's model.
+        local, remote = relationship.local_remote_pairs[0]
+        serializer = ModelSerializer.for_model(relationship.mapper.class_)
+        table = relationship.mapper.local_table
+        batch_size = current_app.config['EMBED_BATCH_SIZE']
+        related = defaultdict(list)
+        for start in range(0, len(keys), batch_size):
+            query = db.session.query(*table.columns) \
+                .filter(remote.in_(keys[start:start + batch_size])) \
+                .order_by(*relationship.mapper.primary_key)
+            rows = query.all()
+            add_rows(len(rows))
+            with phase('serialize'):
+                for row in rows:
+                    related_entity = serializer.from_row(row)
+                    related[related_entity[remote.key]].append(related_entity)
+        return related
+
+    def _cache_key(self, id_):
+        """
+            Method to create the cache key of an entity of the repository's model.
+
+            Parameters
+            ----------
+            id_: int
+                Entity id for its primary key.
+
+            Returns
+            ----------
+            str
+        """
+        return 'entity:' + self.model_class.__tablename__ + ':' + str(id_)
+
+    def _invalidate(self, ids):
+        """
+            Method to remove the entities written by the repository from the cache and from the loader of the request,
+            to index them again for the search and to wake the change feed up, after the write is committed.
+
+            Parameters
+            ----------
+            ids: iterable
+                Identifiers of the entities written.
+        """
+        get_cache().delete(*[self._cache_key(id_) for id_ in ids])
+        forget(self.model_class.__tablename__, ids)
+        if self.search_columns:
+            search = get_search(self, create=False)
+            if search is not None:
+                search.invalidate(ids)
+        feed = get_change_feed()
+        if feed is not None:
+            feed.notify()
+
+    def _invalidate_on_commit(self, ids):
+        """
+            Method to remove the cached entities written by the repository when the caller commits the session.
+
+            Parameters
+            ----------
+            ids: iterable
+                Identifiers of the entities written.
+        """
+        event.listen(db.session(), 'after_commit', lambda session: self._invalidate(ids), once=True)
+
+    def _filter(self, query, filters):
+        """
+            Method to add the WHERE clauses of the filters to a query.
+
+            Parameters
+            ----------
+            query: Query
+                Query of the repository's model.
+
+            filters: dict
+                Values accepted for each filterable column, one value is an equality and many an IN clause.
+
+            Returns
+            ----------
+            Query
+        """
+        columns = self.model_class.__table__.columns
+        for key, values in (filters or {}).items():
+            if len(values) == 1:
+                query = query.filter(columns[key] == values[0])
+            else:
+                query = query.filter(columns[key].in_(values))
+        return query
+
+    def _order(self, sort):
+        """
+            Method to return the keyset order: the sorted columns followed by the primary key.
+
+            Parameters
+            ----------
+            sort: list
+                Sortable columns and whether each one is sorted in descending order.
 
             Returns
             ----------
             list
-                String list with the repository's model columns.
+                Columns and whether each one is sorted in descending order.
         """
-        return [m.key for m in self.model_class.__table__.columns]
+        columns = self.model_class.__table__.columns
+        primary_key = self._primary_key()
+        order = [(columns[key], descending) for key, descending in (sort or [])]
+        if primary_key.key not in [key for key, _ in (sort or [])]:
+            order.append((primary_key, False))
+        return order
 
-    def commit(self):
-        return db.session.commit()
+    def _keyset_query(self, columns, order, filters, after):
+        """
+            Method to create the filtered and ordered query of the rows after a cursor.
 
-    def rollback(self):
-        return db.session.rollback()
+            NULL values are sorted as the lowest ones, as MySQL and SQLite do.
+
+            Parameters
+            ----------
+            columns: list
+                Columns to be selected.
+
+            order: list
+                Keyset columns and whether each one is sorted in descending order.
+
+            filters: dict
+                Values accepted for each filterable column.
+
+            after: int or str
+                Cursor of the last row already read, None to start from the first row.
+
+            Returns
+            ----------
+            Query
+        """
+        query = self._filter(self._rows_query(columns), filters)
+        if after is not None:
+            values = self._decode_cursor(order, after)
+            clauses = []
+            for index, (column, descending) in enumerate(order):
+                value = values[index]
+                if value is None:
+                    if descending:
+                        continue
+                    after_value = column.isnot(None)
+                elif descending:
+                    after_value = or_(column < value, column.is_(None))
+                else:
+                    after_value = column > value
+                equal = [previous == previous_value for (previous, _), previous_value in zip(order, values[:index])]
+                clauses.append(and_(*(equal + [after_value])))
+            query = query.filter(or_(*clauses))
+        return query.order_by(*[column.desc() if descending else column for column, descending in order])
 
-    def find(self, id_):
+    def _cursor(self, order, row):
         """
-            Generic method to find the first entity of the repository's model according to the id.
+            Method to create the cursor of a row: its primary key, or a token with its keyset values when it is sorted.
 
             Parameters
             ----------
-            id_: int
-                Entity id for its primary key.
+            order: list
+                Keyset columns and whether each one is sorted in descending order.
+
+            row: tuple
+                Last row read.
 
             Returns
             ----------
-            Object
-                First entity of the repository's model found with the id.
+            int or str
+        """
+        values = [getattr(row, column.key) for column, _ in order]
+        if len(values) == 1:
+            return values[0]
+        values = [value.isoformat() if isinstance(value, datetime.datetime) else value for value in values]
+        return base64.urlsafe_b64encode(Serializer.dumps(values)).decode('ascii')
+
+    def _decode_cursor(self, order, after):
+        """
+            Method to read the keyset values of a cursor.
+
+            Parameters
+            ----------
+            order: list
+                Keyset columns and whether each one is sorted in descending order.
+
+            after: int or str
+                Cursor created by _cursor.
+
+            Returns
+            ----------
+            list
+                Value of each keyset column.
 
             Raises
             ----------
-            EntityNotFound
-                If cannot be find an entity with the informed id.
+            InvalidData
+                If the cursor was not created for the same order.
         """
-        primary_key = inspect(self.model_class.__class__).primary_key[0]
-        entity = self.model_class.query.filter(primary_key == id_).first()
+        try:
+            if len(order) == 1:
+                return [int(after)]
+            values = json.loads(base64.urlsafe_b64decode(str(after).encode('ascii')).decode('utf-8'))
+            if not isinstance(values, list) or len(values) != len(order):
+                raise ValueError(after)
+            return [Serializer.parse_datetime(value) if value is not None and isinstance(column.type, DateTime)
+                    else value for (column, _), value in zip(order, values)]
+        except (TypeError, ValueError):
+            raise Exception('Dados não foram informados corretamente.', 400,
+                            {'message': {'after': 'Cursor \'' + str(after) + '\' is not valid for this order.'}})
 
-        if not entity:
-            raise Exception('Entity not found!')
+    def _columns(self, fields=None, embed=(), sort=None):
+        """
+            Method to return the columns of the repository's model to be selected.
 
-        return entity.to_json()
+            Parameters
+            ----------
+            fields: list, optional
+                Columns requested, all of them when not informed. The primary key, the keys of the embedded
+                relationships and the sorted columns are always selected.
 
-    def all(self):
+            embed: list, optional
+                Relationships to be embedded.
+
+            sort: list, optional
+                Sortable columns and whether each one is sorted in descending order.
+
+            Returns
+            ----------
+            list
+                Columns in the model's order, None when every column is selected.
         """
-            Generic method to retrieve all entities of the repository's model.
+        if not fields:
+            return None
+
+        relationships = inspect(self.model_class.__class__).relationships
+        keys = set(fields)
+        keys.add(self._primary_key().key)
+        keys.update(relationships[name].local_remote_pairs[0][0].key for name in embed)
+        keys.update(key for key, _ in (sort or []))
+        return [column for column in self.model_class.__table__.columns if column.key in keys]
+
+    def _by_ids(self, ids, connection=None):
+        """
+            Method to read the entities with the identifiers with a single IN query.
+
+            Parameters
+            ----------
+            ids: list
+                Identifiers of the entities.
+
+            connection: Connection, optional
+                Connection to read from, the session when not informed.
 
             Returns
             ----------
-            Object
-                First entity of the repository's model found with the id.
+            dict
+                Entities found, by identifier.
         """
-        array = [entry.to_json() for entry in self.model_class.query.all()]
-        return array
+        primary_key = self._primary_key()
+        query = select(*self.model_class.__table__.columns).where(primary_key.in_(ids))
+        rows = (connection or db.session).execute(query).fetchall()
+        add_rows(len(rows))
+        serializer = self._serializer()
+        with phase('serialize'):
+            return dict((entity[primary_key.key], entity) for entity in map(serializer.from_row, rows))
+
+    def _load_by_ids(self, ids):
+        """
+            Method to read the entities with the identifiers through the cache: the ones not cached are read with a
+            single IN query and cached, as are the identifiers that cannot be found. As in find, the cache is skipped
+            while the request is sticky and the rows read from a replica are not cached.
+
+            Parameters
+            ----------
+            ids: list
+                Identifiers of the entities.
+
+            Returns
+            ----------
+            dict
+                Entities found, by identifier.
+        """
+        if is_sticky():
+            return self._by_ids(ids)
+
+        cache = get_cache()
+        entities = {}
+        missing = []
+        for id_, entity in zip(ids, cache.get_many([self._cache_key(id_) for id_ in ids])):
+            if entity is MISSING:
+                missing.append(id_)
+            elif entity is not None:
+                entities[id_] = entity
+        if missing:
+            cacheable = not reads_from_replica()
+            found = self._by_ids(missing)
+            if cacheable:
+                cache.set_many(dict((self._cache_key(id_), entity) for id_, entity in found.items()),
+                               current_app.config['CACHE_TTL'])
+                cache.set_many(dict((self._cache_key(id_), None) for id_ in missing if id_ not in found),
+                               current_app.config['CACHE_NEGATIVE_TTL'])
+            entities.update(found)
+        return entities
+
+    def _rows_query(self, columns=None):
+        """
+            Method to create a query of the model's columns that returns plain rows instead of entities.
+
+            Parameters
+            ----------
+            columns: list, optional
+                Columns to be selected, all of them when not informed.
+
+            Returns
+            ----------
+            Query
+        """
+        return db.session.query(*(columns or self.model_class.__table__.columns))
+
+    def _serializer(self, columns=None):
+        """
+            Method to return the compiled serializer of the repository's model.
+
+            Parameters
+            ----------
+            columns: list, optional
+                Columns selected, all of them when not informed.
+
+            Returns
+            ----------
+            ModelSerializer
+        """
+        fields = tuple(column.key for column in columns) if columns else None
+        return ModelSerializer.for_model(self.model_class.__class__, fields)
+
+    def _primary_key(self):
+        """
+            Method to return the primary key column of the repository's model.
+
+            Returns
+            ----------
+            Column
+        """
+        return inspect(self.model_class.__class__).primary_key[0]
 
     def create(self, args, commit_at_the_end=True):
         """
@@ -90,6 +1481,7 @@ class AbstractRepository(ABC):
 
             commit_at_the_end: boolean
                 Flag to automatically execute the db.session.commit() after insert the model and no error occurs.
+                Otherwise the caller owns the transaction: it is neither committed nor rolled back on error.
 
             Returns
             ----------
@@ -99,7 +1491,7 @@ class AbstractRepository(ABC):
             EntityAlreadyExists
                 If an integrity error is identified during the create process.
         """
-        new_model = self.model_class
+        new_model = self.model_class.__class__()
         for key, value in args.items():
             pattern = '\.'+key+'$'
             for attribute in new_model.__table__.columns:
@@ -108,21 +1500,33 @@ class AbstractRepository(ABC):
         try:
             db.session.add(new_model)
             db.session.flush()
+            if self.tracked_columns:
+                self._on_write([], [new_model.to_dict()])
+            self._record('create', [getattr(new_model, self._primary_key().key)])
         except IntegrityError as exp1:
-            db.session.rollback()
-            raise Exception('Entity already exists. Integrity_error' + json.dumps(exp1.orig.args))
+            if commit_at_the_end:
+                db.session.rollback()
+            raise Exception('Entity already exists. Integrity_error' + json.dumps(exp1.orig.args), 409)
         except Exception as exp2:
-            db.session.rollback()
+            if commit_at_the_end:
+                db.session.rollback()
             raise exp2
         else:
+            id_ = getattr(new_model, self._primary_key().key)
             if commit_at_the_end:
                 db.session.commit()
+                self._invalidate([id_])
+            else:
+                self._invalidate_on_commit([id_])
             return new_model.to_json()
 
-    def update(self, id_, args, commit_at_the_end=True):
+    def update(self, id_, args, versions=None, commit_at_the_end=True):
         """
             Generic method to update an entity of the repository's model.
 
+            The entity is always written, so its version is incremented, and only if it still has the version it was
+            loaded with and, when informed, one of the versions informed.
+
             Parameters
             ----------
             id_: int
@@ -131,8 +1535,12 @@ class AbstractRepository(ABC):
             args: list
                 Entity's values to be update.
 
+            versions: list, optional
+                Versions the entity must have to be updated, any version when not informed.
+
             commit_at_the_end: boolean
                 Flag to automatically execute the db.session.commit() after insert the model and no error occurs.
+                Otherwise the caller owns the transaction: it is neither committed nor rolled back on error.
 
             Returns
             ----------
@@ -144,41 +1552,124 @@ class AbstractRepository(ABC):
             EntityNotFound
                 If cannot be find an entity with the informed id.
 
+            PreconditionFailed
+                If the entity's version is not one of the informed versions or it changed after being loaded.
+
             EntityAlreadyExists
                 If an integrity error is identified during the update process.
         """
         primary_key = inspect(self.model_class.__class__).primary_key[0]
         model = self.model_class.query.filter(primary_key == id_).first()
         if not model:
-            raise Exception('Cannot find entity')
-        for key, value in args.items():
-            for attribute in model.to_dict().keys():
-                if key == attribute:
-                    setattr(model, key, value)
-                elif key == 'updated_at':
-                    setattr(model, key, datetime.datetime.utcnow())
+            raise Exception('Cannot find entity', 404)
+        if versions is not None and model.version not in versions:
+            raise Exception(PRECONDITION_FAILED, 412)
+        before = model.to_dict()
+        for key, value in dict(args, **self._timestamps(('updated_at',))).items():
+            if key in before:
+                setattr(model, key, value)
         try:
             db.session.flush()
+            if self.tracked_columns:
+                self._on_write([before], [model.to_dict()])
+            self._record('update', [id_])
         except IntegrityError as exp1:
-            db.session.rollback()
-            raise Exception('Entity cannot be updated. Integrity_error' + json.dumps(exp1.orig.args))
+            if commit_at_the_end:
+                db.session.rollback()
+            raise Exception('Entity cannot be updated. Integrity_error' + json.dumps(exp1.orig.args), 409)
+        except StaleDataError:
+            if commit_at_the_end:
+                db.session.rollback()
+            raise Exception(PRECONDITION_FAILED, 412)
         except Exception as exp2:
-            db.session.rollback()
+            if commit_at_the_end:
+                db.session.rollback()
             raise exp2
         else:
             if commit_at_the_end:
                 db.session.commit()
+                self._invalidate([id_])
+            else:
+                self._invalidate_on_commit([id_])
             return model.to_json()
 
-    def delete(self, id_):
+    def patch(self, id_, args, versions=None, commit_at_the_end=True):
+        """
+            Generic method to update the informed columns of an entity of the repository's model with a single UPDATE
+            statement keyed on its id, without loading the entity first. The version of the entity is incremented.
+
+            The repositories with tracked_columns read the tracked columns first when one of them is informed.
+
+            Parameters
+            ----------
+            id_: int
+                Entity's identifier that needs to be updated.
+
+            args: dict
+                Values of the columns to be updated.
+
+            versions: list, optional
+                Versions the entity must have to be updated, any version when not informed.
+
+            commit_at_the_end: boolean
+                Flag to automatically execute the db.session.commit() after the update and no error occurs.
+                Otherwise the caller owns the transaction: it is neither committed nor rolled back on error.
+
+            Returns
+            ----------
+            int
+                Entity's new version, None when it is unknown because no version was informed nor read.
+
+            Raises
+            ----------
+            EntityNotFound
+                If cannot be find an entity with the informed id.
+
+            PreconditionFailed
+                If the entity's version is not one of the informed versions.
+
+            EntityAlreadyExists
+                If an integrity error is identified during the update process.
+        """
+        values = dict(args, **self._timestamps(('updated_at',)))
+        statement = self.model_class.__table__.update().values(dict(values, **self._next_version()))
+        tracked = [key for key in self.tracked_columns if key in args]
+        try:
+            before, version = self._write_by_id(id_, statement, versions, bool(tracked))
+            if tracked:
+                self._on_write([before], [dict(before, **args)])
+            self._record('update', [id_])
+        except IntegrityError as exp1:
+            if commit_at_the_end:
+                db.session.rollback()
+            raise Exception('Entity cannot be updated. Integrity_error' + json.dumps(exp1.orig.args), 409)
+        except Exception as exp2:
+            if commit_at_the_end:
+                db.session.rollback()
+            raise exp2
+        else:
+            if commit_at_the_end:
+                db.session.commit()
+                self._invalidate([id_])
+            else:
+                self._invalidate_on_commit([id_])
+            return version + 1 if version is not None else None
+
+    def delete(self, id_, versions=None):
         """
-           Generic method to delete an entity of the repository's model.
+           Generic method to delete an entity of the repository's model with a single DELETE statement keyed on its
+           id, without loading the entity first.
+
+           The repositories with tracked_columns read the tracked columns first.
 
            Parameters
            ----------
            id_: int
                Entity's identifier that needs to be deleted.
 
+           versions: list, optional
+               Versions the entity must have to be deleted, any version when not informed.
+
            Returns
            ----------
            Object
@@ -188,13 +1679,21 @@ class AbstractRepository(ABC):
            ----------
            EntityNotFound
                If cannot be find an entity with the informed id.
+
+           PreconditionFailed
+               If the entity's version is not one of the informed versions.
        """
-        primary_key = inspect(self.model_class.__class__).primary_key[0]
-        model = self.model_class.query.filter(primary_key == id_).first()
-        if not model:
-            raise Exception('Cannot find entity')
-        db.session.delete(model)
+        try:
+            before, _ = self._write_by_id(id_, self.model_class.__table__.delete(), versions,
+                                          bool(self.tracked_columns))
+            if self.tracked_columns:
+                self._on_write([before], [])
+            self._record('delete', [id_])
+        except Exception as exp:
+            db.session.rollback()
+            raise exp
         db.session.commit()
+        self._invalidate([id_])
         return {'message': 'Entity deleted successfully'}
 
 
@@ -202,7 +1701,168 @@ class TeamsRepository(AbstractRepository):
 
     model_class = TeamsModel()
 
+    filterable_columns = ['name', 'city']
+    sortable_columns = ['id', 'name', 'city', 'created_at', 'updated_at']
+    search_columns = ['name']
+
+
+class TeamStatsRepository:
+    """
+        Class to read the statistics of each team's players: squad size, average age and players per position.
+
+        They are kept in summary tables updated incrementally, in the transaction of each write of PlayersRepository,
+        so they are read without aggregating the players.
+    """
+
+    stats_table = TeamStatsModel.__table__
+    positions_table = TeamPositionStatsModel.__table__
+
+    def find(self, team_id):
+        """
+            Method to read the statistics of a team.
+
+            Parameters
+            ----------
+            team_id: int
+                Team's identifier.
+
+            Returns
+            ----------
+            Object
+                Team's statistics, with zero players when it has none.
+        """
+        stats = db.session.query(self.stats_table).filter(self.stats_table.c.team_id == team_id).first()
+        positions = db.session.query(self.positions_table) \
+            .filter(self.positions_table.c.team_id == team_id, self.positions_table.c.players > 0)
+        return self._to_json(team_id, stats, positions)
+
+    def all(self):
+        """
+            Method to read the statistics of every team with players.
+
+            Returns
+            ----------
+            list
+                Statistics of each team, ordered by the team's identifier.
+        """
+        positions = defaultdict(list)
+        for row in db.session.query(self.positions_table).filter(self.positions_table.c.players > 0):
+            positions[row.team_id].append(row)
+        query = db.session.query(self.stats_table).filter(self.stats_table.c.players > 0) \
+            .order_by(self.stats_table.c.team_id)
+        return [self._to_json(stats.team_id, stats, positions[stats.team_id]) for stats in query]
+
+    def apply(self, before, after):
+        """
+            Method to update the statistics with the players written, subtracting their values before the write and
+            adding their values after it, with a single increment per team and per position.
+
+            Parameters
+            ----------
+            before: list
+                Values of the players updated or deleted, before the write.
+
+            after: list
+                Values of the players created or updated, after the write.
+        """
+        teams = defaultdict(lambda: {'players': 0, 'age_sum': 0, 'age_count': 0})
+        positions = defaultdict(int)
+        for players, sign in ((before, -1), (after, 1)):
+            for player in players:
+                team_id = player.get('team_id')
+                if team_id is None:
+                    continue
+                stats = teams[team_id]
+                stats['players'] += sign
+                if player.get('age') is not None:
+                    stats['age_sum'] += sign * player['age']
+                    stats['age_count'] += sign
+                if player.get('position') is not None:
+                    positions[(team_id, player['position'])] += sign
+
+        rows = [dict(stats, team_id=team_id) for team_id, stats in teams.items() if any(stats.values())]
+        if rows:
+            db.session.execute(increment_statement(self.stats_table), rows)
+        rows = [{'team_id': team_id, 'position': position, 'players': players}
+                for (team_id, position), players in positions.items() if players]
+        if rows:
+            db.session.execute(increment_statement(self.positions_table), rows)
+
+    def rebuild(self):
+        """
+            Method to recompute the statistics of every team from the players, in a single transaction.
+        """
+        db.session.execute(self.stats_table.delete())
+        db.session.execute(self.positions_table.delete())
+        db.session.execute(self.stats_table.insert().from_select(
+            ['team_id', 'players', 'age_sum', 'age_count'], self._aggregate_query()))
+        db.session.execute(self.positions_table.insert().from_select(
+            ['team_id', 'position', 'players'], self._aggregate_positions_query()))
+        db.session.commit()
+
+    def verify(self):
+        """
+            Method to compare the statistics with a fresh aggregate of the players.
+
+            Returns
+            ----------
+            list
+                Description of each difference found, empty when they are consistent.
+        """
+        differences = []
+        expected = dict((row[0], tuple(row[1:])) for row in db.session.execute(self._aggregate_query()))
+        current = dict((row.team_id, (row.players, row.age_sum, row.age_count))
+                       for row in db.session.query(self.stats_table) if row.players or row.age_sum or row.age_count)
+        for team_id in sorted(set(expected) | set(current)):
+            if expected.get(team_id) != current.get(team_id):
+                differences.append('Team ' + str(team_id) + ' (players, age_sum, age_count): expected '
+                                   + str(expected.get(team_id)) + ', found ' + str(current.get(team_id)))
+
+        expected = dict(((row[0], row[1]), row[2]) for row in db.session.execute(self._aggregate_positions_query()))
+        current = dict(((row.team_id, row.position), row.players)
+                       for row in db.session.query(self.positions_table) if row.players)
+        for key in sorted(set(expected) | set(current)):
+            if expected.get(key) != current.get(key):
+                differences.append('Team ' + str(key[0]) + ' position ' + key[1] + ' players: expected '
+                                   + str(expected.get(key)) + ', found ' + str(current.get(key)))
+        return differences
+
+    @staticmethod
+    def _aggregate_query():
+        players = PlayersModel.__table__
+        return select(players.c.team_id, func.count(), func.coalesce(func.sum(players.c.age), 0),
+                      func.count(players.c.age)) \
+            .where(players.c.team_id.isnot(None)) \
+            .group_by(players.c.team_id)
+
+    @staticmethod
+    def _aggregate_positions_query():
+        players = PlayersModel.__table__
+        return select(players.c.team_id, players.c.position, func.count()) \
+            .where(players.c.team_id.isnot(None), players.c.position.isnot(None)) \
+            .group_by(players.c.team_id, players.c.position)
+
+    @staticmethod
+    def _to_json(team_id, stats, positions):
+        age_count = stats.age_count if stats is not None else 0
+        return {
+            'team_id': team_id,
+            'players': stats.players if stats is not None else 0,
+            'average_age': round(stats.age_sum / age_count, 2) if age_count else None,
+            'positions': dict((row.position, row.players) for row in positions),
+        }
+
 
 class PlayersRepository(AbstractRepository):
 
     model_class = PlayersModel()
+
+    filterable_columns = ['name', 'age', 'position', 'team_id']
+    sortable_columns = ['id', 'name', 'age', 'position', 'team_id', 'created_at', 'updated_at']
+    tracked_columns = ['team_id', 'age', 'position']
+    search_columns = ['name']
+
+    stats_repository = TeamStatsRepository()
+
+    def _on_write(self, before, after):
+        self.stats_repository.apply(before, after)
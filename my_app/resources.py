@@ -1,8 +1,17 @@
 from abc import abstractmethod
+from itertools import islice
+from types import GeneratorType
 
+from flask import Response, current_app, request, stream_with_context
 from flask_restful import Resource
+from werkzeug.http import quote_etag
 
-from my_app.services import TeamsService, PlayersService
+from my_app import compression
+from my_app.changes import STREAMS_UNAVAILABLE
+from my_app.metrics import phase
+from my_app.routing import read_from_replica
+from my_app.serializer import Serializer
+from my_app.services import TeamsService, PlayersService, TeamStatsService
 
 
 class AbstractResource(Resource):
@@ -22,6 +31,16 @@ class AbstractResource(Resource):
         """
             Generic method to handle a HTTP GET request.
 
+            The response carries an ETag, strong for an entity so it can be sent in If-Match and weak for a collection,
+            and, for an entity without embedded relationships, a Last-Modified header.
+            When the request's If-None-Match or, for such an entity, If-Modified-Since matches the current version, a
+            304 response is returned before retrieving anything. A collection has no Last-Modified: its ETag comes from
+            the version of its table, incremented by each write, as the datetimes only have a precision of seconds. The
+            reads are sent to a replica when there is one.
+
+            Lists are encoded directly as JSON bytes and, when the service returns a generator, the entities are
+            streamed as NDJSON, one entity per line.
+
             Parameters
             ----------
             id_: int, optional
@@ -32,7 +51,77 @@ class AbstractResource(Resource):
             Object
                 First entity found by the service.
         """
-        return self.service_class.retrieve(id_)
+        read_from_replica()
+        etag, last_modified = self.service_class.retrieve_version(id_)
+        if self._is_not_modified(etag, last_modified):
+            response = Response(status=304)
+        else:
+            result = self.service_class.retrieve(id_)
+            if isinstance(result, GeneratorType):
+                response = Response(stream_with_context(
+                    self._to_ndjson(result, current_app.config['STREAM_CHUNK_SIZE'])), mimetype='application/x-ndjson')
+            else:
+                pretty = current_app.config['JSONIFY_PRETTYPRINT_REGULAR'] or current_app.debug
+                with phase('serialize'):
+                    body = Serializer.dumps(result, pretty)
+                response = Response(body, mimetype='application/json')
+
+        response.set_etag(etag, weak=id_ is None)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+    @staticmethod
+    def _is_not_modified(etag, last_modified):
+        """
+            Method to verify if the version known by the client, informed in the request headers, is the current one,
+            whatever the encoding of the representation it has.
+
+            Parameters
+            ----------
+            etag: str
+                Current ETag.
+
+            last_modified: datetime
+                Current last modification datetime.
+
+            Returns
+            ----------
+            boolean
+        """
+        if request.if_none_match:
+            return any(request.if_none_match.contains_weak(tag) for tag in [etag] + compression.encoded_etags(etag))
+        if request.if_modified_since and last_modified is not None:
+            return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+        return False
+
+    @staticmethod
+    def _to_ndjson(entities, chunk_size):
+        """
+            Method to encode each entity as a JSON line.
+
+            The lines are sent in chunks with the same size of the chunks read by the repository, so each write to the
+            client, and each flush of the response compression, carries a whole chunk.
+
+            Parameters
+            ----------
+            entities: generator
+                Entities serialized by the repository.
+
+            chunk_size: int
+                Number of entities of each chunk.
+
+            Returns
+            ----------
+            generator
+                One chunk of JSON lines at a time.
+        """
+        while True:
+            lines = [Serializer.dumps(entity) + b'\n' for entity in islice(entities, chunk_size)]
+            if not lines:
+                return
+            yield b''.join(lines)
 
     def post(self):
         """
@@ -49,6 +138,10 @@ class AbstractResource(Resource):
         """
             Generic method to handle a HTTP PUT request.
 
+            When the request has an If-Match header, the entity is updated only if its version matches one of its
+            strong ETags, otherwise a 412 response is returned. The response carries the ETag of the entity's new
+            version, as its GET does.
+
             Parameters
             ----------
             id_: int
@@ -65,14 +158,55 @@ class AbstractResource(Resource):
                 If the entity identifier is not informed.
         """
         if id_ is None:
-            raise Exception('Cannot find entity without an identifier.')
-        else:
-            return self.service_class.update(id_)
+            raise Exception('Cannot find entity without an identifier.', 405)
+        try:
+            entity = self.service_class.update(id_)
+        except Exception as exp:
+            return self._precondition_failed(exp)
+        return entity, 200, {'ETag': quote_etag(self.service_class.entity_etag(id_, entity['version']))}
+
+    def patch(self, id_=None):
+        """
+            Generic method to handle a HTTP PATCH request, updating only the attributes informed with a single
+            statement.
+
+            When the request has an If-Match header, the entity is updated only if its version matches one of its
+            strong ETags, otherwise a 412 response is returned. The 204 response carries the ETag of the entity's new
+            version, as its GET does, when it is known.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier to be updated.
+
+            Returns
+            ----------
+            Response
+                Empty response.
+
+            Raises
+            ----------
+            EntityNotFound
+                If the entity identifier is not informed.
+        """
+        if id_ is None:
+            raise Exception('Cannot find entity without an identifier.', 405)
+        try:
+            version = self.service_class.patch(id_)
+        except Exception as exp:
+            return self._precondition_failed(exp)
+        response = Response(status=204)
+        if version is not None:
+            response.set_etag(self.service_class.entity_etag(id_, version))
+        return response
 
     def delete(self, id_=None):
         """
             Generic method to handle a HTTP DELETE request.
 
+            When the request has an If-Match header, the entity is deleted only if its version matches one of its
+            strong ETags, otherwise a 412 response is returned.
+
             Parameters
             ----------
             id_: int
@@ -89,9 +223,161 @@ class AbstractResource(Resource):
                 If the entity identifier is not informed.
         """
         if id_ is None:
-            raise Exception('Cannot find entity without an identifier.')
-        else:
+            raise Exception('Cannot find entity without an identifier.', 405)
+        try:
             return self.service_class.delete(id_)
+        except Exception as exp:
+            return self._precondition_failed(exp)
+
+    @staticmethod
+    def _precondition_failed(error):
+        """
+            Method to answer a write refused because the entity's version did not match, raising any other error.
+
+            Parameters
+            ----------
+            error: Exception
+                Error raised by the write.
+
+            Returns
+            ----------
+            tuple
+                Error message and the 412 status.
+        """
+        if error.args[1:2] != (412,):
+            raise error
+        return {'exception': error.args[0]}, 412
+
+
+class AbstractBulkResource(Resource):
+    """
+        Abstract class to create resources that handle many entities on each request.
+    """
+
+    @property
+    @abstractmethod
+    def service_class(self):
+        """
+            String for the service's class name.
+        """
+        raise NotImplementedError
+
+    def post(self):
+        """
+            Generic method to handle a HTTP POST request with a JSON array of entities.
+
+            Returns
+            ----------
+            Object
+                Result of each entity created by the service.
+        """
+        return self.service_class.bulk_create()
+
+    def put(self):
+        """
+            Generic method to handle a HTTP PUT request with a JSON array of entities. A 412 response is returned when
+            concurrent writes kept changing the entities read.
+
+            Returns
+            ----------
+            Object
+                Result of each entity updated by the service.
+        """
+        try:
+            return self.service_class.bulk_update()
+        except Exception as exp:
+            return AbstractResource._precondition_failed(exp)
+
+
+class AbstractSearchResource(Resource):
+    """
+        Abstract class to create resources that search the entities by text.
+    """
+
+    @property
+    @abstractmethod
+    def service_class(self):
+        """
+            String for the service's class name.
+        """
+        raise NotImplementedError
+
+    def get(self):
+        """
+            Generic method to handle a HTTP GET request with the text searched in 'q'. The entities are read from a
+            replica when there is one.
+
+            Returns
+            ----------
+            Object
+                Entities found by the service, from the best match.
+        """
+        read_from_replica()
+        return self.service_class.search()
+
+
+class AbstractChangesResource(Resource):
+    """
+        Abstract class to create resources that read the changes of the entities after a sequence number.
+    """
+
+    @property
+    @abstractmethod
+    def service_class(self):
+        """
+            String for the service's class name.
+        """
+        raise NotImplementedError
+
+    def get(self):
+        """
+            Generic method to handle a HTTP GET request for the changes after the sequence number informed in 'since'.
+
+            Returns
+            ----------
+            Object
+                Changes read by the service, with the sequence number to resume from, or the 410 status when they were
+                pruned.
+        """
+        try:
+            return self.service_class.changes()
+        except Exception as exp:
+            if exp.args[1:2] != (410,):
+                raise exp
+            return {'exception': exp.args[0]}, 410
+
+
+class AbstractChangesStreamResource(Resource):
+    """
+        Abstract class to create resources that stream the changes of the entities as server-sent events.
+    """
+
+    @property
+    @abstractmethod
+    def service_class(self):
+        """
+            String for the service's class name.
+        """
+        raise NotImplementedError
+
+    def get(self):
+        """
+            Generic method to handle a HTTP GET request for the stream of changes. The response is neither cached nor
+            buffered by the proxies, so each event reaches the client as soon as it is sent.
+
+            A stream holds a thread of the server until it ends, so a server that is neither threaded nor asynchronous,
+            such as gunicorn's sync workers, answers 501 instead: the clients must poll the changes. The production
+            server has threaded workers when the SERVER_THREADS setting is greater than one.
+
+            Returns
+            ----------
+            Response
+                Events of the changes, as text/event-stream.
+        """
+        if not request.environ.get('wsgi.multithread'):
+            return {'exception': STREAMS_UNAVAILABLE}, 501
+        return Response(stream_with_context(self.service_class.stream_changes()), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 class TeamsResource(AbstractResource):
@@ -102,3 +388,66 @@ class TeamsResource(AbstractResource):
 class PlayersResource(AbstractResource):
 
     service_class = PlayersService()
+
+
+class TeamsBulkResource(AbstractBulkResource):
+
+    service_class = TeamsService()
+
+
+class PlayersBulkResource(AbstractBulkResource):
+
+    service_class = PlayersService()
+
+
+class TeamsSearchResource(AbstractSearchResource):
+
+    service_class = TeamsService()
+
+
+class PlayersSearchResource(AbstractSearchResource):
+
+    service_class = PlayersService()
+
+
+class TeamsChangesResource(AbstractChangesResource):
+
+    service_class = TeamsService()
+
+
+class PlayersChangesResource(AbstractChangesResource):
+
+    service_class = PlayersService()
+
+
+class TeamsChangesStreamResource(AbstractChangesStreamResource):
+
+    service_class = TeamsService()
+
+
+class PlayersChangesStreamResource(AbstractChangesStreamResource):
+
+    service_class = PlayersService()
+
+
+class TeamStatsResource(Resource):
+
+    service_class = TeamStatsService()
+
+    def get(self, id_=None):
+        """
+            Method to handle a HTTP GET request for the statistics of a team, or of every team when the identifier is
+            not informed.
+
+            Parameters
+            ----------
+            id_: int, optional
+                Team's identifier.
+
+            Returns
+            ----------
+            Object
+                Statistics found by the service.
+        """
+        read_from_replica()
+        return self.service_class.retrieve(id_)
@@ -0,0 +1,225 @@
+import itertools
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy import SignallingSession, SQLAlchemy, get_state
+from sqlalchemy import event, orm
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+
+STICKY_COOKIE = 'primary_until'
+
+
+class ReplicaRouter:
+    """
+        Class to choose the replica engine of each read, in round-robin among the healthy replicas.
+
+        A replica is unhealthy for the number of seconds of the REPLICA_RETRY_AFTER setting after an error raised by
+        its engine.
+    """
+
+    def __init__(self, bind_keys, retry_after):
+        self.bind_keys = bind_keys
+        self.retry_after = retry_after
+        self.unhealthy_until = dict((key, 0) for key in bind_keys)
+        self._cycle = itertools.cycle(bind_keys)
+        self._lock = threading.Lock()
+
+    def choose(self):
+        """
+            Method to choose the next healthy replica.
+
+            Returns
+            ----------
+            str
+                Bind key of the replica, None if every replica is unhealthy.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self.bind_keys)):
+                key = next(self._cycle)
+                if self.unhealthy_until[key] <= now:
+                    return key
+        return None
+
+    def mark_unhealthy(self, key):
+        """
+            Method to stop sending reads to a replica until the retry interval is over.
+
+            Parameters
+            ----------
+            key: str
+                Bind key of the replica.
+        """
+        with self._lock:
+            self.unhealthy_until[key] = time.monotonic() + self.retry_after
+
+    def status(self):
+        """
+            Method to describe the replicas and whether each one is healthy.
+
+            Returns
+            ----------
+            dict
+        """
+        now = time.monotonic()
+        return dict((key, until <= now) for key, until in self.unhealthy_until.items())
+
+
+class RoutingSession(SignallingSession):
+    """
+        Class of the session that sends the reads of the GET requests to the replicas and everything else to the
+        primary.
+
+        Reads stay on the primary after the session writes, so a request reads its own writes, and while the client's
+        sticky cookie, set after a write for the number of seconds of the REPLICA_STICKY_SECONDS setting, is valid.
+    """
+
+    def __init__(self, db, **options):
+        self.wrote = False
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.wrote = True
+        elif isinstance(clause, Select) and self._reads_from_replica():
+            router = self.app.extensions['replica_router']
+            key = router.choose()
+            if key is not None:
+                return get_state(self.app).db.get_engine(self.app, bind=key)
+        return super().get_bind(mapper, clause)
+
+    def _reads_from_replica(self):
+        """
+            Method to verify if the reads of the session can be sent to a replica.
+
+            Returns
+            ----------
+            boolean
+        """
+        if self.wrote or 'replica_router' not in self.app.extensions:
+            return False
+        if not has_request_context() or not g.get('replica_reads'):
+            return False
+        return not _has_sticky_cookie()
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """
+        Class of the database extension with sessions routed between the primary and the replicas.
+    """
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def init_app(app, db):
+    """
+        Function to register one bind for each URI of the SQLALCHEMY_REPLICA_URIS setting and the router among them.
+
+        Parameters
+        ----------
+        app: Flask
+            Application.
+
+        db: RoutingSQLAlchemy
+            Database of the application.
+
+        Returns
+        ----------
+        ReplicaRouter
+            Router of the replicas, None if there is no replica.
+    """
+    uris = app.config.get('SQLALCHEMY_REPLICA_URIS')
+    if not uris:
+        return None
+
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    bind_keys = []
+    for index, uri in enumerate(uris):
+        key = 'replica_' + str(index)
+        binds[key] = uri
+        bind_keys.append(key)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+    router = ReplicaRouter(bind_keys, app.config['REPLICA_RETRY_AFTER'])
+    with app.app_context():
+        for key in bind_keys:
+            event.listen(db.get_engine(app, bind=key), 'handle_error',
+                         lambda context, key=key: router.mark_unhealthy(key))
+    app.extensions['replica_router'] = router
+    return router
+
+
+def read_from_replica():
+    """
+        Function to allow the reads of the current request to be sent to a replica.
+    """
+    g.replica_reads = True
+
+
+def reads_from_replica():
+    """
+        Function to verify if the reads of the current request are sent to a replica, whose rows may lag behind the
+        primary.
+
+        Returns
+        ----------
+        boolean
+    """
+    if 'replica_router' not in current_app.extensions:
+        return False
+    return get_state(current_app).db.session()._reads_from_replica()
+
+
+def wrote_to_primary():
+    """
+        Function to mark the current request as having written to the primary when the write is executed by another
+        session, such as the group committer's, so the request and the next ones of its client read it.
+    """
+    get_state(current_app).db.session().wrote = True
+
+
+def is_sticky():
+    """
+        Function to verify if the reads of the current request must see the latest writes of its client, because the
+        request wrote or the client's sticky cookie is valid.
+
+        Returns
+        ----------
+        boolean
+    """
+    if 'replica_router' not in current_app.extensions or not has_request_context():
+        return False
+    session = get_state(current_app).db.session
+    return (session.registry.has() and session().wrote) or _has_sticky_cookie()
+
+
+def _has_sticky_cookie():
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) >= time.time()
+    except ValueError:
+        return False
+
+
+def stick_to_primary(response):
+    """
+        Function to set the sticky cookie when the current request wrote to the primary, so the next reads of the
+        client stay on it during the REPLICA_STICKY_SECONDS setting.
+
+        Parameters
+        ----------
+        response: Response
+            Response of the current request.
+
+        Returns
+        ----------
+        Response
+    """
+    session = get_state(current_app).db.session
+    if 'replica_router' in current_app.extensions and session.registry.has() and session().wrote:
+        window = current_app.config['REPLICA_STICKY_SECONDS']
+        response.set_cookie(STICKY_COOKIE, str(time.time() + window), max_age=window, httponly=True)
+    return response
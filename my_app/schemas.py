@@ -0,0 +1,146 @@
+from datetime import datetime
+
+from flask_restful import inputs
+from sqlalchemy import types
+
+
+class RequestSchema:
+    """
+        Class responsible to validate a payload against the columns of a model.
+
+        It is compiled once from the model's columns and the required/ignore lists of an operation, so a payload is
+        validated and coerced to the columns' types in a single pass.
+    """
+
+    def __init__(self, columns, required_list, ignore_list=()):
+        self.required = frozenset(column.key for column in columns if column.key in required_list)
+        self.fields = tuple((column.key, column.key in self.required) + self._coercion(column.type)
+                            for column in columns if column.key in self.required or column.key not in ignore_list)
+
+    @staticmethod
+    def _coercion(column_type):
+        """
+            Method to choose the function that coerces a payload value to a column's type.
+
+            Parameters
+            ----------
+            column_type: TypeEngine
+                Column's SQLAlchemy type.
+
+            Returns
+            ----------
+            tuple
+                The coercion function and the description of the expected value used in the error messages.
+        """
+        if isinstance(column_type, types.Boolean):
+            return inputs.boolean, 'a boolean'
+        if isinstance(column_type, types.Integer):
+            return _to_int, 'an integer'
+        if isinstance(column_type, types.DateTime):
+            return _to_datetime, 'an ISO 8601 datetime'
+        if isinstance(column_type, types.String):
+            if column_type.length:
+                return _to_string(column_type.length), 'a text up to ' + str(column_type.length) + ' characters'
+            return _to_string(None), 'a text'
+        return (lambda value: value), 'a value'
+
+    def validate(self, payload, partial=False):
+        """
+            Method to validate and coerce a payload.
+
+            Parameters
+            ----------
+            payload: dict
+                Values informed for the columns.
+
+            partial: boolean
+                Flag to keep only the columns informed in the payload instead of every column of the schema.
+
+            Returns
+            ----------
+            tuple
+                Payload's values after validation and a dictionary with the error found for each column.
+        """
+        args = {}
+        errors = {}
+        for key, required, coerce, expected in self.fields:
+            if key not in payload:
+                if required:
+                    errors[key] = 'Attribute \'' + key + '\' cannot be find.'
+                elif not partial:
+                    args[key] = None
+                continue
+
+            value = payload[key]
+            if value is not None:
+                try:
+                    value = coerce(value)
+                except (TypeError, ValueError):
+                    errors[key] = 'Attribute \'' + key + '\' must be ' + expected + '.'
+                    continue
+
+            if required and (value is None or (isinstance(value, str) and not value.strip())):
+                errors[key] = 'Attribute \'' + key + '\' cannot be blank.'
+            else:
+                args[key] = value
+
+        return args, errors
+
+    def coerce(self, key, value):
+        """
+            Method to coerce a single value to the type of a column of the schema.
+
+            Parameters
+            ----------
+            key: str
+                Column's name.
+
+            value: str
+                Value to be coerced.
+
+            Returns
+            ----------
+            Object
+                Value coerced to the column's type.
+
+            Raises
+            ----------
+            InvalidData
+                If the value cannot be coerced to the column's type.
+        """
+        for field, _, coerce, expected in self.fields:
+            if field == key:
+                try:
+                    return coerce(value)
+                except (TypeError, ValueError):
+                    raise Exception('Dados não foram informados corretamente.', 400,
+                                    {'message': {key: 'Attribute \'' + key + '\' must be ' + expected + '.'}})
+        raise Exception('Dados não foram informados corretamente.', 400,
+                        {'message': {key: 'Attribute \'' + key + '\' cannot be find.'}})
+
+
+def _to_int(value):
+    if isinstance(value, bool) or isinstance(value, (dict, list)):
+        raise ValueError(value)
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(value)
+    return int(value)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return inputs.datetime_from_iso8601(value)
+
+
+def _to_string(length):
+    def to_string(value):
+        if isinstance(value, (dict, list)):
+            raise ValueError(value)
+        value = str(value)
+        if length and len(value) > length:
+            raise ValueError(value)
+        return value
+    return to_string
@@ -0,0 +1,561 @@
+"""
+    Search of the entities by the text of their search columns, with prefix and fuzzy matching and ranked results.
+
+    On MySQL the search uses the FULLTEXT index of the search columns, created with the ngram parser by the migrations.
+    Any other database, or a MySQL one without that index, is searched through an in-process index of the words of the
+    names built by preload before the server forks its workers, or else on the first search, with a sorted vocabulary
+    for the prefix matches and its trigrams for the fuzzy ones. It is kept current by the writes of the repositories in
+    the same process and refreshed from the rows updated by the other processes every SEARCH_REFRESH_INTERVAL seconds.
+"""
+import math
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import timedelta
+from functools import lru_cache
+from itertools import islice
+
+from flask import current_app
+from sqlalchemy import or_, select
+from sqlalchemy.dialects import mysql
+from sqlalchemy.inspection import inspect
+
+from my_app.models import db
+
+
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.9
+FUZZY_SCORE = 0.8
+START_BONUS = 0.05
+FUZZY_MIN_LENGTH = 3
+MAX_EXPANSIONS = 100
+CANDIDATES_PER_RESULT = 10
+FULLTEXT_MIN_LENGTH = 2
+
+_separators = re.compile(r'[\W_]+')
+_marks = re.compile('[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]')
+_lock = threading.Lock()
+
+
+def normalize(text):
+    """
+        Function to normalize a text for the search: without accents, case folded and with its words separated by
+        one space.
+
+        Parameters
+        ----------
+        text: str
+            Text to be normalized.
+
+        Returns
+        ----------
+        str
+    """
+    text = _marks.sub('', unicodedata.normalize('NFKD', text or ''))
+    return ' '.join(_separators.sub(' ', text.casefold()).split())
+
+
+@lru_cache(maxsize=65536)
+def trigrams(word):
+    """
+        Function to split a normalized word in its trigrams, padded with two spaces before and one after so the
+        trigrams at its start weigh more.
+
+        Parameters
+        ----------
+        word: str
+            Normalized word.
+
+        Returns
+        ----------
+        frozenset
+    """
+    padded = '  ' + word + ' '
+    return frozenset(padded[index:index + 3] for index in range(len(padded) - 2))
+
+
+class SearchIndex:
+    """
+        Class of the in-process index of the names of a table's entities, split in words: the entities having each
+        word, the words in alphabetical order for the prefix matches and the words having each trigram for the fuzzy
+        ones. Only the entities of each word grow with the table, the other structures with its vocabulary.
+    """
+
+    def __init__(self, rows=()):
+        self.names = {}
+        self.entities = {}
+        for id_, text in rows:
+            name = normalize(text)
+            if name:
+                self.names[id_] = name
+                for word in name.split():
+                    ids = self.entities.get(word)
+                    if ids is None:
+                        ids = self.entities[word] = set()
+                    ids.add(id_)
+
+        self.words = sorted(self.entities)
+        self.trigrams = {}
+        for word in self.words:
+            for gram in trigrams(word):
+                self.trigrams.setdefault(gram, set()).add(word)
+        self.lock = threading.RLock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, id_, text):
+        """
+            Method to index the name of an entity, replacing the previous one.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier.
+
+            text: str
+                Text of the entity's search columns.
+        """
+        name = normalize(text)
+        with self.lock:
+            if self.names.get(id_) == name:
+                return
+            self.remove(id_)
+            if not name:
+                return
+            self.names[id_] = name
+            for word in name.split():
+                ids = self.entities.get(word)
+                if ids is None:
+                    ids = self.entities[word] = set()
+                    insort(self.words, word)
+                    for gram in trigrams(word):
+                        self.trigrams.setdefault(gram, set()).add(word)
+                ids.add(id_)
+
+    def remove(self, id_):
+        """
+            Method to remove the name of an entity from the index.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier.
+        """
+        with self.lock:
+            name = self.names.pop(id_, None)
+            if name is None:
+                return
+            for word in set(name.split()):
+                ids = self.entities[word]
+                ids.discard(id_)
+                if not ids:
+                    del self.entities[word]
+                    del self.words[bisect_left(self.words, word)]
+                    for gram in trigrams(word):
+                        self.trigrams[gram].discard(word)
+                        if not self.trigrams[gram]:
+                            del self.trigrams[gram]
+
+    def search(self, text, limit, min_similarity, max_candidates):
+        """
+            Method to find the entities whose names match a text.
+
+            Each word of the text is expanded to the indexed words equal to it, starting with it or, when it has at
+            least FUZZY_MIN_LENGTH characters, sharing at least min_similarity of its trigrams, scored in this order.
+            The candidates of a single word are the entities of its matches, from the best scored. The candidates of
+            many words have a match of every word expanded, from the best kind it has: only an exact one for the words
+            before the last, which are complete, and an exact or prefix one for the last. They are ranked by the
+            mean score of the best match of each word of the text, the names starting with the whole text first among
+            equal scores, then the shortest.
+
+            Parameters
+            ----------
+            text: str
+                Text searched.
+
+            limit: int
+                Maximum number of entities found.
+
+            min_similarity: float
+                Fraction of the trigrams of a word its fuzzy matches must have.
+
+            max_candidates: int
+                Maximum number of entities of the least selective word of the text, which bounds the latency of the
+                broadest searches.
+
+            Returns
+            ----------
+            list
+                Identifiers of the entities found, from the best match.
+        """
+        query = normalize(text)
+        if not query:
+            return []
+        with self.lock:
+            words = query.split()
+            expansions = [self._expand(word, min_similarity) for word in words]
+            matches = sorted((self._best_matches(expansion, index < len(words) - 1)
+                              for index, expansion in enumerate(expansions) if expansion),
+                             key=lambda matched: sum(len(self.entities[word]) for word in matched))
+            if not matches:
+                return []
+            size = limit * CANDIDATES_PER_RESULT
+            if len(matches) == 1:
+                expansion = next(expansion for expansion in expansions if expansion)
+                candidates = self._entities(sorted(expansion, key=expansion.get, reverse=True), size)
+            else:
+                candidates = self._union(matches[0], max_candidates)
+                for matched in matches[1:]:
+                    if len(matched) == 1:
+                        candidates = candidates & self.entities[matched[0]]
+                    else:
+                        candidates = set().union(*[candidates & self.entities[word] for word in matched])
+                    if not candidates:
+                        return []
+                candidates = islice(candidates, size)
+
+            ranked = []
+            for id_ in candidates:
+                name = self.names[id_]
+                name_words = name.split()
+                score = sum(max([expansion.get(word, 0) for word in name_words]) for expansion in expansions)
+                score = score / len(expansions) + (START_BONUS if name.startswith(query) else 0)
+                ranked.append((-score, len(name), id_))
+        ranked.sort()
+        return [id_ for _, _, id_ in ranked[:limit]]
+
+    def _expand(self, word, min_similarity):
+        """
+            Method to find the indexed words matching a word of the text, with their scores.
+
+            A fuzzy match shares at least the required number of trigrams, so it misses at most the others: only the
+            words of the rarest trigrams it cannot entirely miss are verified.
+        """
+        expansion = {}
+        index = bisect_left(self.words, word)
+        end = min(len(self.words), index + MAX_EXPANSIONS)
+        while index < end and self.words[index].startswith(word):
+            expansion[self.words[index]] = EXACT_SCORE if self.words[index] == word else PREFIX_SCORE
+            index += 1
+
+        if len(word) >= FUZZY_MIN_LENGTH:
+            grams = trigrams(word)
+            required = max(1, int(math.ceil(len(grams) * min_similarity)))
+            postings = sorted((self.trigrams.get(gram, ()) for gram in grams), key=len)
+            for candidate in set().union(*postings[:len(grams) - required + 1]):
+                if candidate not in expansion:
+                    candidate_grams = trigrams(candidate)
+                    shared = len(grams & candidate_grams)
+                    if shared >= required:
+                        expansion[candidate] = FUZZY_SCORE * 2 * shared / (len(grams) + len(candidate_grams))
+        return expansion
+
+    @staticmethod
+    def _best_matches(expansion, complete):
+        """
+            Method to select the words of an expansion of the best kind: exact when the word of the text is complete
+            and has one, exact or prefix, or else the fuzzy ones, from the best scored.
+        """
+        best = max(expansion.values())
+        if complete and best == EXACT_SCORE:
+            threshold = EXACT_SCORE
+        else:
+            threshold = min(best, PREFIX_SCORE)
+        return sorted((word for word, score in expansion.items() if score >= threshold),
+                      key=expansion.get, reverse=True)
+
+    def _union(self, words, size):
+        """
+            Method to join the entities of the words, from the first, until there are at least size entities. The
+            entities of a single word are not copied.
+        """
+        if len(words) == 1:
+            return self.entities[words[0]]
+        found = set()
+        for word in words:
+            found |= self.entities[word]
+            if len(found) >= size:
+                break
+        return found
+
+    def _entities(self, words, size):
+        """
+            Method to list up to size entities of the words, from the first.
+        """
+        found = []
+        for word in words:
+            found.extend(islice(self.entities[word], size - len(found)))
+            if len(found) >= size:
+                break
+        return found
+
+
+class MemorySearch:
+    """
+        Class of the search of a repository through an in-process SearchIndex.
+
+        The entities written by the repository are re-read from the primary database before the next search, while
+        the ones written by other processes are found by their updated_at, with an overlap of SEARCH_REFRESH_OVERLAP
+        seconds for the transactions committed out of order, or by an id greater than every indexed one. The entities
+        deleted by other processes are removed when their rows are not found.
+    """
+
+    def __init__(self, repository, config):
+        self.repository = repository
+        self.config = config
+        self.index = None
+        self.pending = set()
+        self.refreshed_at = 0
+        self.updated_until = None
+        self.max_id = 0
+        self._lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+
+    def search(self, query, limit):
+        """
+            Method to find the entities whose search columns match a text.
+
+            Parameters
+            ----------
+            query: str
+                Text searched.
+
+            limit: int
+                Maximum number of entities found.
+
+            Returns
+            ----------
+            list
+                Identifiers of the entities found, from the best match.
+        """
+        if self.index is None:
+            self.build()
+        elif self.pending or time.monotonic() - self.refreshed_at > self.config['SEARCH_REFRESH_INTERVAL']:
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._refresh()
+                finally:
+                    self._lock.release()
+        return self.index.search(query, limit, self.config['SEARCH_MIN_SIMILARITY'],
+                                 self.config['SEARCH_MAX_CANDIDATES'])
+
+    def build(self):
+        """
+            Method to build the index from every row of the repository, unless it is already built.
+        """
+        with self._lock:
+            if self.index is None:
+                self._build()
+
+    def invalidate(self, ids):
+        """
+            Method to mark the entities written by the repository to be indexed again before the next search.
+
+            Parameters
+            ----------
+            ids: iterable
+                Identifiers of the entities written.
+        """
+        if self.index is not None:
+            with self._pending_lock:
+                self.pending.update(ids)
+
+    def discard(self, ids):
+        """
+            Method to remove from the index the entities that no longer exist.
+
+            Parameters
+            ----------
+            ids: iterable
+                Identifiers of the entities not found.
+        """
+        if self.index is not None:
+            for id_ in ids:
+                self.index.remove(id_)
+
+    def _rows_query(self):
+        table = self.repository.model_class.__table__
+        columns = [table.columns[key] for key in self.repository.search_columns]
+        return select(self.repository._primary_key(), table.c.updated_at, *columns)
+
+    def _load(self, rows):
+        for row in rows:
+            self.max_id = max(self.max_id, row[0])
+            if self.updated_until is None or row[1] > self.updated_until:
+                self.updated_until = row[1]
+            yield row[0], ' '.join(value for value in row[2:] if value)
+
+    def _build(self):
+        start = time.monotonic()
+        self.refreshed_at = start
+        rows = db.session.execute(self._rows_query().execution_options(stream_results=True))
+        self.index = SearchIndex(self._load(rows.yield_per(self.config['STREAM_CHUNK_SIZE'])))
+        current_app.logger.info('Search index of %s built with %d entities in %.1f seconds.',
+                                self.repository.model_class.__tablename__, len(self.index),
+                                time.monotonic() - start)
+
+    def _refresh(self):
+        self.refreshed_at = time.monotonic()
+        primary_key = self.repository._primary_key()
+        table = self.repository.model_class.__table__
+        with self._pending_lock:
+            pending, self.pending = self.pending, set()
+        conditions = [primary_key > self.max_id]
+        if self.updated_until is not None:
+            overlap = timedelta(seconds=self.config['SEARCH_REFRESH_OVERLAP'])
+            conditions.append(table.c.updated_at >= self.updated_until - overlap)
+        if pending:
+            conditions.append(primary_key.in_(pending))
+        with db.engine.connect() as connection:
+            rows = connection.execute(self._rows_query().where(or_(*conditions))).fetchall()
+        for id_, text in self._load(rows):
+            pending.discard(id_)
+            self.index.add(id_, text)
+        self.discard(pending)
+
+
+class FullTextSearch:
+    """
+        Class of the search of a repository through the MySQL FULLTEXT index of its search columns, in natural language
+        mode so the ngram parser matches the words approximately. The rows starting with the text come first.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+
+    @staticmethod
+    def available(repository):
+        """
+            Method to verify if the database has a FULLTEXT index of the repository's search columns.
+
+            Parameters
+            ----------
+            repository: AbstractRepository
+
+            Returns
+            ----------
+            bool
+        """
+        if db.engine.dialect.name != 'mysql':
+            return False
+        for index in inspect(db.engine).get_indexes(repository.model_class.__tablename__):
+            if index.get('dialect_options', {}).get('mysql_prefix') == 'FULLTEXT' and \
+                    index['column_names'] == list(repository.search_columns):
+                return True
+        return False
+
+    def search(self, query, limit):
+        """
+            Method to find the entities whose search columns match a text.
+
+            Parameters
+            ----------
+            query: str
+                Text searched.
+
+            limit: int
+                Maximum number of entities found.
+
+            Returns
+            ----------
+            list
+                Identifiers of the entities found, from the best match.
+        """
+        text = ' '.join(query.split())
+        if not text:
+            return []
+        table = self.repository.model_class.__table__
+        columns = [table.columns[key] for key in self.repository.search_columns]
+        prefix = or_(*[column.startswith(text, autoescape=True) for column in columns])
+        statement = db.session.query(self.repository._primary_key())
+        if len(text) < FULLTEXT_MIN_LENGTH:
+            statement = statement.filter(prefix).order_by(*columns)
+        else:
+            relevance = mysql.match(*columns, against=text).in_natural_language_mode()
+            statement = statement.filter(relevance).order_by(prefix.desc(), relevance.desc())
+        return [id_ for id_, in statement.limit(limit)]
+
+    def invalidate(self, ids):
+        pass
+
+    def discard(self, ids):
+        pass
+
+
+def create_search(repository, config):
+    """
+        Function to create the search of a repository from the SEARCH_BACKEND setting: fulltext, memory or, when it is
+        not informed, fulltext if the database has the index and memory otherwise.
+
+        Parameters
+        ----------
+        repository: AbstractRepository
+            Repository with search_columns.
+
+        config: dict
+            Application settings.
+
+        Returns
+        ----------
+        MemorySearch or FullTextSearch
+    """
+    backend = config['SEARCH_BACKEND']
+    if backend is None:
+        backend = 'fulltext' if FullTextSearch.available(repository) else 'memory'
+    if backend == 'fulltext':
+        return FullTextSearch(repository)
+    return MemorySearch(repository, config)
+
+
+def get_search(repository, create=True):
+    """
+        Function to return the search of a repository in the current application, creating it on the first call.
+
+        Parameters
+        ----------
+        repository: AbstractRepository
+            Repository with search_columns.
+
+        create: bool, optional
+            Whether the search is created when it does not exist yet.
+
+        Returns
+        ----------
+        MemorySearch or FullTextSearch
+            None when it does not exist and create is False.
+    """
+    searches = current_app.extensions.setdefault('search', {})
+    name = repository.model_class.__tablename__
+    search = searches.get(name)
+    if search is None and create:
+        with _lock:
+            search = searches.get(name)
+            if search is None:
+                search = searches[name] = create_search(repository, current_app.config)
+    return search
+
+
+def preload(app):
+    """
+        Function to build the in-process indexes of the searchable repositories of an application, when the
+        SEARCH_PRELOAD setting is on, so no search request waits for them. The production server calls it in its
+        master, before forking the workers, which start with a copy of the indexes and only refresh them.
+
+        Parameters
+        ----------
+        app: Flask
+            Application.
+    """
+    if not app.config.get('SEARCH_PRELOAD'):
+        return
+    from my_app.repositories import PlayersRepository, TeamsRepository
+
+    with app.app_context():
+        for repository in (TeamsRepository(), PlayersRepository()):
+            search = get_search(repository)
+            if isinstance(search, MemorySearch):
+                search.build()
+        db.session.remove()
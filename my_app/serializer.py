@@ -1,8 +1,16 @@
-from datetime import datetime
+from datetime import date, datetime, time
+from decimal import Decimal
 import json
 
+from flask.json import JSONEncoder as FlaskJSONEncoder
+from sqlalchemy import types
 from sqlalchemy.orm.state import InstanceState
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Serializer:
     """
@@ -27,7 +35,7 @@ class Serializer:
         if type(element) is str:
             return element
         if type(element) is dict:
-            return json.dumps(element, indent=4, sort_keys=True, default=str)
+            return Serializer.dumps(element).decode('utf-8')
         elif type(element) is int:
             return element
         elif type(element) is bool:
@@ -40,3 +48,209 @@ class Serializer:
             return None
         else:
             raise Exception('Cannot identify type: ' + str(type(element)))
+
+    @staticmethod
+    def json_default(element):
+        """
+            Method to serialize the elements the JSON encoders do not handle natively.
+
+            Parameters
+            ----------
+            element: any
+                Element to be serialized.
+
+            Returns
+            ----------
+            Object
+                Datetimes, dates and times in isoformat, decimals as floats and anything else as a string.
+        """
+        if isinstance(element, (datetime, date, time)):
+            return element.isoformat()
+        if isinstance(element, Decimal):
+            return float(element)
+        return str(element)
+
+    @staticmethod
+    def dumps(element, pretty=False):
+        """
+            Method to encode an element already serialized as JSON bytes.
+
+            It uses orjson when it is installed and the standard library encoder otherwise, both with native datetime
+            handling.
+
+            Parameters
+            ----------
+            element: any
+                JSON-ready element, such as the entities returned by the repositories.
+
+            pretty: boolean, optional
+                Flag to indent the output instead of encoding it compactly.
+
+            Returns
+            ----------
+            bytes
+        """
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+            return orjson.dumps(element, default=Serializer.json_default, option=option)
+        if pretty:
+            return json.dumps(element, indent=2, default=Serializer.json_default).encode('utf-8')
+        return json.dumps(element, separators=(',', ':'), default=Serializer.json_default).encode('utf-8')
+
+    @staticmethod
+    def parse_datetime(element):
+        """
+            Method to parse a datetime serialized with isoformat.
+
+            Parameters
+            ----------
+            element: str
+                Datetime serialized.
+
+            Returns
+            ----------
+            datetime
+        """
+        if '.' in element:
+            return datetime.strptime(element, '%Y-%m-%dT%H:%M:%S.%f')
+        return datetime.strptime(element, '%Y-%m-%dT%H:%M:%S')
+
+
+class JSONEncoder(FlaskJSONEncoder):
+    """
+        Class to encode the responses built with jsonify, with datetimes in isoformat instead of the HTTP date format.
+    """
+
+    def default(self, o):
+        return Serializer.json_default(o)
+
+
+class ModelSerializer:
+    """
+        Class responsible to serialize the rows of a model.
+
+        It is compiled once per model class from its columns' types, so each row is converted without any type check.
+        Use ModelSerializer.for_model to get the compiled serializer of a model.
+    """
+
+    _compiled = {}
+
+    def __init__(self, columns):
+        self.keys = tuple(column.key for column in columns)
+        conversions = ((column.key, self._converter(column.type)) for column in columns)
+        self.conversions = tuple((key, convert) for key, convert in conversions if convert is not None)
+
+    @classmethod
+    def for_model(cls, model_class, fields=None):
+        """
+            Method to return the serializer of a model, compiling it on the first call.
+
+            Parameters
+            ----------
+            model_class: class
+                Model's class with a __table__.
+
+            fields: tuple, optional
+                Columns to be serialized, all of them when not informed.
+
+            Returns
+            ----------
+            ModelSerializer
+        """
+        serializer = cls._compiled.get((model_class, fields))
+        if serializer is None:
+            columns = [column for column in model_class.__table__.columns if fields is None or column.key in fields]
+            serializer = cls._compiled[(model_class, fields)] = cls(columns)
+        return serializer
+
+    @staticmethod
+    def _converter(column_type):
+        """
+            Method to choose the function that converts a column's value to a JSON-ready value.
+
+            Parameters
+            ----------
+            column_type: TypeEngine
+                Column's SQLAlchemy type.
+
+            Returns
+            ----------
+            function
+                The conversion function, None when the value is already JSON-ready.
+        """
+        if isinstance(column_type, types.DateTime):
+            return datetime.isoformat
+        if isinstance(column_type, types.Date):
+            return date.isoformat
+        if isinstance(column_type, types.Time):
+            return time.isoformat
+        if isinstance(column_type, types.Numeric) and column_type.asdecimal:
+            return float
+        return None
+
+    def from_row(self, row):
+        """
+            Method to serialize a row returned by a query of the serializer's columns, in the same order.
+
+            Parameters
+            ----------
+            row: tuple
+                Row's values.
+
+            Returns
+            ----------
+            dict
+        """
+        json = dict(zip(self.keys, row))
+        for key, convert in self.conversions:
+            value = json[key]
+            if value is not None:
+                json[key] = convert(value)
+        return json
+
+    @staticmethod
+    def embed(entities, name, key, loader):
+        """
+            Method to embed in serialized entities the related entity referenced by one of their columns, read through
+            a loader of the request with a single lookup for all the entities.
+
+            Parameters
+            ----------
+            entities: list
+                Serialized entities, changed in place.
+
+            name: str
+                Key of the related entity in each entity.
+
+            key: str
+                Column with the identifier of the related entity.
+
+            loader: BatchLoader
+                Loader of the related entities.
+        """
+        related = loader.load_many(set(entity[key] for entity in entities if entity[key] is not None))
+        for entity in entities:
+            entity[name] = related.get(entity[key])
+
+    def to_json(self, entity):
+        """
+            Method to serialize an entity of the model.
+
+            Parameters
+            ----------
+            entity: AbstractModel
+                Entity to be serialized.
+
+            Returns
+            ----------
+            dict
+        """
+        entity_dict = entity.__dict__
+        json = {}
+        for key in self.keys:
+            json[key] = entity_dict[key] if key in entity_dict else getattr(entity, key)
+        for key, convert in self.conversions:
+            value = json[key]
+            if value is not None:
+                json[key] = convert(value)
+        return json
@@ -1,9 +1,34 @@
+import hashlib
 from abc import ABC, abstractmethod
 
-from flask_restful import reqparse
+from flask import current_app, g, request
+from flask_restful import inputs, reqparse
 from werkzeug.exceptions import BadRequest
 
-from my_app.repositories import TeamsRepository, PlayersRepository
+from my_app.changes import get_change_feed, stream
+from my_app.group_commit import get_group_committer
+from my_app.metrics import timed
+from my_app.repositories import TeamsRepository, PlayersRepository, TeamStatsRepository
+from my_app.routing import wrote_to_primary
+from my_app.schemas import RequestSchema
+
+
+retrieve_parser = reqparse.RequestParser()
+retrieve_parser.add_argument('limit', type=inputs.positive, location='args')
+retrieve_parser.add_argument('after', type=str, location='args')
+retrieve_parser.add_argument('stream', type=inputs.boolean, location='args', default=False)
+retrieve_parser.add_argument('embed', type=str, location='args', default='')
+retrieve_parser.add_argument('fields', type=str, location='args', default='')
+retrieve_parser.add_argument('sort', type=str, location='args', default='')
+retrieve_parser.add_argument('ids', type=str, location='args', default='')
+
+search_parser = reqparse.RequestParser()
+search_parser.add_argument('q', type=str, location='args', default='')
+search_parser.add_argument('limit', type=inputs.positive, location='args')
+
+changes_parser = reqparse.RequestParser()
+changes_parser.add_argument('since', type=inputs.natural, location='args')
+changes_parser.add_argument('limit', type=inputs.positive, location='args')
 
 
 class AbstractService(ABC):
@@ -56,23 +81,44 @@ class AbstractService(ABC):
         """
             String list of the columns to be ignored if a value is informed inside the payload for the CREATE process.
         """
-        return ['id', 'slug', 'created_at', 'updated_at']
+        return ['id', 'slug', 'created_at', 'updated_at', 'version']
 
     @property
     def ignore_on_update(self):
         """
             String list of the columns to be ignored if a value is informed inside the payload for the UPDATE process.
         """
-        return ['id', 'slug', 'created_at', 'updated_at']
-
-    def _validate_by_parse(self, required_list, ignore_list=[]):
+        return ['id', 'slug', 'created_at', 'updated_at', 'version']
+
+    def __init__(self):
+        columns = list(self.repository_class.model_class.__table__.columns)
+        self.schemas = {
+            'create': RequestSchema(columns, self.required_on_create, self.ignore_on_create),
+            'retrieve': RequestSchema(columns, self.required_on_retrieve),
+            'update': RequestSchema(columns, self.required_on_update, self.ignore_on_update),
+            'patch': RequestSchema(columns, [], self.ignore_on_update),
+            'delete': RequestSchema(columns, self.required_on_delete),
+        }
+
+    @timed('validate')
+    def _validate_by_parse(self, operation, partial=False):
         """
            Method to validate the request payload.
 
-           It will verify if the request columns were informed according to one of the request_lists (required_on_create, required_on_update, required_on_delete, required_on_list).
+           It will verify if the request columns were informed according to the schema of the operation, compiled
+           from one of the request_lists (required_on_create, required_on_update, required_on_delete,
+           required_on_retrieve), and coerce their values to the columns' types.
 
            Also, will clean the payload according to the ignore_lists (ignore_on_create, ignore_on_update).
 
+           Parameters
+           ----------
+           operation: str
+               Operation of the schema: create, retrieve, update, patch or delete.
+
+           partial: boolean
+               Flag to keep only the columns informed in the payload instead of every column of the schema.
+
            Returns
            ----------
            Object
@@ -80,32 +126,191 @@ class AbstractService(ABC):
 
            Raises
            ----------
-           MissingData
-                If a required column is not informed in the payload.
+           InvalidData
+                If a required column is not informed or is blank in the payload, or a value has an invalid type.
+       """
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            payload = {}
+        if request.values:
+            payload = dict(request.values.to_dict(), **payload)
+
+        args, errors = self.schemas[operation].validate(payload, partial)
+        if errors:
+            raise Exception('Dados não foram informados corretamente.', 400, {'message': errors})
+
+        return args
+
+    @timed('validate')
+    def _validate_row(self, operation, row, partial=False):
+        """
+           Method to validate one row of a bulk payload with the same schema of the request payload validation.
+
+           Parameters
+           ----------
+           operation: str
+               Operation of the schema: create or update.
+
+           row: dict
+               Row informed in the bulk payload.
 
-           CannotBeBlank
-               If a required column is informed in the payload but its value is blank.
+           partial: boolean
+               Flag to keep only the columns informed in the row instead of every column of the model.
+
+           Returns
+           ----------
+           tuple
+               Row's values after validation and a dictionary with the error found for each column.
        """
-        columns = self.repository_class.get_model_columns()
+        if not isinstance(row, dict):
+            return None, {'row': 'Row must be a JSON object.'}
+        return self.schemas[operation].validate(row, partial)
 
-        parser = reqparse.RequestParser()
-        for column in columns:
-            if column in required_list:
-                parser.add_argument(column, required=True, nullable=False, help='Attribute \''+column+'\' cannot be find.')
-            elif column not in ignore_list:
-                parser.add_argument(column, required=False)
+    @timed('validate')
+    def _parse_bulk_payload(self):
+        """
+           Method to read the list of rows of a bulk request payload.
+
+           Returns
+           ----------
+           list
+               Rows informed in the request payload.
+
+           Raises
+           ----------
+           InvalidData
+               If the payload is not a JSON array or has more rows than the BULK_MAX_ROWS setting.
+       """
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            raise Exception('Payload must be a JSON array.', 400)
+        if len(rows) > current_app.config['BULK_MAX_ROWS']:
+            raise Exception('Payload cannot have more than ' + str(current_app.config['BULK_MAX_ROWS']) + ' rows.', 400)
+        return rows
+
+    @timed('validate')
+    def _parse_retrieve_args(self):
+        """
+           Method to read the retrieve arguments from the request query string.
+
+           The limit is bounded by the PAGINATION_MAX_LIMIT setting, the embed argument is a comma separated list of
+           the repository's model relationships and the fields argument a comma separated list of its columns.
+
+           The sort argument is a comma separated list of the repository's sortable columns, each one prefixed by '-'
+           to be sorted in descending order. Any other argument named after a filterable column is a filter, with a
+           comma separated list of the accepted values.
+
+           The ids argument is a comma separated list of at most PAGINATION_MAX_LIMIT identifiers.
+
+           The arguments are parsed once per request and kept in g, since both retrieve_version and retrieve read them.
+
+           Returns
+           ----------
+           Object
+               Retrieve arguments: limit, after, stream, embed, fields, sort, filters and ids.
+
+           Raises
+           ----------
+           InvalidData
+               If an argument is informed with an invalid value.
+       """
+        parsed = g.setdefault('retrieve_args', {})
+        tablename = self.repository_class.model_class.__tablename__
+        if tablename in parsed:
+            return parsed[tablename]
 
         try:
-            args = parser.parse_args()
+            args = retrieve_parser.parse_args()
         except BadRequest as exp:
             raise Exception('Dados não foram informados corretamente.', 400, exp.data)
 
-        for key, arg in args.items():
-            if (key in required_list) and (not arg or not str(arg).strip()):
-                raise Exception('Attribute \''+key+'\' cannot be blank.')
+        if args['limit'] is not None:
+            args['limit'] = min(args['limit'], current_app.config['PAGINATION_MAX_LIMIT'])
+
+        args['embed'] = [name.strip() for name in args['embed'].split(',') if name.strip()]
+        relationships = self.repository_class.get_relationships()
+        for name in args['embed']:
+            if name not in relationships:
+                raise Exception('Dados não foram informados corretamente.', 400,
+                                {'message': {'embed': 'Relationship \'' + name + '\' cannot be embedded.'}})
 
+        args['fields'] = [name.strip() for name in args['fields'].split(',') if name.strip()]
+        columns = self.repository_class.get_model_columns()
+        for name in args['fields']:
+            if name not in columns:
+                raise Exception('Dados não foram informados corretamente.', 400,
+                                {'message': {'fields': 'Attribute \'' + name + '\' cannot be find.'}})
+
+        sort = []
+        for name in [name.strip() for name in args['sort'].split(',') if name.strip()]:
+            descending = name.startswith('-')
+            key = name.lstrip('-+')
+            if key not in self.repository_class.sortable_columns:
+                raise Exception('Dados não foram informados corretamente.', 400,
+                                {'message': {'sort': 'Attribute \'' + key + '\' cannot be sorted.'}})
+            sort.append((key, descending))
+        args['sort'] = sort
+
+        ids = [item.strip() for item in args['ids'].split(',') if item.strip()]
+        if len(ids) > current_app.config['PAGINATION_MAX_LIMIT']:
+            raise Exception('Dados não foram informados corretamente.', 400, {'message': {
+                'ids': 'At most ' + str(current_app.config['PAGINATION_MAX_LIMIT']) + ' ids can be informed.'}})
+        try:
+            args['ids'] = [inputs.natural(item) for item in ids]
+        except ValueError as exp:
+            raise Exception('Dados não foram informados corretamente.', 400, {'message': {'ids': str(exp)}})
+
+        filters = {}
+        for key, value in request.args.items():
+            if key in self.repository_class.filterable_columns:
+                filters[key] = [self.schemas['retrieve'].coerce(key, item) for item in value.split(',')]
+            elif key in columns:
+                raise Exception('Dados não foram informados corretamente.', 400,
+                                {'message': {key: 'Attribute \'' + key + '\' cannot be filtered.'}})
+        args['filters'] = filters
+        parsed[tablename] = args
         return args
 
+    @staticmethod
+    def _parse_if_match():
+        """
+           Method to read the versions of the entity accepted by the request's If-Match header, from the ETags sent
+           by the API, whose opaque part starts with the version. If-Match uses the strong comparison, so the weak
+           ETags match no version.
+
+           Returns
+           ----------
+           list
+               Versions accepted, None when the header is not informed or is '*'.
+       """
+        if not request.if_match or request.if_match.star_tag:
+            return None
+        versions = [tag.split('-', 1)[0] for tag in request.if_match.as_set()]
+        return [int(version) for version in versions if version.isdigit()]
+
+    @staticmethod
+    def _write(method, *args):
+        """
+           Method to execute a write of the repository, committed on its own or, when the GROUP_COMMIT_ENABLED setting
+           is on, together with the concurrent writes of the process. The group committer writes with its own session,
+           so the request is marked as having written, and its reads stay on the primary, before the write is queued.
+
+           Parameters
+           ----------
+           method: function
+               Repository's method which writes, with a commit_at_the_end argument.
+
+           Returns
+           ----------
+           Object
+               Result of the repository's method.
+       """
+        committer = get_group_committer()
+        if committer is None:
+            return method(*args)
+        wrote_to_primary()
+        return committer.submit(method, *args, commit_at_the_end=False)
+
     def create(self):
         """
             Generic method to create a entity using the repository's model.
@@ -115,13 +320,20 @@ class AbstractService(ABC):
             Object
                 New entity created by the repository's model.
         """
-        args = self._validate_by_parse(self.required_on_create, self.ignore_on_create)
-        return self.repository_class.create(args)
+        args = self._validate_by_parse('create')
+        return self._write(self.repository_class.create, args)
 
     def retrieve(self, id_):
         """
             Generic method to retrieve a entity using the repository's model.
 
+            Without an identifier, the entities with the comma separated identifiers informed in 'ids' are retrieved
+            together, in their order, with the identifiers that cannot be found. Otherwise the entities are retrieved
+            by page when 'limit' or 'after' are informed in the query string, or as a generator read in chunks when
+            'stream' is informed. The relationships informed in 'embed' are embedded in each entity and only the
+            columns informed in 'fields' are selected. The entities are filtered and sorted by the filters and 'sort'
+            informed.
+
             Parameters
             ----------
             id_: int
@@ -132,15 +344,172 @@ class AbstractService(ABC):
             Object
                 An entity found by the repository's model using the identifier.
         """
-        self._validate_by_parse(self.required_on_retrieve)
-        if id_ is None:
-            return self.repository_class.all()
+        if self.schemas['retrieve'].required:
+            self._validate_by_parse('retrieve')
+        args = self._parse_retrieve_args()
+        if id_ is not None:
+            return self.repository_class.find(id_, args['embed'], args['fields'])
+        if args['ids']:
+            entities, missing = self.repository_class.find_many(args['ids'], args['embed'], args['fields'])
+            return {'data': entities, 'missing': missing}
+
+        options = dict(embed=args['embed'], fields=args['fields'], filters=args['filters'], sort=args['sort'])
+        if args['stream']:
+            return self.repository_class.stream(current_app.config['STREAM_CHUNK_SIZE'], args['after'], **options)
+        if args['limit'] is None and args['after'] is None:
+            return self.repository_class.all(**options)
+
+        limit = args['limit'] or current_app.config['PAGINATION_DEFAULT_LIMIT']
+        return self.repository_class.page(limit, args['after'], **options)
+
+    def search(self):
+        """
+            Generic method to search the entities whose search columns match the text informed in 'q', ranked from
+            the best match. At most 'limit' entities are returned, bounded by the SEARCH_MAX_LIMIT setting.
+
+            Returns
+            ----------
+            list
+                Entities found by the repository's model.
+
+            Raises
+            ----------
+            InvalidData
+                If the text is not informed or the limit is invalid.
+        """
+        try:
+            args = search_parser.parse_args()
+        except BadRequest as exp:
+            raise Exception('Dados não foram informados corretamente.', 400, exp.data)
+        if not args['q'].strip():
+            raise Exception('Dados não foram informados corretamente.', 400,
+                            {'message': {'q': 'Attribute \'q\' cannot be find.'}})
+
+        limit = args['limit'] or current_app.config['SEARCH_DEFAULT_LIMIT']
+        return self.repository_class.search(args['q'], min(limit, current_app.config['SEARCH_MAX_LIMIT']))
+
+    def changes(self):
+        """
+            Generic method to read the changes of the repository's model after the sequence number informed in
+            'since', each entity once with its latest operation and current values. At most 'limit' changes are
+            read, bounded by the CHANGE_FEED_MAX_LIMIT setting. Without 'since' no change is read, only the sequence
+            number to start from.
+
+            Returns
+            ----------
+            Object
+                Changes read, the sequence number to send as 'since' on the next request and whether there are more
+                changes to read right away.
+
+            Raises
+            ----------
+            InvalidData
+                If the sequence number or the limit is invalid.
+
+            Gone
+                If the changes after the sequence number were pruned.
+        """
+        try:
+            args = changes_parser.parse_args()
+        except BadRequest as exp:
+            raise Exception('Dados não foram informados corretamente.', 400, exp.data)
+
+        feed = get_change_feed()
+        if args['since'] is None:
+            return {'changes': [], 'next': feed.current(), 'more': False}
+        limit = min(args['limit'] or current_app.config['CHANGE_FEED_DEFAULT_LIMIT'],
+                    current_app.config['CHANGE_FEED_MAX_LIMIT'])
+        changes, next_seq, more = feed.read(self.repository_class.model_class.__tablename__, args['since'], limit)
+        return {'changes': changes, 'next': next_seq, 'more': more}
+
+    def stream_changes(self):
+        """
+            Generic method to stream the changes of the repository's model as server-sent events, resuming after the
+            sequence number of the Last-Event-ID header, or of 'since', or from the latest change when neither is
+            informed.
+
+            Returns
+            ----------
+            generator
+                Text of each event.
+
+            Raises
+            ----------
+            InvalidData
+                If the sequence number is invalid.
+        """
+        try:
+            args = changes_parser.parse_args()
+            last_event_id = request.headers.get('Last-Event-ID')
+            since = inputs.natural(last_event_id) if last_event_id else args['since']
+        except BadRequest as exp:
+            raise Exception('Dados não foram informados corretamente.', 400, exp.data)
+        except ValueError as exp:
+            raise Exception('Dados não foram informados corretamente.', 400, {'message': {'Last-Event-ID': str(exp)}})
+
+        feed = get_change_feed()
+        if since is None:
+            since = feed.current()
+        return stream(feed, self.repository_class.model_class.__tablename__, since, current_app.config)
+
+    def retrieve_version(self, id_):
+        """
+            Generic method to identify the version of the entity, or of the collection, that would be retrieved.
+
+            The version of an entity comes from its identifier and version, and the version of a collection from the
+            version of its table, incremented by each write, so nothing is serialized. The query string and the version
+            of each embedded relationship's table are added too, so an entity with embedded relationships has no last
+            modification datetime. An entity's ETag starts with its version, so it can be sent back in the If-Match
+            header of a write.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier to be retrieved.
+
+            Returns
+            ----------
+            tuple
+                ETag and last modification datetime of the version, None for a collection.
+        """
+        tablename = self.repository_class.model_class.__tablename__
+        last_modified = None
+        if id_ is not None:
+            entity_version, last_modified = self.repository_class.find_version(id_)
+            version = [tablename, id_, entity_version, request.query_string]
         else:
-            return self.repository_class.find(id_)
+            version = [tablename, self.repository_class.collection_version(), request.query_string]
+
+        for name in self._parse_retrieve_args()['embed']:
+            version.append([name, self.repository_class.related_version(name)])
+            last_modified = None
+        etag = hashlib.sha1(repr(version).encode('utf-8')).hexdigest()
+        return (etag if id_ is None else str(entity_version) + '-' + etag), last_modified
+
+    def entity_etag(self, id_, version):
+        """
+            Generic method to create the ETag of a version of an entity written, the one of its GET without a query
+            string.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier.
+
+            version: int
+                Entity's version.
+
+            Returns
+            ----------
+            str
+        """
+        tablename = self.repository_class.model_class.__tablename__
+        return str(version) + '-' + hashlib.sha1(repr([tablename, id_, version, b'']).encode('utf-8')).hexdigest()
 
     def update(self, id_):
         """
-            Generic method to update an entity using the repository's model.
+            Generic method to update an entity using the repository's model, only if its version matches the request's
+            If-Match header when informed.
 
             Parameters
             ----------
@@ -152,12 +521,107 @@ class AbstractService(ABC):
             Object
                 The updated entity selected using the identifier by the repository's model.
         """
-        args = self._validate_by_parse(self.required_on_update, self.ignore_on_update)
-        return self.repository_class.update(id_, args)
+        args = self._validate_by_parse('update')
+        return self._write(self.repository_class.update, id_, args, self._parse_if_match())
+
+    def patch(self, id_):
+        """
+            Generic method to update only the attributes informed of an entity using the repository's model, only if
+            its version matches the request's If-Match header when informed.
+
+            Parameters
+            ----------
+            id_: int
+                Entity identifier to be updated.
+
+            Returns
+            ----------
+            int
+                Entity's new version, None when it is unknown.
+
+            Raises
+            ----------
+            InvalidData
+                If no attribute is informed or a value has an invalid type.
+        """
+        args = self._validate_by_parse('patch', partial=True)
+        if not args:
+            raise Exception('Dados não foram informados corretamente.', 400,
+                            {'message': {'payload': 'At least one attribute must be informed.'}})
+        return self._write(self.repository_class.patch, id_, args, self._parse_if_match())
+
+    def bulk_create(self):
+        """
+            Generic method to create many entities using the repository's model in a single transaction.
+
+            Every row is validated with the CREATE rules, the valid ones are persisted and the invalid ones are
+            reported with their errors, as are the ones that cannot be persisted because of an integrity error.
+
+            Returns
+            ----------
+            Object
+                Number of entities created and the result of each row of the payload.
+        """
+        results = []
+        valid_rows = []
+        for index, row in enumerate(self._parse_bulk_payload()):
+            args, errors = self._validate_row('create', row)
+            if errors:
+                results.append({'index': index, 'status': 'invalid', 'errors': errors})
+            else:
+                results.append({'index': index, 'status': 'created'})
+                valid_rows.append(args)
+
+        failures = []
+        if valid_rows:
+            failures = self.repository_class.bulk_create(valid_rows, current_app.config['BULK_BATCH_SIZE'])
+        valid_results = [result for result in results if result['status'] == 'created']
+        for result, failure in zip(valid_results, failures):
+            if failure is not None:
+                result.update(status='failed', errors={'row': failure})
+        return {'created': failures.count(None), 'results': results}
+
+    def bulk_update(self):
+        """
+            Generic method to update many entities using the repository's model in a single transaction.
+
+            Every row must inform the entity identifier, as a JSON integer, and is validated with the UPDATE rules. Only
+            the columns informed in each row are updated.
+
+            Returns
+            ----------
+            Object
+                Number of entities updated and the result of each row of the payload.
+        """
+        primary_key = self.repository_class._primary_key().key
+        results = []
+        valid_rows = []
+        for index, row in enumerate(self._parse_bulk_payload()):
+            args, errors = self._validate_row('update', row, partial=True)
+            if not errors:
+                value = row.get(primary_key)
+                if isinstance(value, int) and not isinstance(value, bool):
+                    args[primary_key] = value
+                else:
+                    errors = {primary_key: 'Attribute \''+primary_key+'\' must be an integer.'}
+            if errors:
+                results.append({'index': index, 'status': 'invalid', 'errors': errors})
+            else:
+                results.append({'index': index, primary_key: args[primary_key]})
+                valid_rows.append(args)
+
+        found = set()
+        if valid_rows:
+            found = self.repository_class.bulk_update(valid_rows, current_app.config['BULK_BATCH_SIZE'])
+        for result in results:
+            if 'status' not in result:
+                result['status'] = 'updated' if result[primary_key] in found else 'not_found'
+        return {'updated': len(found), 'results': results}
 
     def delete(self, id_):
         """
-            Generic method to delete an entity using the repository's model.
+            Generic method to delete an entity using the repository's model, only if its version matches the request's
+            If-Match header when informed.
 
             Parameters
             ----------
@@ -169,8 +633,9 @@ class AbstractService(ABC):
             Object
                 A message confirming the deletion by repository's model.
         """
-        self._validate_by_parse(self.required_on_delete)
-        return self.repository_class.delete(id_)
+        if self.schemas['delete'].required:
+            self._validate_by_parse('delete')
+        return self.repository_class.delete(id_, self._parse_if_match())
 
 
 class TeamsService(AbstractService):
@@ -191,3 +656,38 @@ class PlayersService(AbstractService):
     required_on_retrieve = []
     required_on_update = []
     required_on_delete = []
+
+
+class TeamStatsService:
+    """
+        Class to retrieve the statistics of the teams' players.
+    """
+
+    repository_class = TeamStatsRepository()
+    teams_repository_class = TeamsRepository()
+
+    def retrieve(self, id_=None):
+        """
+            Method to retrieve the statistics of a team, or of every team with players when the identifier is not
+            informed.
+
+            Parameters
+            ----------
+            id_: int, optional
+                Team's identifier.
+
+            Returns
+            ----------
+            Object
+                Statistics of the team, or a list with the statistics of each team.
+
+            Raises
+            ----------
+            EntityNotFound
+                If cannot be find a team with the informed id.
+        """
+        if id_ is None:
+            return self.repository_class.all()
+        if id_ not in self.teams_repository_class.loader().load_many([id_]):
+            raise Exception('Entity not found!', 404)
+        return self.repository_class.find(id_)
@@ -0,0 +1,212 @@
+"""
+    Import and export of the repositories' entities from and to CSV or NDJSON files, optionally gzipped, in chunks so
+    files of any size are handled in constant memory.
+"""
+import csv
+import gzip
+import io
+import json
+import time
+
+from flask import current_app
+
+from my_app.schemas import RequestSchema
+from my_app.serializer import Serializer
+
+
+FORMATS = ('csv', 'ndjson')
+
+
+def file_format(path, format_=None):
+    """
+        Function to choose the format of a file, informed or inferred from its extension.
+
+        Parameters
+        ----------
+        path: str
+            File's path.
+
+        format_: str, optional
+            File's format: csv or ndjson.
+
+        Returns
+        ----------
+        str
+
+        Raises
+        ----------
+        Exception
+            If the format is not supported.
+    """
+    if format_ is None:
+        name = path[:-3] if path.endswith('.gz') else path
+        format_ = 'ndjson' if name.endswith('.jsonl') else name.rsplit('.', 1)[-1]
+    if format_ not in FORMATS:
+        raise Exception('Format must be one of: ' + ', '.join(FORMATS) + '.')
+    return format_
+
+
+def open_file(path, mode):
+    """
+        Function to open a text file, decompressing or compressing it with gzip when its name ends with .gz.
+
+        Parameters
+        ----------
+        path: str
+            File's path.
+
+        mode: str
+            'r' to read or 'w' to write.
+
+        Returns
+        ----------
+        file
+    """
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, mode + 'b'), encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+
+def read_rows(file, format_):
+    """
+        Function to read the rows of a file one by one.
+
+        Empty CSV values are read as None.
+
+        Parameters
+        ----------
+        file: file
+            File opened for reading.
+
+        format_: str
+            File's format: csv or ndjson.
+
+        Returns
+        ----------
+        generator
+            Line number and values of each row.
+    """
+    if format_ == 'csv':
+        reader = csv.DictReader(file)
+        for row in reader:
+            yield reader.line_num, dict((key, value if value != '' else None) for key, value in row.items())
+    else:
+        for line_number, line in enumerate(file, 1):
+            if line.strip():
+                yield line_number, json.loads(line)
+
+
+def import_file(repository, path, format_=None, chunk_size=5000, upsert=False, progress=print):
+    """
+        Function to import the rows of a file into the repository's model, one chunk per transaction.
+
+        Every row is validated and coerced to the columns' types; the invalid ones are reported and skipped. Each chunk
+        is written in its own application context, so nothing recorded for it, such as the debug queries, outlives it.
+
+        Parameters
+        ----------
+        repository: AbstractRepository
+            Repository of the entities.
+
+        path: str
+            File's path.
+
+        format_: str, optional
+            File's format: csv or ndjson, inferred from the extension when not informed.
+
+        chunk_size: int, optional
+            Number of rows written on each transaction.
+
+        upsert: boolean, optional
+            Flag to update the existing entities instead of failing on their primary keys.
+
+        progress: function, optional
+            Function called with each progress message.
+
+        Returns
+        ----------
+        tuple
+            Number of rows imported and number of invalid rows skipped.
+    """
+    format_ = file_format(path, format_)
+    schema = RequestSchema(list(repository.model_class.__table__.columns), [])
+    imported = 0
+    invalid = 0
+    start = time.perf_counter()
+
+    with open_file(path, 'r') as file:
+        chunk = []
+        for line_number, row in read_rows(file, format_):
+            args, errors = schema.validate(row, partial=True)
+            if errors:
+                invalid += 1
+                progress('Line ' + str(line_number) + ' skipped: ' + json.dumps(errors))
+                continue
+
+            chunk.append(args)
+            if len(chunk) >= chunk_size:
+                imported += _import_chunk(repository, chunk, upsert)
+                chunk = []
+                progress(_progress('Imported', imported, start))
+        if chunk:
+            imported += _import_chunk(repository, chunk, upsert)
+
+    progress(_progress('Imported', imported, start) + ', ' + str(invalid) + ' invalid rows skipped.')
+    return imported, invalid
+
+
+def export_file(repository, path, format_=None, chunk_size=5000, progress=print):
+    """
+        Function to export every entity of the repository's model to a file, read with a server-side cursor.
+
+        Parameters
+        ----------
+        repository: AbstractRepository
+            Repository of the entities.
+
+        path: str
+            File's path.
+
+        format_: str, optional
+            File's format: csv or ndjson, inferred from the extension when not informed.
+
+        chunk_size: int, optional
+            Number of rows fetched from the cursor at a time.
+
+        progress: function, optional
+            Function called with each progress message.
+
+        Returns
+        ----------
+        int
+            Number of rows exported.
+    """
+    format_ = file_format(path, format_)
+    keys = repository.get_model_columns()
+    exported = 0
+    start = time.perf_counter()
+
+    with open_file(path, 'w') as file:
+        if format_ == 'csv':
+            writer = csv.writer(file)
+            writer.writerow(keys)
+        for entities in repository.export(chunk_size):
+            if format_ == 'csv':
+                writer.writerows([entity[key] for key in keys] for entity in entities)
+            else:
+                file.write(b''.join(Serializer.dumps(entity) + b'\n' for entity in entities).decode('utf-8'))
+            exported += len(entities)
+            progress(_progress('Exported', exported, start))
+
+    progress(_progress('Exported', exported, start) + '.')
+    return exported
+
+
+def _import_chunk(repository, chunk, upsert):
+    with current_app.app_context():
+        return repository.bulk_import(chunk, upsert)
+
+
+def _progress(action, rows, start):
+    elapsed = time.perf_counter() - start
+    return '%s %d rows in %.1fs (%.0f rows/s)' % (action, rows, elapsed, rows / elapsed if elapsed else 0)
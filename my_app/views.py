@@ -0,0 +1,147 @@
+from flask import Blueprint, Response, current_app, g, jsonify, request
+from flask_restful import Api
+from werkzeug.exceptions import HTTPException
+
+from my_app import compression, metrics, routing
+from my_app.cache import get_cache
+from my_app.resources import TeamsResource, PlayersResource, TeamsBulkResource, PlayersBulkResource, TeamStatsResource
+from my_app.resources import TeamsSearchResource, PlayersSearchResource
+from my_app.resources import TeamsChangesResource, PlayersChangesResource, TeamsChangesStreamResource
+from my_app.resources import PlayersChangesStreamResource
+from my_app.serializer import Serializer
+
+
+def init_app(app):
+    """
+        Function to register the API's resources, the application's routes, the hooks of every request and the error
+        handler.
+
+        Parameters
+        ----------
+        app: Flask
+            Application.
+    """
+    api_bp = Blueprint('api', __name__)
+    api = Api(api_bp)
+    api.representation('application/json')(output_json)
+
+    # Resources
+    api.add_resource(TeamsResource, '/teams', '/teams/<int:id_>', strict_slashes=False)
+    api.add_resource(PlayersResource, '/players', '/players/<int:id_>', strict_slashes=False)
+    api.add_resource(TeamsBulkResource, '/teams/bulk', strict_slashes=False)
+    api.add_resource(PlayersBulkResource, '/players/bulk', strict_slashes=False)
+    api.add_resource(TeamStatsResource, '/teams/stats', '/teams/<int:id_>/stats', strict_slashes=False)
+    api.add_resource(TeamsSearchResource, '/teams/search', strict_slashes=False)
+    api.add_resource(PlayersSearchResource, '/players/search', strict_slashes=False)
+    api.add_resource(TeamsChangesResource, '/teams/changes', strict_slashes=False)
+    api.add_resource(PlayersChangesResource, '/players/changes', strict_slashes=False)
+    api.add_resource(TeamsChangesStreamResource, '/teams/changes/stream', strict_slashes=False)
+    api.add_resource(PlayersChangesStreamResource, '/players/changes/stream', strict_slashes=False)
+    app.register_blueprint(api_bp, url_prefix='/api')
+
+    app.add_url_rule('/', view_func=hello_world)
+    app.add_url_rule('/cache', view_func=cache_stats)
+    app.add_url_rule('/admission', view_func=admission_state)
+    app.add_url_rule('/metrics', view_func=metrics_endpoint)
+    if 'query_profiler' in app.extensions:
+        app.add_url_rule('/debug/queries', view_func=slow_queries, methods=['GET', 'DELETE'])
+
+    app.before_request(before_request)
+    app.after_request(server_timing)
+    app.after_request(stick_to_primary)
+    app.after_request(compress)
+    app.after_request(after_request)
+    app.register_error_handler(Exception, handle_exception)
+
+
+def output_json(data, code, headers=None):
+    """
+        Function to encode the resources' responses with the application's JSON encoder.
+    """
+    pretty = current_app.config['JSONIFY_PRETTYPRINT_REGULAR'] or current_app.debug
+    return Response(Serializer.dumps(data, pretty), code, headers, mimetype='application/json')
+
+
+def hello_world():
+    return 'Hello World!'
+
+
+def cache_stats():
+    """
+        Function to display the counters of the entities cache.
+    """
+    return jsonify(get_cache().stats())
+
+
+def admission_state():
+    """
+        Function to display the requests in flight and the admission counters of each route.
+    """
+    return jsonify(current_app.extensions['admission'].state())
+
+
+def metrics_endpoint():
+    """
+        Function to display the latency histograms per route and method in the Prometheus text format.
+    """
+    return Response(metrics.render(get_cache().stats()), mimetype='text/plain; version=0.0.4')
+
+
+def slow_queries():
+    """
+        Function to display the statements with the largest total time, or clear them on DELETE.
+    """
+    query_profiler = current_app.extensions['query_profiler']
+    if request.method == 'DELETE':
+        query_profiler.reset()
+    return jsonify(query_profiler.report())
+
+
+def before_request():
+    metrics.start_request()
+    g.retrieve_args = {}
+
+
+def server_timing(response):
+    return metrics.finish_request(response)
+
+
+def stick_to_primary(response):
+    return routing.stick_to_primary(response)
+
+
+def compress(response):
+    return compression.compress_response(response)
+
+
+def after_request(response):
+    response.headers.add('Access-Control-Allow-Origin', '*')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-Match')
+    response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,PATCH,POST,DELETE')
+    response.headers.add('Access-Control-Expose-Headers', 'ETag')
+    return response
+
+
+def handle_exception(error):
+    """
+        Function to handle exceptions when it is raised in the app.
+
+        The errors are answered with the status they are raised with, after the message: the invalid data errors,
+        raised with the 400 status, also with the error of each attribute. The HTTP errors of the routing keep their
+        status and any other error is answered with the 500 status.
+
+        Parameters
+        ----------
+        error: AbstractException
+            Exception to be handle.
+    """
+    if isinstance(error, HTTPException):
+        headers = [(key, value) for key, value in error.get_headers() if key != 'Content-Type']
+        return jsonify({'exception': error.description}), error.code, headers
+    if error.args[1:2] == (400,):
+        errors = error.args[2] if len(error.args) > 2 else {}
+        if isinstance(errors, dict) and isinstance(errors.get('message'), dict):
+            errors = errors['message']
+        return jsonify({'exception': error.args[0], 'errors': errors}), 400
+    status = error.args[1] if len(error.args) > 1 and isinstance(error.args[1], int) else 500
+    return jsonify({'exception': error.args[0] if error.args else str(error)}), status
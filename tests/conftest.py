@@ -0,0 +1,74 @@
+import pytest
+
+from my_app import create_app, db
+from my_app.config import LocalConfig
+from my_app.models import TeamsModel, PlayersModel
+
+POSITIONS = ['GK', 'DF', 'MF', 'FW']
+
+
+class SQLiteConfig(LocalConfig):
+    TESTING = True
+    DEBUG = False
+    PRESERVE_CONTEXT_ON_EXCEPTION = False
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    SQLALCHEMY_REPLICA_URIS = []
+    ASYNC_SQLALCHEMY_DATABASE_URI = 'sqlite+aiosqlite://'
+    CACHE_BACKEND = 'memory'
+    CACHE_REDIS_URL = None
+    ADMISSION_ENABLED = False
+    ADMISSION_TRUSTED_PROXIES = 0
+    ADMISSION_API_KEYS = []
+
+
+def load(teams, players_per_team):
+    """
+        Function to insert the teams and their players, named T0.. and P0.. in the order of their ids.
+    """
+    for index in range(teams):
+        db.session.add(TeamsModel(name='T%d' % index, city='C%d' % index))
+    db.session.flush()
+    for index in range(teams * players_per_team):
+        db.session.add(PlayersModel(name='P%d' % index, age=20 + index % 10, position=POSITIONS[index % 4],
+                                    team_id=1 + index % teams))
+    db.session.commit()
+
+
+def make_app(database_uri='sqlite://', create_tables=True, **settings):
+    """
+        Function to create an application on a SQLite database, with its tables unless create_tables is False,
+        overriding the settings informed.
+    """
+    config = SQLiteConfig()
+    config.SQLALCHEMY_DATABASE_URI = database_uri
+    for key, value in settings.items():
+        setattr(config, key, value)
+    application = create_app(config)
+    if create_tables:
+        with application.app_context():
+            db.create_all()
+    return application
+
+
+@pytest.fixture
+def app():
+    application = make_app()
+    with application.app_context():
+        load(5, 4)
+        yield application
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def statements(response):
+    """
+        Function to read the number of SQL statements executed by a request from its Server-Timing header.
+    """
+    for timing in response.headers['Server-Timing'].split(', '):
+        if timing.startswith('sql;'):
+            return int(timing.split('"')[1].split()[0])
+    raise AssertionError('Server-Timing has no sql entry: ' + response.headers['Server-Timing'])
@@ -0,0 +1,72 @@
+import pytest
+
+from my_app.admission import TokenBucket
+from my_app.config import BaseConfig, LocalConfig
+
+from conftest import make_app
+
+
+@pytest.fixture
+def app():
+    return make_app(ADMISSION_ENABLED=True, ADMISSION_RATE=0.001, ADMISSION_BURST=2, ADMISSION_MAX_IN_FLIGHT=10,
+                    ADMISSION_API_KEYS=['known'])
+
+
+def environ(address='10.0.0.1', forwarded=None, api_key=None):
+    values = {'REMOTE_ADDR': address}
+    if forwarded is not None:
+        values['HTTP_X_FORWARDED_FOR'] = forwarded
+    if api_key is not None:
+        values['HTTP_X_API_KEY'] = api_key
+    return values
+
+
+def test_admission_is_disabled_by_default(monkeypatch):
+    monkeypatch.delenv('ADMISSION_ENABLED', raising=False)
+    assert not BaseConfig.ADMISSION_ENABLED
+    assert not LocalConfig().ADMISSION_ENABLED
+
+
+def test_forwarded_for_is_ignored_without_trusted_proxies(app):
+    admission = app.extensions['admission']
+    assert admission.client_key(environ(forwarded='1.2.3.4')) == 'addr:10.0.0.1'
+
+
+def test_client_is_the_hop_added_by_the_outermost_trusted_proxy(app):
+    admission = app.extensions['admission']
+    app.config['ADMISSION_TRUSTED_PROXIES'] = 1
+    assert admission.client_key(environ(forwarded='6.6.6.6, 1.2.3.4')) == 'addr:1.2.3.4'
+    app.config['ADMISSION_TRUSTED_PROXIES'] = 2
+    assert admission.client_key(environ(forwarded='6.6.6.6, 1.2.3.4, 10.0.0.2')) == 'addr:1.2.3.4'
+    assert admission.client_key(environ(forwarded='10.0.0.2')) == 'addr:10.0.0.1'
+
+
+def test_only_known_api_keys_identify_the_client(app):
+    admission = app.extensions['admission']
+    assert admission.client_key(environ(api_key='known')) == 'key:known'
+    assert admission.client_key(environ(api_key='made-up')) == 'addr:10.0.0.1'
+
+
+def test_spoofed_headers_do_not_escape_the_rate_limit(app):
+    client = app.test_client()
+    statuses = [client.get('/api/teams', headers={'X-Forwarded-For': '1.1.1.%d' % index,
+                                                  'X-Api-Key': 'key-%d' % index}).status_code
+                for index in range(3)]
+    assert statuses[-1] == 429
+
+
+def test_shed_requests_keep_their_tokens(app):
+    client = app.test_client()
+    for _ in range(3):
+        assert client.get('/api/teams', headers={'X-Request-Start': 't=1'}).status_code == 503
+    assert client.get('/api/teams').status_code == 200
+
+
+def test_refunded_tokens_are_taken_again_up_to_the_burst():
+    bucket = TokenBucket(2, now=0)
+    assert bucket.take(2, rate=1, burst=2, now=0) == 0
+    assert bucket.take(1, rate=1, burst=2, now=0) == 1
+    bucket.refund(1, burst=2)
+    assert bucket.take(1, rate=1, burst=2, now=0) == 0
+    bucket.refund(5, burst=2)
+    assert bucket.tokens == 2
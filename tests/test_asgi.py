@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import pytest
+
+from my_app import db
+from my_app.asgi import create_app
+
+from conftest import SQLiteConfig, load, make_app
+
+
+@pytest.fixture
+def config(tmp_path):
+    uri = 'sqlite:///' + str(tmp_path / 'asgi.sqlite')
+    application = make_app(uri)
+    with application.app_context():
+        load(2, 3)
+        db.session.remove()
+    config = SQLiteConfig()
+    config.ASYNC_SQLALCHEMY_DATABASE_URI = uri.replace('sqlite://', 'sqlite+aiosqlite://', 1)
+    return config
+
+
+def get(application, path, query_string=b''):
+    """
+        Function to send a GET request to an ASGI application, between its startup and its shutdown, returning the
+        status and the decoded body.
+    """
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def serve():
+        served = asyncio.Event()
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+
+        async def receive():
+            if messages[0]['type'] == 'lifespan.shutdown':
+                await served.wait()
+            return messages.pop(0)
+
+        lifespan = asyncio.ensure_future(application({'type': 'lifespan'}, receive, send))
+        await application({'type': 'http', 'method': 'GET', 'path': path, 'query_string': query_string}, None, send)
+        served.set()
+        await lifespan
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(serve())
+    finally:
+        loop.close()
+    assert [message['type'] for message in sent if message['type'].startswith('lifespan.')] \
+        == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    start, body = [message for message in sent if message['type'].startswith('http.')]
+    return start['status'], json.loads(body['body'])
+
+
+def test_each_application_has_its_own_engine(config):
+    first, second = create_app(config), create_app(config)
+    assert first.extensions['async_db'].engine is not second.extensions['async_db'].engine
+
+
+def test_entities_are_read_with_the_engine_of_the_application(config):
+    application = create_app(config)
+    status, body = get(application, '/api/teams/2')
+    assert status == 200 and body['name'] == 'T1'
+    status, body = get(application, '/api/players', b'limit=4')
+    assert status == 200
+    assert [player['id'] for player in body['data']] == [1, 2, 3, 4] and body['next'] == 4
+    assert get(application, '/api/players/99')[0] == 404
@@ -0,0 +1,26 @@
+def test_bulk_create_reports_each_row(app, client):
+    app.config['BULK_BATCH_SIZE'] = 2
+    rows = [{'name': 'A', 'city': 'X'}, {'name': 'B'}, {'name': 'C', 'city': 'Z'}, 'row', {'name': 'D', 'city': 'W'}]
+    response = client.post('/api/teams/bulk', json=rows)
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body['created'] == 3
+    assert [result['status'] for result in body['results']] == ['created', 'failed', 'created', 'invalid', 'created']
+    assert 'Integrity_error' in body['results'][1]['errors']['row']
+    assert [team['name'] for team in client.get('/api/teams?city=X,Z,W').get_json()] == ['A', 'C', 'D']
+
+
+def test_bulk_update_requires_integer_ids(client):
+    rows = [{'id': 1, 'age': 40}, {'id': True, 'age': 41}, {'id': 1.5, 'age': 42}, {'id': '2', 'age': 43},
+            {'id': 999, 'age': 44}, {'age': 45}]
+    body = client.put('/api/players/bulk', json=rows).get_json()
+    assert body['updated'] == 1
+    assert [result['status'] for result in body['results']] == \
+        ['updated', 'invalid', 'invalid', 'invalid', 'not_found', 'invalid']
+    assert client.get('/api/players/1').get_json()['age'] == 40
+    assert client.get('/api/players/2').get_json()['age'] == 21
+
+
+def test_bulk_payload_must_be_an_array(client):
+    response = client.post('/api/players/bulk', json={'name': 'P'})
+    assert response.status_code == 400
@@ -0,0 +1,78 @@
+import fnmatch
+
+import pytest
+
+from my_app import db
+from my_app.cache import MISSING, SharedCache
+
+from conftest import load, make_app
+
+
+class FakeRedis:
+    """
+        Key-value server kept in a dictionary, with the methods of a Redis client used by SharedCache.
+    """
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode('utf-8')
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def keys(self, pattern):
+        return [key for key in self.values if fnmatch.fnmatch(key, pattern)]
+
+
+@pytest.fixture
+def workers(tmp_path):
+    """
+        Two applications on the same database sharing a fake server, as two workers of the production server.
+    """
+    server = FakeRedis()
+    uri = 'sqlite:///' + str(tmp_path / 'cache.sqlite')
+    applications = [make_app(uri, CACHE_BACKEND='shared') for _ in range(2)]
+    with applications[0].app_context():
+        load(2, 2)
+    for application in applications:
+        application.extensions['entity_cache'] = SharedCache(server)
+    yield server, [application.test_client() for application in applications]
+    for application in applications:
+        with application.app_context():
+            db.session.remove()
+
+
+def test_write_in_a_worker_is_seen_by_the_others(workers):
+    server, (first, second) = workers
+    assert first.get('/api/players/1').get_json()['age'] == 20
+    assert server.keys('my_app:entity:players:*')
+
+    assert second.patch('/api/players/1', json={'age': 31}).status_code == 204
+    assert first.get('/api/players/1').get_json()['age'] == 31
+
+
+def test_missing_entities_are_cached(workers):
+    server, (first, second) = workers
+    response = first.get('/api/players?ids=2,99,1').get_json()
+    assert [player['id'] for player in response['data']] == [2, 1]
+    assert response['missing'] == [99]
+    assert server.values['my_app:entity:players:99'] == b'null'
+
+    assert second.get('/api/players?ids=99').get_json()['missing'] == [99]
+
+
+def test_get_many_reads_the_cached_values():
+    cache = SharedCache(FakeRedis())
+    cache.set('a', {'id': 1}, 10)
+    cache.set('b', None, 10)
+    assert cache.get_many(['a', 'b', 'c']) == [{'id': 1}, None, MISSING]
+    assert (cache.hits, cache.misses) == (2, 1)
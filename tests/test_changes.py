@@ -0,0 +1,34 @@
+import threading
+import time
+
+from my_app.changes import STREAMS_UNAVAILABLE, get_change_feed
+
+
+def test_log_is_pruned_in_the_background_never_by_a_request(app, client, monkeypatch):
+    feed = get_change_feed()
+    pruned_by = []
+    monkeypatch.setattr(feed.changes_repository, 'prune',
+                        lambda *args: pruned_by.append(threading.current_thread().name))
+    app.config['CHANGE_FEED_PRUNE_INTERVAL'] = 0.01
+    try:
+        for age in range(20, 25):
+            assert client.patch('/api/players/1', json={'age': age}).status_code == 204
+            assert client.get('/api/players/changes?since=0').status_code == 200
+            time.sleep(0.02)
+    finally:
+        feed.stop()
+    assert pruned_by
+    assert set(pruned_by) == {'change-feed-prune'}
+
+
+def test_streams_are_refused_by_servers_without_threads(client):
+    response = client.get('/api/players/changes/stream')
+    assert response.status_code == 501
+    assert response.get_json() == {'exception': STREAMS_UNAVAILABLE}
+
+
+def test_streams_are_served_by_threaded_servers(app, client):
+    app.config['CHANGE_FEED_STREAM_SECONDS'] = 0
+    response = client.get('/api/players/changes/stream', environ_overrides={'wsgi.multithread': True})
+    assert response.status_code == 200
+    assert response.get_data(as_text=True).startswith('retry: ')
@@ -0,0 +1,41 @@
+import gzip
+import json
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+def test_large_responses_are_compressed(client):
+    plain = client.get('/api/players')
+    response = client.get('/api/players', headers=GZIP)
+    assert plain.headers.get('Content-Encoding') is None
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert len(response.get_data()) < len(plain.get_data())
+    assert json.loads(gzip.decompress(response.get_data())) == plain.get_json()
+
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get('/api/players/1', headers=GZIP)
+    assert len(response.get_data()) < client.application.config['COMPRESSION_MIN_SIZE']
+    assert response.headers.get('Content-Encoding') is None
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert response.get_json()['id'] == 1
+
+
+def test_streams_are_compressed_chunk_by_chunk(app, client):
+    app.config['STREAM_CHUNK_SIZE'] = 5
+    plain = client.get('/api/players?stream=true').get_data()
+    response = client.get('/api/players?stream=true', headers=GZIP, buffered=False)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    chunks = [chunk for chunk in response.response if chunk]
+    # A chunk per 5 entities, each one flushed, and the gzip trailer.
+    assert len(chunks) == 5
+    assert gzip.decompress(b''.join(chunks)) == plain
+
+
+def test_compression_can_be_disabled(app, client):
+    app.config['COMPRESSION_ENABLED'] = False
+    response = client.get('/api/players', headers=GZIP)
+    assert response.headers.get('Content-Encoding') is None
+    assert len(response.get_json()) == 20
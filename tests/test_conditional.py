@@ -0,0 +1,52 @@
+import datetime
+
+from my_app import db
+from my_app.models import PlayersModel
+from my_app.services import retrieve_parser
+
+
+def test_collection_is_modified_by_deleting_an_old_entity(client):
+    response = client.get('/api/players')
+    etag = response.headers['ETag']
+    assert 'Last-Modified' not in response.headers
+
+    assert client.delete('/api/players/1').status_code == 200
+    assert client.get('/api/players', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get('/api/players', headers={'If-Modified-Since': 'Fri, 01 Jan 2100 00:00:00 GMT'}).status_code == 200
+
+
+def test_collection_is_not_modified_with_its_etag(client):
+    etag = client.get('/api/players').headers['ETag']
+    assert client.get('/api/players', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_entity_is_not_modified_since_its_last_modified(client):
+    response = client.get('/api/players/2')
+    last_modified = response.headers['Last-Modified']
+    assert client.get('/api/players/2', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+
+def test_collection_is_modified_by_a_write_leaving_its_aggregates_unchanged(client):
+    players = PlayersModel.__table__
+    db.session.execute(players.update().where(players.c.id == 2).values(updated_at=datetime.datetime(2100, 1, 1)))
+    db.session.commit()
+    etag = client.get('/api/players').headers['ETag']
+
+    assert client.patch('/api/players/1', json={'age': 40}).status_code == 204
+    assert client.get('/api/players', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_embedded_collection_is_modified_by_a_write_on_its_table(client):
+    etag = client.get('/api/players?embed=team').headers['ETag']
+    assert client.patch('/api/teams/1', json={'city': 'Elsewhere'}).status_code == 204
+    assert client.get('/api/players?embed=team', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_query_string_is_parsed_once_per_request(client, monkeypatch):
+    calls = []
+    parse_args = retrieve_parser.parse_args
+    monkeypatch.setattr(retrieve_parser, 'parse_args', lambda: calls.append(1) or parse_args())
+
+    assert client.get('/api/players?embed=team&sort=-age').status_code == 200
+    assert client.get('/api/players/1?embed=team').status_code == 200
+    assert len(calls) == 2
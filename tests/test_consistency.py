@@ -0,0 +1,59 @@
+import random
+import threading
+
+import pytest
+
+from my_app import db
+from my_app.repositories import PlayersRepository, TeamStatsRepository
+
+from conftest import load, make_app
+
+TEAMS = 4
+PLAYERS = 12
+
+
+@pytest.fixture
+def app(tmp_path):
+    application = make_app('sqlite:///' + str(tmp_path / 'consistency.sqlite'))
+    with application.app_context():
+        load(TEAMS, PLAYERS // TEAMS)
+        TeamStatsRepository().rebuild()
+        db.session.remove()
+    return application
+
+
+def write(app, seed, writes):
+    """
+        Function to move players between teams and change their ages, with PATCH and bulk PUT requests and upserts
+        of imported rows in turn.
+    """
+    rand = random.Random(seed)
+    client = app.test_client()
+    for index in range(writes):
+        if index % 3 == 2:
+            rows = [{'id': rand.randint(1, PLAYERS), 'name': 'Imported', 'team_id': rand.randint(1, TEAMS),
+                     'age': rand.randint(18, 40), 'position': 'MF'} for _ in range(4)]
+            with app.app_context():
+                try:
+                    PlayersRepository().bulk_import(rows, upsert=True)
+                except Exception:
+                    pass
+                db.session.remove()
+        elif index % 3:
+            client.patch('/api/players/%d' % rand.randint(1, PLAYERS),
+                         json={'team_id': rand.randint(1, TEAMS), 'age': rand.randint(18, 40)})
+        else:
+            client.put('/api/players/bulk', json=[{'id': rand.randint(1, PLAYERS), 'team_id': rand.randint(1, TEAMS),
+                                              'age': rand.randint(18, 40)} for _ in range(4)])
+
+
+def test_concurrent_writes_keep_the_team_stats_consistent(app):
+    threads = [threading.Thread(target=write, args=(app, seed, 60)) for seed in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with app.app_context():
+        assert TeamStatsRepository().verify() == []
+        db.session.remove()
@@ -0,0 +1,40 @@
+import pytest
+
+from my_app import db
+
+from conftest import load, make_app, statements
+
+
+def counts(players_per_team, url):
+    application = make_app()
+    with application.app_context():
+        load(3, players_per_team)
+        response = application.test_client().get(url)
+        db.session.remove()
+    assert response.status_code == 200
+    return statements(response), response.get_json()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/players?embed=team',
+    '/api/teams?embed=players',
+    '/api/players?limit=1000&embed=team',
+    '/api/teams?embed=players&fields=name',
+])
+def test_embed_statements_do_not_grow_with_the_rows(url):
+    small, _ = counts(1, url)
+    large, _ = counts(10, url)
+    assert small == large
+
+
+def test_embedded_relationships(client):
+    players = client.get('/api/players?embed=team').get_json()
+    assert all(player['team']['id'] == player['team_id'] for player in players)
+
+    teams = client.get('/api/teams?embed=players').get_json()
+    assert sorted(player['id'] for player in teams[0]['players']) == [1, 6, 11, 16]
+
+
+def test_stream_embeds_the_team_of_each_player(client):
+    response = client.get('/api/players?stream=1&embed=team')
+    assert response.get_data(as_text=True).count('"team":{') == 20
@@ -0,0 +1,47 @@
+import pytest
+
+from my_app.resources import PlayersResource
+
+
+def test_invalid_data_is_answered_with_the_error_of_each_attribute(client):
+    response = client.post('/api/players', json={'name': 'P', 'age': 'old'})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['exception'] == 'Dados não foram informados corretamente.'
+    assert list(body['errors']) == ['age']
+
+
+def test_invalid_query_string_is_answered_with_400(client):
+    response = client.get('/api/players?sort=city')
+    assert response.status_code == 400
+    assert list(response.get_json()['errors']) == ['sort']
+
+
+@pytest.mark.parametrize('method, url, status', [
+    ('get', '/api/players/999', 404),
+    ('patch', '/api/players/999', 404),
+    ('delete', '/api/players/999', 404),
+    ('put', '/api/players', 405),
+    ('post', '/api/teams', 409),
+    ('get', '/api/unknown', 404),
+])
+def test_errors_are_answered_with_their_status(client, method, url, status):
+    response = getattr(client, method)(url, json={'age': 30})
+    assert response.status_code == status
+    assert response.get_json()['exception']
+
+
+def test_routing_errors_keep_their_headers(client):
+    response = client.post('/')
+    assert response.status_code == 405
+    assert 'GET' in response.headers['Allow']
+
+
+def test_unexpected_errors_are_answered_with_500(client, monkeypatch):
+    def fail(id_):
+        raise Exception('Unexpected')
+
+    monkeypatch.setattr(PlayersResource.service_class, 'retrieve', fail)
+    response = client.get('/api/players')
+    assert response.status_code == 500
+    assert response.get_json() == {'exception': 'Unexpected'}
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+
+def test_entity_has_only_the_fields_and_the_primary_key(client):
+    assert client.get('/api/players/3?fields=name').get_json() == {'id': 3, 'name': 'P2'}
+
+
+@pytest.mark.parametrize('url, data', [
+    ('/api/players?fields=name', lambda body: body),
+    ('/api/players?fields=name&ids=3', lambda body: body['data']),
+    ('/api/players?fields=name&limit=2', lambda body: body['data']),
+])
+def test_collection_has_only_the_fields_and_the_primary_key(client, url, data):
+    entities = data(client.get(url).get_json())
+    assert entities and all(sorted(entity) == ['id', 'name'] for entity in entities)
+
+
+def test_streamed_entities_have_only_the_fields(client):
+    response = client.get('/api/players?fields=age&stream=true')
+    entities = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(entities) == 20
+    assert all(sorted(entity) == ['age', 'id'] for entity in entities)
+
+
+def test_keys_of_the_embedded_and_sorted_columns_are_kept(client):
+    players = client.get('/api/players?fields=name&embed=team&sort=-age&limit=3').get_json()['data']
+    assert sorted(players[0]) == ['age', 'id', 'name', 'team', 'team_id']
+    assert players[0]['team']['id'] == players[0]['team_id']
+
+
+def test_unknown_field_is_rejected(client):
+    response = client.get('/api/players?fields=name,salary')
+    assert response.status_code == 400
+    assert 'salary' in response.get_json()['errors']['fields']
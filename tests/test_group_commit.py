@@ -0,0 +1,36 @@
+import threading
+
+import pytest
+
+from my_app.group_commit import GroupCommitter
+
+from conftest import make_app
+
+
+@pytest.fixture
+def committer():
+    group_committer = GroupCommitter(make_app(), window=0.01, max_batch=10, timeout=0.05)
+    yield group_committer
+    group_committer.stop()
+
+
+def test_write_queued_past_the_timeout_is_never_executed(committer):
+    started, release = threading.Event(), threading.Event()
+    results, executed = [], []
+
+    def slow():
+        started.set()
+        release.wait(1)
+        return 'slow'
+
+    thread = threading.Thread(target=lambda: results.append(committer.submit(slow)))
+    thread.start()
+    assert started.wait(1)
+    with pytest.raises(Exception, match='not committed'):
+        committer.submit(lambda: executed.append(True))
+    release.set()
+    thread.join()
+
+    assert results == ['slow']
+    assert executed == []
+    assert committer.jobs == 1
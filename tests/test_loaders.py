@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event
+
+from my_app import db
+from my_app.loaders import forget, get_loader
+from my_app.repositories import PlayersRepository
+
+from conftest import statements
+
+
+@pytest.fixture
+def queries(app):
+    """
+        List of the SQL statements executed, including the ones of streamed responses.
+    """
+    executed = []
+    listener = lambda *args: executed.append(args[2])
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    yield executed
+    event.remove(db.engine, 'before_cursor_execute', listener)
+
+
+def test_ids_are_returned_in_their_order_with_the_missing_ones(client):
+    response = client.get('/api/players?ids=5,3,99,1,3,98')
+    body = response.get_json()
+    assert [player['id'] for player in body['data']] == [5, 3, 1]
+    assert body['missing'] == [99, 98]
+    # The version of the collection and a single IN query.
+    assert statements(response) == 2
+
+
+def test_ids_cached_are_not_read_again(client):
+    assert statements(client.get('/api/players?ids=1,2')) == 2
+    assert statements(client.get('/api/players?ids=2,1,3')) == 2
+    assert statements(client.get('/api/players?ids=3,2,1')) == 1
+
+
+def test_entity_is_read_once_for_its_version_and_its_body(client):
+    response = client.get('/api/players/1')
+    assert response.get_json()['id'] == 1
+    assert statements(response) == 1
+
+
+def test_teams_are_read_once_by_the_chunks_of_a_stream(app, client, queries):
+    app.config['STREAM_CHUNK_SIZE'] = 5
+    response = client.get('/api/players?stream=1&embed=team')
+    assert response.get_data(as_text=True).count('"team":{') == 20
+    assert len([statement for statement in queries if 'FROM teams' in statement]) == 1
+
+
+def test_loaders_are_kept_per_table_and_load_function(app):
+    repository = PlayersRepository()
+    reads = []
+
+    def load(ids):
+        reads.append(ids)
+        return dict((id_, {'id': id_}) for id_ in ids)
+
+    with app.test_request_context():
+        assert get_loader('players', repository._load_by_ids) is repository.loader()
+        assert get_loader('players', load) is not repository.loader()
+        assert repository.loader().load_many([1, 2]).keys() == {1, 2}
+
+        get_loader('players', load).load_many([1, 2])
+        get_loader('players', load).load_many([2, 3])
+        forget('players', [2])
+        get_loader('players', load).load_many([1, 2])
+        assert reads == [[1, 2], [3], [2]]
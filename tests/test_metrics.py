@@ -0,0 +1,45 @@
+def metric(client, name):
+    """
+        Function to read the value of a metric, with its labels, from /metrics.
+    """
+    for line in client.get('/metrics').get_data(as_text=True).splitlines():
+        if line.startswith(name + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_server_timing_has_every_phase(client):
+    response = client.get('/api/players?limit=5')
+    timings = dict(timing.split(';', 1) for timing in response.headers['Server-Timing'].split(', '))
+    assert list(timings) == ['total', 'validate', 'db', 'serialize', 'search', 'sql', 'rows']
+    assert float(timings['total'][len('dur='):]) >= float(timings['db'][len('dur='):]) > 0
+    assert timings['rows'] == 'desc="5 rows"'
+
+
+def test_requests_are_aggregated_by_route_and_method(client):
+    labels = '{route="/api/players",method="GET"}'
+    count = metric(client, 'http_request_duration_seconds_count' + labels)
+    rows = metric(client, 'http_request_rows_total' + labels)
+    ok = metric(client, 'http_responses_total{route="/api/players",method="GET",status="200"}')
+
+    client.get('/api/players')
+    client.get('/api/players?limit=abc')
+
+    assert metric(client, 'http_request_duration_seconds_count' + labels) == count + 2
+    assert metric(client, 'http_request_duration_seconds_bucket{route="/api/players",method="GET",le="+Inf"}') \
+        == count + 2
+    assert metric(client, 'http_request_rows_total' + labels) == rows + 20
+    assert metric(client, 'http_responses_total{route="/api/players",method="GET",status="200"}') == ok + 1
+    assert metric(client, 'http_responses_total{route="/api/players",method="GET",status="400"}') >= 1
+
+
+def test_metrics_are_in_the_prometheus_text_format(client):
+    client.get('/api/teams/1')
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    assert response.mimetype_params['version'] == '0.0.4'
+    lines = response.get_data(as_text=True).splitlines()
+    assert '# TYPE http_request_duration_seconds histogram' in lines
+    assert any(line.startswith('http_request_phase_seconds_total{route="/api/teams/<int:id_>",method="GET",phase="db"}')
+               for line in lines)
+    assert any(line.startswith('entity_cache_hits_total{backend=') for line in lines)
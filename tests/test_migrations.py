@@ -0,0 +1,67 @@
+import os
+import shutil
+
+import sqlalchemy as sa
+from flask_migrate import Migrate, migrate as autogenerate, upgrade
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateIndex
+
+from my_app import db
+from my_app.models import PlayersModel
+
+from conftest import make_app
+
+MIGRATIONS = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+
+
+def migrate(uri):
+    application = make_app(uri, create_tables=False)
+    Migrate(application, db, directory=MIGRATIONS)
+    with application.app_context():
+        upgrade(MIGRATIONS)
+        db.session.remove()
+
+
+def test_upgrade_keeps_the_existing_tables(tmp_path):
+    uri = 'sqlite:///' + str(tmp_path / 'existing.sqlite')
+    engine = sa.create_engine(uri)
+    with engine.begin() as connection:
+        connection.exec_driver_sql('CREATE TABLE teams (id INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL, '
+                                   'city VARCHAR(255) NOT NULL, created_at DATETIME NOT NULL, '
+                                   'updated_at DATETIME NOT NULL)')
+        connection.exec_driver_sql('CREATE TABLE players (id INTEGER PRIMARY KEY, name VARCHAR(255), age INTEGER, '
+                                   'position VARCHAR(50), team_id INTEGER REFERENCES teams (id), '
+                                   'created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL)')
+        connection.exec_driver_sql("INSERT INTO teams VALUES (1, 'Team', 'City', '2020-01-01', '2020-01-01')")
+
+    migrate(uri)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql('SELECT name, version FROM teams').fetchall() == [('Team', 1)]
+        assert 'changes' in sa.inspect(connection).get_table_names()
+
+
+def test_upgrade_creates_the_tables(tmp_path):
+    uri = 'sqlite:///' + str(tmp_path / 'empty.sqlite')
+    migrate(uri)
+    assert {'teams', 'players', 'team_stats', 'changes'} <= set(sa.inspect(sa.create_engine(uri)).get_table_names())
+
+
+def test_models_match_the_migrations(tmp_path):
+    directory = str(tmp_path / 'migrations')
+    shutil.copytree(MIGRATIONS, directory, ignore=shutil.ignore_patterns('__pycache__'))
+    application = make_app('sqlite:///' + str(tmp_path / 'models.sqlite'), create_tables=False)
+    Migrate(application, db, directory=directory)
+    with application.app_context():
+        upgrade(directory)
+        autogenerate(directory)
+        db.session.remove()
+    revisions = [sorted(name for name in os.listdir(os.path.join(path, 'versions')) if name.endswith('.py'))
+                 for path in (directory, MIGRATIONS)]
+    assert revisions[0] == revisions[1]
+
+
+def test_fulltext_indexes_are_created_only_on_mysql(app):
+    assert not [index for index in sa.inspect(db.engine).get_indexes('players') if index['name'].startswith('ft_')]
+    index = next(index for index in PlayersModel.__table__.indexes if index.name == 'ft_players_name')
+    assert str(CreateIndex(index).compile(dialect=mysql.dialect())) == \
+        'CREATE FULLTEXT INDEX ft_players_name ON players (name) WITH PARSER ngram'
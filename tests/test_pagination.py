@@ -0,0 +1,42 @@
+import json
+
+
+def read_pages(client, url):
+    """
+        Function to follow the cursors of a collection, returning the ids of each page.
+    """
+    pages, after = [], None
+    while True:
+        response = client.get(url + ('&after=%s' % after if after is not None else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        pages.append([player['id'] for player in body['data']])
+        after = body['next']
+        if after is None:
+            return pages
+
+
+def test_pages_follow_the_primary_key(client):
+    pages = read_pages(client, '/api/players?limit=6')
+    assert pages == [list(range(1, 7)), list(range(7, 13)), list(range(13, 19)), [19, 20]]
+
+
+def test_sorted_pages_follow_the_keyset_of_the_sort(client):
+    ids = sum(read_pages(client, '/api/players?limit=3&sort=-age'), [])
+    players = client.get('/api/players').get_json()
+    expected = [player['id'] for player in sorted(players, key=lambda player: (-player['age'], player['id']))]
+    assert ids == expected
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/players?limit=3&sort=-age&after=abc')
+    assert response.status_code == 400
+    assert list(response.get_json()['errors']) == ['after']
+
+
+def test_stream_has_one_entity_per_line(app, client):
+    app.config['STREAM_CHUNK_SIZE'] = 7
+    response = client.get('/api/players?stream=true&after=5')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == list(range(6, 21))
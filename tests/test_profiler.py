@@ -0,0 +1,30 @@
+import pytest
+from sqlalchemy import text
+
+from my_app import db
+from conftest import make_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    uri = 'sqlite:///' + str(tmp_path / 'primary.db')
+    application = make_app(uri, SQLALCHEMY_REPLICA_URIS=[uri], SLOW_QUERY_ENABLED=True, SLOW_QUERY_THRESHOLD=0,
+                           SLOW_QUERY_EXPLAIN=False)
+    with application.app_context():
+        yield application
+        db.session.remove()
+
+
+def test_replica_statements_are_profiled(app):
+    profiler = app.extensions['query_profiler']
+    profiler.reset()
+    with db.get_engine(app, bind='replica_0').connect() as connection:
+        connection.execute(text('SELECT count(*) FROM teams')).scalar()
+    assert [stats['count'] for stats in profiler.report()] == [1]
+
+
+def test_failing_statement_does_not_leak_its_start(app):
+    with db.engine.connect() as connection:
+        with pytest.raises(Exception):
+            connection.execute(text('SELECT * FROM missing'))
+        assert connection.info.get('query_start') == []
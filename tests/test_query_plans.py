@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import event
+
+from my_app import db
+
+
+def plan(app, client, url, table):
+    """
+        Function to send a request and return the query plan of its page statement on the table, from EXPLAIN QUERY
+        PLAN with the same parameters.
+    """
+    executed = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().startswith('SELECT') and 'FROM ' + table in statement and 'LIMIT' in statement:
+            executed.append((statement, parameters))
+
+    engine = db.get_engine(app)
+    event.listen(engine, 'before_cursor_execute', capture)
+    try:
+        assert client.get(url).status_code == 200
+    finally:
+        event.remove(engine, 'before_cursor_execute', capture)
+    statement, parameters = executed[-1]
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    return ' | '.join(row[-1] for row in rows)
+
+
+def next_url(client, url):
+    return url + '&after=' + str(client.get(url).get_json()['next'])
+
+
+@pytest.mark.parametrize('url, table, expected', [
+    ('/api/players?limit=5', 'players', 'SCAN players'),
+    ('/api/players?team_id=3&limit=2', 'players', 'USING INDEX ix_players_team_id (team_id=?)'),
+    ('/api/players?position=GK&limit=2', 'players', 'USING INDEX ix_players_position (position=?)'),
+    ('/api/players?sort=name&limit=5', 'players', 'USING INDEX ix_players_name'),
+    ('/api/teams?name=T1&limit=5', 'teams', 'USING INDEX ix_teams_name (name=?)'),
+])
+def test_first_page_uses_the_index(app, client, url, table, expected):
+    query_plan = plan(app, client, url, table)
+    assert expected in query_plan
+    assert 'TEMP B-TREE' not in query_plan
+
+
+@pytest.mark.parametrize('url, table, expected', [
+    ('/api/players?limit=5', 'players', 'USING INTEGER PRIMARY KEY (rowid>?)'),
+    ('/api/players?team_id=3&limit=2', 'players', 'USING INDEX ix_players_team_id (team_id=? AND rowid>?)'),
+    ('/api/players?sort=name&limit=5', 'players', 'USING INDEX ix_players_name'),
+])
+def test_next_page_seeks_the_cursor(app, client, url, table, expected):
+    query_plan = plan(app, client, next_url(client, url), table)
+    assert expected in query_plan
+    assert 'TEMP B-TREE' not in query_plan
@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from my_app import db
+from my_app.cache import MISSING, get_cache
+from my_app.repositories import PlayersRepository
+from my_app.routing import STICKY_COOKIE
+
+from conftest import load, make_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """
+        Application whose replica lags behind the primary: it still has the first name of the only player. No
+        application context is kept pushed, so each request has its own.
+    """
+    application = make_app('sqlite:///' + str(tmp_path / 'primary.sqlite'),
+                           SQLALCHEMY_REPLICA_URIS=['sqlite:///' + str(tmp_path / 'replica.sqlite')])
+    with application.app_context():
+        load(1, 1)
+        replica = db.get_engine(application, bind='replica_0')
+        db.metadata.create_all(replica)
+        with replica.begin() as connection:
+            for table in (db.metadata.tables['teams'], db.metadata.tables['players']):
+                rows = [dict(row._mapping) for row in db.session.execute(table.select())]
+                connection.execute(table.insert(), rows)
+        db.session.execute(db.metadata.tables['players'].update().values(name='Renamed'))
+        db.session.commit()
+        db.session.remove()
+    return application
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def cached(app):
+    with app.app_context():
+        return get_cache().get(PlayersRepository()._cache_key(1))
+
+
+@pytest.mark.parametrize('url', ['/api/players/1', '/api/players?ids=1'])
+def test_replica_reads_are_not_cached(app, client, url):
+    response = client.get(url)
+    assert 'P0' in response.get_data(as_text=True)
+    assert cached(app) is MISSING
+
+
+@pytest.mark.parametrize('url', ['/api/players/1', '/api/players?ids=1'])
+def test_only_primary_reads_of_requests_not_sticky_are_cached(app, client, url):
+    client.set_cookie('localhost', STICKY_COOKIE, str(time.time() + 5))
+    assert 'Renamed' in client.get(url).get_data(as_text=True)
+    assert cached(app) is MISSING
+
+    del app.extensions['replica_router']
+    client.delete_cookie('localhost', STICKY_COOKIE)
+    assert 'Renamed' in client.get(url).get_data(as_text=True)
+    assert cached(app)['name'] == 'Renamed'
+
+
+@pytest.mark.parametrize('url', ['/api/players/1', '/api/players?ids=1'])
+def test_sticky_requests_skip_the_cache(app, client, url):
+    with app.app_context():
+        get_cache().set(PlayersRepository()._cache_key(1), {'id': 1, 'name': 'Stale'}, 60)
+    client.set_cookie('localhost', STICKY_COOKIE, str(time.time() + 5))
+    assert 'Renamed' in client.get(url).get_data(as_text=True)
+
+
+def test_group_committed_writes_stick_to_the_primary(app, client):
+    app.config['GROUP_COMMIT_ENABLED'] = True
+    try:
+        response = client.post('/api/players', json={'name': 'New', 'team_id': 1})
+        assert STICKY_COOKIE in response.headers['Set-Cookie']
+        assert client.get('/api/players/' + str(response.get_json()['id'])).get_json()['name'] == 'New'
+    finally:
+        app.extensions['group_committer'].stop()
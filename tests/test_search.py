@@ -0,0 +1,18 @@
+from my_app import search
+from my_app.repositories import PlayersRepository, TeamsRepository
+
+
+def test_preload_builds_the_indexes_before_the_first_search(app, client):
+    search.preload(app)
+    indexes = [search.get_search(repository, create=False).index for repository in (TeamsRepository(),
+                                                                                    PlayersRepository())]
+    assert [len(index) for index in indexes] == [5, 20]
+
+    response = client.get('/api/players/search?q=P1')
+    assert response.status_code == 200
+    assert search.get_search(PlayersRepository(), create=False).index is indexes[1]
+
+
+def test_search_time_is_reported(client):
+    response = client.get('/api/teams/search?q=T1')
+    assert 'search;dur=' in response.headers['Server-Timing']
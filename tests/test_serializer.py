@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from my_app import db
+from my_app.models import PlayersModel, TeamsModel
+from my_app.serializer import ModelSerializer, Serializer
+
+
+def test_serializer_is_compiled_once_per_model_and_fields():
+    serializer = ModelSerializer.for_model(PlayersModel)
+    assert ModelSerializer.for_model(PlayersModel) is serializer
+    assert ModelSerializer.for_model(TeamsModel) is not serializer
+    assert ModelSerializer.for_model(PlayersModel, ('id', 'name')).keys == ('id', 'name')
+    # Only the datetime columns have a conversion.
+    assert [key for key, _ in serializer.conversions] == ['created_at', 'updated_at']
+
+
+def test_rows_are_serialized_with_datetimes_in_isoformat():
+    serializer = ModelSerializer.for_model(TeamsModel)
+    created_at = datetime(2020, 1, 2, 3, 4, 5, 6)
+    row = (1, 'T0', 'C0', created_at, None, 1)
+    assert serializer.from_row(row) == {'id': 1, 'name': 'T0', 'city': 'C0', 'created_at': '2020-01-02T03:04:05.000006',
+                                        'updated_at': None, 'version': 1}
+
+
+def test_entities_are_serialized_as_their_rows(app):
+    serializer = ModelSerializer.for_model(PlayersModel)
+    entity = db.session.get(PlayersModel, 1)
+    row = db.session.execute(db.select(PlayersModel.__table__).where(PlayersModel.id == 1)).first()
+    assert serializer.to_json(entity) == serializer.from_row(row)
+    assert serializer.to_json(entity)['created_at'] == entity.created_at.isoformat()
+
+
+def test_serialized_entities_are_encoded_as_json(client):
+    body = Serializer.dumps({'at': datetime(2020, 1, 2), 'ids': [1, 2]})
+    assert body == b'{"at":"2020-01-02T00:00:00","ids":[1,2]}'
+    player = client.get('/api/players/1').get_json()
+    assert Serializer.parse_datetime(player['created_at']).isoformat() == player['created_at']
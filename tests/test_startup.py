@@ -0,0 +1,21 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.bench_startup import BUDGET_MB, BUDGET_MS, measure
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_package_defers_the_application(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    code = 'import sys, my_app; print(sorted(name for name in sys.modules if name.startswith("my_app.")))'
+    output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE).stdout
+    assert output.decode('utf-8').strip() == "['my_app.routing']"
+
+
+def test_cold_start_is_within_budget(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    result = measure('benchmark', 3)
+    assert result['total_ms'] <= BUDGET_MS
+    assert result['rss_mb'] <= BUDGET_MB
@@ -0,0 +1,57 @@
+import pytest
+
+from my_app.repositories import TeamStatsRepository
+
+from conftest import statements
+
+
+@pytest.fixture
+def client(app):
+    TeamStatsRepository().rebuild()
+    return app.test_client()
+
+
+def stats(client, team_id):
+    response = client.get('/api/teams/%d/stats' % team_id)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_stats_are_read_from_the_summary_tables(client):
+    response = client.get('/api/teams/1/stats')
+    assert response.get_json() == {'team_id': 1, 'players': 4, 'average_age': 22.5,
+                                   'positions': {'GK': 1, 'DF': 1, 'MF': 1, 'FW': 1}}
+    # The team, its totals and its positions, without aggregating the players.
+    assert statements(response) == 3
+    assert [team['team_id'] for team in client.get('/api/teams/stats').get_json()] == [1, 2, 3, 4, 5]
+
+
+def test_writes_of_players_update_the_stats(client):
+    response = client.post('/api/players', json={'name': 'New', 'age': 30, 'position': 'GK', 'team_id': 1})
+    assert stats(client, 1) == {'team_id': 1, 'players': 5, 'average_age': 24.0,
+                                'positions': {'GK': 2, 'DF': 1, 'MF': 1, 'FW': 1}}
+
+    player_id = response.get_json()['id']
+    client.patch('/api/players/%d' % player_id, json={'team_id': 2, 'position': 'MF'})
+    assert stats(client, 1)['players'] == 4
+    assert stats(client, 2)['positions']['MF'] == 2
+
+    client.delete('/api/players/%d' % player_id)
+    assert stats(client, 2)['players'] == 4
+    assert TeamStatsRepository().verify() == []
+
+
+def test_bulk_writes_update_the_stats_once_per_team(client):
+    client.post('/api/players/bulk', json=[{'name': 'B%d' % index, 'age': 40, 'team_id': 3} for index in range(3)])
+    client.put('/api/players/bulk', json=[{'id': 1, 'team_id': 3}, {'id': 6, 'age': None}])
+    assert stats(client, 3)['players'] == 8
+    assert stats(client, 1)['players'] == 3
+    assert TeamStatsRepository().verify() == []
+
+
+def test_teams_without_players_have_empty_stats(client):
+    for player in client.get('/api/players?team_id=4').get_json():
+        client.delete('/api/players/%d' % player['id'])
+    assert stats(client, 4) == {'team_id': 4, 'players': 0, 'average_age': None, 'positions': {}}
+    assert 4 not in [team['team_id'] for team in client.get('/api/teams/stats').get_json()]
+    assert TeamStatsRepository().verify() == []
@@ -0,0 +1,25 @@
+import json
+
+from my_app import db
+from my_app.repositories import PlayersRepository
+from my_app.transfer import export_file, import_file
+
+
+def test_reimported_rows_are_modified(client, tmp_path):
+    path = str(tmp_path / 'players.jsonl')
+    export_file(PlayersRepository(), path, progress=lambda message: None)
+    with open(path) as file:
+        rows = [json.loads(line) for line in file]
+    exported = rows[0]['updated_at']
+    rows[0]['name'] = 'Edited'
+    with open(path, 'w') as file:
+        file.write(''.join(json.dumps(row) + '\n' for row in rows))
+    etag = client.get('/api/players').headers['ETag']
+
+    assert import_file(PlayersRepository(), path, upsert=True, progress=lambda message: None) == (20, 0)
+    db.session.remove()
+    player = client.get('/api/players/1').get_json()
+    assert player['name'] == 'Edited'
+    assert player['updated_at'] > exported
+    assert player['created_at'] == rows[0]['created_at']
+    assert client.get('/api/players', headers={'If-None-Match': etag}).status_code == 200
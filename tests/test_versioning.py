@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import statements
+
+
+def etag(client, url):
+    return client.get(url).headers['ETag']
+
+
+def write(client, method, url, headers):
+    if method == 'put':
+        return client.put(url, json={'name': 'Renamed', 'city': 'Elsewhere'}, headers=headers)
+    if method == 'patch':
+        return client.patch(url, json={'name': 'Renamed'}, headers=headers)
+    return client.delete(url, headers=headers)
+
+
+@pytest.mark.parametrize('method', ['put', 'patch', 'delete'])
+def test_write_with_the_current_etag(client, method):
+    response = write(client, method, '/api/teams/1', {'If-Match': etag(client, '/api/teams/1')})
+    assert response.status_code == (204 if method == 'patch' else 200)
+
+
+@pytest.mark.parametrize('method', ['put', 'patch', 'delete'])
+def test_write_with_a_stale_etag_is_refused(client, method):
+    stale = etag(client, '/api/teams/1')
+    assert client.patch('/api/teams/1', json={'city': 'Moved'}).status_code == 204
+
+    response = write(client, method, '/api/teams/1', {'If-Match': stale})
+    assert response.status_code == 412
+    assert client.get('/api/teams/1').get_json()['city'] == 'Moved'
+
+
+@pytest.mark.parametrize('method', ['put', 'patch', 'delete'])
+def test_write_without_if_match_is_unconditional(client, method):
+    assert write(client, method, '/api/teams/1', {}).status_code == (204 if method == 'patch' else 200)
+
+
+@pytest.mark.parametrize('method', ['put', 'patch', 'delete'])
+def test_weak_etags_never_match(client, method):
+    weak = 'W/' + etag(client, '/api/teams/1')
+    assert write(client, method, '/api/teams/1', {'If-Match': weak}).status_code == 412
+
+
+@pytest.mark.parametrize('method', ['put', 'patch'])
+def test_write_returns_the_etag_of_the_get(client, method):
+    response = write(client, method, '/api/teams/1', {'If-Match': etag(client, '/api/teams/1')})
+    assert response.headers['ETag'] == etag(client, '/api/teams/1')
+    assert not response.headers['ETag'].startswith('W/')
+
+
+def test_compressed_entity_is_not_modified_with_its_etag(client):
+    response = client.get('/api/teams/1?embed=players', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].endswith('-gzip"')
+    assert client.get('/api/teams/1?embed=players', headers={'If-None-Match': response.headers['ETag']}) \
+        .status_code == 304
+
+
+@pytest.mark.parametrize('method', ['patch', 'delete'])
+def test_conditional_write_is_a_single_statement(client, method):
+    response = write(client, method, '/api/teams/1', {'If-Match': etag(client, '/api/teams/1')})
+    # The write, its change log entry and the version of the table.
+    assert statements(response) == 3